@@ -1,4 +1,4 @@
-import type { MovieCreate, MovieOut, MovieUpdate } from './types/movies';
+import type { JobAccepted, JobOut, JobProgress, MovieCreate, MovieOut, MovieUpdate } from './types/movies';
 
 const BASE_URL = import.meta.env.VITE_API_BASE_URL || '';
 
@@ -25,6 +25,10 @@ async function request<T>(path: string, options: RequestInit = {}): Promise<T> {
   return res.json() as Promise<T>;
 }
 
+const JOB_POLL_INTERVAL_MS = 2000;
+
+const sleep = (ms: number) => new Promise<void>(resolve => setTimeout(resolve, ms));
+
 export const moviesApi = {
   getMovies(params?: { q?: string; genre?: string; is_premium?: boolean; limit?: number; offset?: number; order?: string }) {
     const qs = new URLSearchParams();
@@ -98,7 +102,36 @@ export const moviesApi = {
       throw new Error(message);
     }
 
-    return res.json() as Promise<{ video_url: string; playlist_filename: string }>
+    // 202: transcoding runs in the background; poll status_url (see waitForJob)
+    return res.json() as Promise<JobAccepted>;
+  },
+
+  getJob(statusUrl: string) {
+    return request<JobOut>(statusUrl);
+  },
+
+  getJobProgress(statusUrl: string) {
+    return request<JobProgress>(`${statusUrl}/progress`);
+  },
+
+  cancelJob(statusUrl: string) {
+    return request<JobOut>(statusUrl, { method: 'DELETE' });
+  },
+
+  // Poll the lightweight progress view until the job finishes, then return the full job.
+  // Rejects when the job failed or was cancelled.
+  async waitForJob(statusUrl: string, onProgress?: (progress: JobProgress) => void): Promise<JobOut> {
+    for (;;) {
+      const progress = await request<JobProgress>(`${statusUrl}/progress`);
+      onProgress?.(progress);
+      if (progress.status !== 'queued' && progress.status !== 'running') break;
+      await sleep(JOB_POLL_INTERVAL_MS);
+    }
+    const job = await request<JobOut>(statusUrl);
+    if (job.status !== 'succeeded') {
+      throw new Error(job.error || `Video processing ${job.status}`);
+    }
+    return job;
   },
 
   async uploadTrailer(movieId: number, file: File) {
@@ -55,3 +55,35 @@ export interface MovieOut {
   created_at: string; // ISO
   updated_at: string; // ISO
 }
+
+// Background jobs (upload-video returns 202 with a job to poll)
+export type JobStatus = 'queued' | 'running' | 'succeeded' | 'failed' | 'cancelled';
+
+export interface JobAccepted {
+  job_id: string;
+  status: JobStatus;
+  status_url: string; // e.g. /movies/1/jobs/<job_id>
+}
+
+export interface JobProgress {
+  id: string;
+  status: JobStatus;
+  stage: string;
+  progress: number; // 0..100
+}
+
+export interface MovieVideoUploadResult {
+  video_url: string; // master playlist
+  playlist_filename: string;
+  renditions: string[];
+}
+
+export interface JobOut extends JobProgress {
+  kind: string;
+  movie_id: number;
+  error?: string | null;
+  result?: MovieVideoUploadResult | null;
+  created_at: string; // ISO
+  started_at?: string | null;
+  finished_at?: string | null;
+}
@@ -43,6 +43,7 @@ const MovieForm: React.FC<MovieFormProps> = ({ mode, initialValues, onSubmit, di
   const [error, setError] = useState<string | null>(null);
   const [uploadingThumb, setUploadingThumb] = useState(false);
   const [uploadingVideo, setUploadingVideo] = useState(false);
+  const [videoStage, setVideoStage] = useState<string | null>(null);
   const [uploadMsg, setUploadMsg] = useState<string | null>(null);
   const [uploadingTrailer, setUploadingTrailer] = useState(false);
   const [thumbName, setThumbName] = useState<string>('');
@@ -137,15 +138,20 @@ const MovieForm: React.FC<MovieFormProps> = ({ mode, initialValues, onSubmit, di
     setVideoName(e.target.files[0].name || '');
     setError(null); setUploadMsg(null); setUploadingVideo(true);
     try {
-      const res = await moviesApi.uploadVideo(movieId, e.target.files[0]);
-      if (res?.video_url) {
-        setValues(v => ({ ...v, video_url: res.video_url }));
-        setUploadMsg('Video uploaded');
+      const accepted = await moviesApi.uploadVideo(movieId, e.target.files[0]);
+      setUploadMsg('Video uploaded, processing...');
+      const job = await moviesApi.waitForJob(accepted.status_url, p => setVideoStage(`${p.stage} (${Math.round(p.progress)}%)`));
+      const nextUrl = job.result?.video_url;
+      if (nextUrl) {
+        setValues(v => ({ ...v, video_url: nextUrl }));
+        setUploadMsg('Video processed');
       }
     } catch (err: any) {
+      setUploadMsg(null);
       setError(err?.message || 'Failed to upload video');
     } finally {
       setUploadingVideo(false);
+      setVideoStage(null);
       e.target.value = '';
     }
   };
@@ -205,7 +211,7 @@ const MovieForm: React.FC<MovieFormProps> = ({ mode, initialValues, onSubmit, di
                 <span className="text-xs text-[#b3b3b3] truncate">{videoName || 'No file selected'}</span>
               </div>
               <input ref={videoInputRef} className="hidden" type="file" accept="video/*" onChange={onVideoFileChange} />
-              {uploadingVideo && <div className="text-xs text-[#b3b3b3]">Uploading video...</div>}
+              {uploadingVideo && <div className="text-xs text-[#b3b3b3]">{videoStage ? `Processing video: ${videoStage}` : 'Uploading video...'}</div>}
             </div>
             
           </div>
@@ -57,7 +57,9 @@ export default function AddMovieForm({ onCreated }: Props) {
         setSuccess('Movie created and thumbnail uploaded.');
       }
       if (videoFile) {
-        await moviesApi.uploadVideo(movie.id, videoFile);
+        const accepted = await moviesApi.uploadVideo(movie.id, videoFile);
+        setSuccess('Movie created, video uploaded and processing...');
+        await moviesApi.waitForJob(accepted.status_url);
         setSuccess('Movie created, thumbnail and video uploaded.');
       }
       onCreated?.(movie);
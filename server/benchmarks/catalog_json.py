@@ -0,0 +1,113 @@
+"""
+Per-request cost of building a 100-row GET /movies body: query + serialization, no HTTP.
+
+    before:  ORM rows -> MovieOut.model_validate per row -> FastAPI response_model re-validation
+             -> jsonable output -> stdlib json
+    models:  ORM rows -> one TypeAdapter(list[MovieOut]) validate + dump_json
+    rows:    column tuples -> orjson (CATALOG_JSON_FAST_PATH)
+
+Usage:
+    python -m server.benchmarks.catalog_json --movies 2000 --limit 100 --iterations 300
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from pydantic import TypeAdapter
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from server.db import Base, create_async_db_engine, create_db_engine
+from server.models.movie import Movie, MovieGenre
+from server.models import user as _user_model  # noqa: F401
+from server.schema.movie import MovieOut
+from server.services.fastjson import dumps_rows, orjson
+from server.usecases.movies import CATALOG_ROW_FIELDS, list_movies
+
+_adapter = TypeAdapter(list[MovieOut])
+
+
+def seed(url: str, n: int) -> None:
+    engine = create_db_engine(url)
+    Base.metadata.create_all(bind=engine)
+    genres = list(MovieGenre)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Movie),
+            [
+                {
+                    "title": f"Movie {i}",
+                    "description": "A reasonably long synopsis for a catalog entry. " * 3,
+                    "genre": genres[i % len(genres)],
+                    "release_year": 1950 + i % 70,
+                    "duration": 80 + i % 60,
+                    "rating": (i % 50) / 10,
+                    "video_url": f"https://res.cloudinary.com/demo/raw/upload/movies/{i}/master.m3u8",
+                    "thumbnail_url": f"https://res.cloudinary.com/demo/image/upload/{i}.jpg",
+                    "is_premium": i % 3 == 0,
+                }
+                for i in range(n)
+            ],
+        )
+    engine.dispose()
+
+
+async def before(db, limit):
+    movies, _ = await list_movies(db, limit=limit)
+    content = [MovieOut.model_validate(m) for m in movies]
+    # What FastAPI does with response_model: dump, re-validate, serialize to JSON-able python, json.dumps
+    validated = _adapter.validate_python([m.model_dump() for m in content])
+    return json.dumps(_adapter.dump_python(validated, mode="json")).encode()
+
+
+async def models(db, limit):
+    movies, _ = await list_movies(db, limit=limit)
+    return _adapter.dump_json(_adapter.validate_python(movies, from_attributes=True))
+
+
+async def rows(db, limit):
+    page, _ = await list_movies(db, limit=limit, as_rows=True)
+    return dumps_rows(CATALOG_ROW_FIELDS, page)
+
+
+async def run(url: str, limit: int, iterations: int) -> None:
+    engine = create_async_db_engine(url)
+    SessionLocal = async_sessionmaker(bind=engine, expire_on_commit=False)
+    for name, fn in (("before", before), ("models", models), ("rows", rows)):
+        async with SessionLocal() as db:
+            body = await fn(db, limit)  # warm up
+        latencies = []
+        for _ in range(iterations):
+            # Fresh session per request, as in the app (no identity-map reuse)
+            async with SessionLocal() as db:
+                start = time.perf_counter()
+                await fn(db, limit)
+                latencies.append((time.perf_counter() - start) * 1000)
+        latencies.sort()
+        print(
+            f"{name:>6}: p50 {statistics.median(latencies):6.2f} ms | p95 {latencies[int(0.95 * len(latencies))]:6.2f} ms"
+            f" | {len(body)} bytes"
+        )
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--movies", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=300)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_json_") as tmpdir:
+        path = os.path.join(tmpdir, "catalog.db")
+        seed(f"sqlite:///{path}", args.movies)
+        print(f"{args.limit}-row pages, orjson {'on' if orjson else 'off'}")
+        asyncio.run(run(f"sqlite+aiosqlite:///{path}", args.limit, args.iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Catalog read throughput: the old hard-coded SQLite engine vs create_db_engine (WAL + pragmas + pool).
+
+Reader threads alternate list (20 newest) and detail queries while one writer keeps updating
+ratings, which is what triggered "database is locked" under the old settings.
+
+Usage:
+    python -m server.benchmarks.catalog_qps --movies 5000 --threads 8 --seconds 5
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, insert, select, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from server.db import Base, create_db_engine
+from server.models.movie import Movie, MovieGenre
+from server.models import user as _user_model  # noqa: F401
+
+
+def seed(engine, n: int) -> None:
+    Base.metadata.create_all(bind=engine)
+    genres = list(MovieGenre)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Movie),
+            [
+                {"title": f"Movie {i}", "genre": genres[i % len(genres)], "rating": (i % 50) / 10, "is_premium": False}
+                for i in range(n)
+            ],
+        )
+
+
+def run(engine, n: int, threads: int, seconds: float) -> dict:
+    Session = sessionmaker(bind=engine)
+    counts = {"list": 0, "detail": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+    stop = time.monotonic() + seconds
+
+    def reader():
+        local = {"list": 0, "detail": 0, "errors": 0}
+        while time.monotonic() < stop:
+            with Session() as db:
+                try:
+                    if random.random() < 0.5:
+                        db.execute(select(Movie).order_by(Movie.created_at.desc()).limit(20)).scalars().all()
+                        local["list"] += 1
+                    else:
+                        db.get(Movie, random.randint(1, n))
+                        local["detail"] += 1
+                except OperationalError:
+                    local["errors"] += 1
+        with lock:
+            for k, v in local.items():
+                counts[k] += v
+
+    def writer():
+        while time.monotonic() < stop:
+            with Session() as db:
+                try:
+                    db.execute(update(Movie).where(Movie.id == random.randint(1, n)).values(rating=random.randint(0, 50) / 10))
+                    db.commit()
+                    counts["writes"] += 1
+                except OperationalError:
+                    counts["errors"] += 1
+
+    workers = [threading.Thread(target=reader) for _ in range(threads)] + [threading.Thread(target=writer)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    return {
+        "list_qps": counts["list"] / seconds,
+        "detail_qps": counts["detail"] / seconds,
+        "write_qps": counts["writes"] / seconds,
+        "errors": counts["errors"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--movies", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_catalog_") as tmpdir:
+        variants = {
+            # The previous server/db.py configuration
+            "before": lambda url: create_engine(url, connect_args={"check_same_thread": False}),
+            "after": lambda url: create_db_engine(url, pool_size=args.threads + 1),
+        }
+        for name, make_engine in variants.items():
+            engine = make_engine(f"sqlite:///{os.path.join(tmpdir, name + '.db')}")
+            seed(engine, args.movies)
+            result = run(engine, args.movies, args.threads, args.seconds)
+            engine.dispose()
+            print(
+                f"{name:>6}: list {result['list_qps']:8.1f} qps | detail {result['detail_qps']:8.1f} qps | "
+                f"writes {result['write_qps']:7.1f} qps | errors {result['errors']}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Login throughput under concurrent load: bcrypt inline on the event loop vs the password hashing pool.
+
+Clients hammer POST /auth/login while a probe measures event-loop lag (how late a 50 ms sleep
+wakes up), i.e. how long every other request on the worker stalls behind password hashing.
+Honours BCRYPT_ROUNDS and PASSWORD_HASH_WORKERS.
+
+Usage:
+    python -m server.benchmarks.login_throughput --users 16 --concurrency 16 --seconds 5
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from server.db import Base, create_async_db_engine, create_db_engine, get_async_db
+from server.main import app
+from server.models.user import User
+from server.services.passwords import BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS, hash_password, password_hasher
+
+PASSWORD = "benchmark-password"
+
+
+def seed(url: str, n: int) -> None:
+    engine = create_db_engine(url)
+    Base.metadata.create_all(bind=engine)
+    hashed = hash_password(PASSWORD)
+    with sessionmaker(bind=engine)() as db:
+        db.add_all(User(email=f"user{i}@example.com", name=f"User {i}", password_hash=hashed) for i in range(n))
+        db.commit()
+    engine.dispose()
+
+
+async def run(users: int, concurrency: int, seconds: float) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    latencies: list[float] = []
+    probe: list[float] = []
+    stop = time.monotonic() + seconds
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def login_loop(worker: int):
+            i = worker
+            while time.monotonic() < stop:
+                start = time.perf_counter()
+                r = await client.post("/auth/login", json={"email": f"user{i % users}@example.com", "password": PASSWORD})
+                r.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+                i += concurrency
+
+        async def probe_loop():
+            while time.monotonic() < stop:
+                start = time.perf_counter()
+                await asyncio.sleep(0.05)
+                probe.append(time.perf_counter() - start - 0.05)
+
+        await asyncio.gather(probe_loop(), *(login_loop(w) for w in range(concurrency)))
+
+    latencies.sort()
+    return {
+        "logins_per_sec": len(latencies) / seconds,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(0.95 * (len(latencies) - 1))] * 1000,
+        "loop_lag_p95_ms": sorted(probe)[int(0.95 * (len(probe) - 1))] * 1000,
+        "loop_lag_max_ms": max(probe) * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=16)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_login_") as tmpdir:
+        path = os.path.join(tmpdir, "login.db")
+        seed(f"sqlite:///{path}", args.users)
+        async_engine = create_async_db_engine(f"sqlite+aiosqlite:///{path}")
+        SessionLocal = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+        async def override_get_async_db():
+            async with SessionLocal() as db:
+                yield db
+
+        app.dependency_overrides[get_async_db] = override_get_async_db
+        print(f"bcrypt rounds={BCRYPT_ROUNDS}, cores={os.cpu_count()}")
+        for name, workers in (("inline", 0), ("pool", max(PASSWORD_HASH_WORKERS, 1))):
+            password_hasher.max_workers = workers
+            result = asyncio.run(run(args.users, args.concurrency, args.seconds))
+            print(
+                f"{name:>6}: {result['logins_per_sec']:7.1f} logins/s | p50 {result['p50_ms']:7.1f} ms | "
+                f"p95 {result['p95_ms']:7.1f} ms | loop lag p95 {result['loop_lag_p95_ms']:7.1f} ms / max {result['loop_lag_max_ms']:7.1f} ms"
+            )
+        password_hasher.shutdown()
+        asyncio.run(async_engine.dispose())
+        app.dependency_overrides.clear()
+
+
+if __name__ == "__main__":
+    main()
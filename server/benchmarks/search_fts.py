@@ -0,0 +1,103 @@
+"""
+Title/description search on a synthetic catalog: leading-wildcard LIKE vs the FTS5 index.
+
+Usage:
+    python -m server.benchmarks.search_fts --movies 100000 --queries 200
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import insert, or_, select, text
+
+from server.db import Base, create_db_engine
+from server.models.movie import Movie, MovieGenre
+from server.models import user as _user_model  # noqa: F401
+from server.services.search import Fts5SearchBackend
+
+
+def _vocabulary(size: int, seed: int = 1) -> list[str]:
+    # Pronounceable pseudo-words so matches stay selective, as in a real catalog.
+    rng = random.Random(seed)
+    syllables = ["ka", "lo", "mi", "ren", "sha", "tor", "vel", "an", "dri", "qu", "ex", "zo", "par", "len", "ost"]
+    return sorted({"".join(rng.choices(syllables, k=rng.randint(2, 4))) for _ in range(size)})
+
+
+WORDS = _vocabulary(20_000)
+
+
+def seed(engine, n: int) -> None:
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(42)
+    genres = list(MovieGenre)
+    rows = [
+        {
+            "title": f"{' '.join(rng.sample(WORDS, 3)).title()} {i}",
+            "description": " ".join(rng.choices(WORDS, k=25)),
+            "genre": genres[i % len(genres)],
+        }
+        for i in range(n)
+    ]
+    with engine.begin() as conn:
+        conn.execute(insert(Movie), rows)
+        Fts5SearchBackend.install(conn)
+
+
+def timed(fn, queries) -> list[float]:
+    out = []
+    for q in queries:
+        start = time.perf_counter()
+        fn(q)
+        out.append((time.perf_counter() - start) * 1000)
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--movies", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_search_") as tmpdir:
+        engine = create_db_engine(f"sqlite:///{os.path.join(tmpdir, 'search.db')}")
+        start = time.perf_counter()
+        seed(engine, args.movies)
+        print(f"seeded {args.movies} movies + index in {time.perf_counter() - start:.1f}s")
+
+        rng = random.Random(7)
+        queries = [rng.choice(WORDS)[: rng.randint(4, 7)] for _ in range(args.queries)]
+        backend = Fts5SearchBackend()
+
+        with engine.connect() as conn:
+
+            def like(q):
+                pattern = f"%{q}%"
+                stmt = select(Movie.id).where(or_(Movie.title.ilike(pattern), Movie.description.ilike(pattern)))
+                conn.execute(stmt.limit(args.limit)).all()
+
+            def like_count(q):
+                pattern = f"%{q}%"
+                conn.execute(
+                    text("SELECT count(*) FROM movies WHERE title LIKE :p OR description LIKE :p"), {"p": pattern}
+                ).scalar()
+
+            def fts(q):
+                stmt, rank = backend.apply(select(Movie.id), q)
+                conn.execute(stmt.order_by(rank).limit(args.limit)).all()
+
+            for name, fn in (("LIKE (unranked, first page)", like), ("LIKE (full scan, count)", like_count), ("FTS5 (bm25 ranked)", fts)):
+                fn(queries[0])  # warm up
+                lat = timed(fn, queries)
+                print(
+                    f"{name:>28}: p50 {statistics.median(lat):7.2f} ms | "
+                    f"p95 {sorted(lat)[int(0.95 * len(lat))]:7.2f} ms | max {max(lat):7.2f} ms"
+                )
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
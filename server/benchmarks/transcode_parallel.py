@@ -0,0 +1,91 @@
+"""
+Wall time of the HLS ladder transcode: one ffmpeg process vs keyframe-aligned chunks in a process pool.
+
+    single:   transcode_to_hls, one ffmpeg with FFMPEG_THREADS threads
+    parallel: transcode_to_hls_parallel, --workers ffmpeg processes sharing the same thread budget
+
+A synthetic source (testsrc2 + sine, 2s GOPs) is generated with ffmpeg unless --source is given.
+Needs ffmpeg and ffprobe on PATH.
+
+Usage:
+    python -m server.benchmarks.transcode_parallel --duration 300 --chunk-seconds 30 --workers 4
+"""
+import argparse
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from server.services.hls_transcoder import (
+    ensure_ffmpeg,
+    parse_ladder,
+    read_media_playlist,
+    transcode_to_hls,
+    transcode_to_hls_parallel,
+)
+
+
+def make_source(path: Path, duration: int, height: int) -> None:
+    width = height * 16 // 9
+    subprocess.run(
+        [
+            "ffmpeg", "-y",
+            "-f", "lavfi", "-i", f"testsrc2=size={width}x{height}:rate=30:duration={duration}",
+            "-f", "lavfi", "-i", f"sine=frequency=440:duration={duration}",
+            "-c:v", "libx264", "-preset", "ultrafast", "-g", "60", "-keyint_min", "60", "-sc_threshold", "0",
+            "-c:a", "aac", "-shortest", str(path),
+        ],
+        check=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+
+
+def summarize(index_path: str) -> str:
+    # Stitched playlists must cover the same duration as the single-process ones
+    master = Path(index_path)
+    totals = [
+        sum(d for d, _ in read_media_playlist(str(p)))
+        for p in sorted(master.parent.glob(f"{master.stem}_*.m3u8"))
+    ]
+    return f"{len(totals)} variants, {min(totals):.1f}-{max(totals):.1f}s each"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--source", help="Existing video file instead of a generated one")
+    parser.add_argument("--duration", type=int, default=300, help="Generated source length (seconds)")
+    parser.add_argument("--height", type=int, default=720, help="Generated source height")
+    parser.add_argument("--ladder", default="720p,480p,360p")
+    parser.add_argument("--chunk-seconds", type=int, default=30)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    ensure_ffmpeg()
+    ladder = parse_ladder(args.ladder)
+    with tempfile.TemporaryDirectory(prefix="bench_transcode_") as tmpdir:
+        source = Path(args.source) if args.source else Path(tmpdir) / "source.mp4"
+        if not args.source:
+            make_source(source, args.duration, args.height)
+
+        start = time.perf_counter()
+        index_path, _ = transcode_to_hls(str(source), f"{tmpdir}/single", "bench", ladder=ladder)
+        single = time.perf_counter() - start
+        print(f"  single: {single:7.1f} s | {summarize(index_path)}")
+
+        start = time.perf_counter()
+        index_path, _ = transcode_to_hls_parallel(
+            str(source),
+            f"{tmpdir}/parallel",
+            "bench",
+            ladder=ladder,
+            chunk_seconds=args.chunk_seconds,
+            workers=args.workers,
+        )
+        parallel = time.perf_counter() - start
+        print(f"parallel: {parallel:7.1f} s | {summarize(index_path)}")
+        print(f" speedup: {single / parallel:7.2f}x ({args.workers} workers, {args.chunk_seconds}s chunks)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,88 @@
-from sqlalchemy import create_engine
+import os
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
-# SQLite database setup (file: ./app.db)
-DATABASE_URL = "sqlite:///./server/app.db"
+# Database configuration (env override supported). Defaults to the local SQLite file.
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./server/app.db")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds, -1 disables
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+# SQLite tuning applied on every new connection
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        # WAL lets readers proceed during a write; NORMAL sync is durable across app crashes in WAL mode
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        # Wait for a competing writer instead of failing with "database is locked"
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    finally:
+        cursor.close()
+
+
+def _engine_options(url: str, kwargs: dict) -> dict:
+    is_sqlite = make_url(url).get_backend_name() == "sqlite"
+    options = {"pool_pre_ping": DB_POOL_PRE_PING, "pool_recycle": DB_POOL_RECYCLE}
+    if is_sqlite:
+        options["connect_args"] = {"check_same_thread": False}
+    if not (is_sqlite and make_url(url).database in (None, "", ":memory:")) and "poolclass" not in kwargs:
+        # In-memory SQLite uses a single shared connection; everything else gets a sized queue pool
+        options.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT)
+    options.update(kwargs)
+    return options
+
+
+def create_db_engine(url: str = DATABASE_URL, **kwargs) -> Engine:
+    """
+    Create an engine with the configured pool settings; SQLite file databases also get
+    WAL/synchronous/mmap/busy-timeout pragmas on connect. Keyword arguments override defaults.
+    """
+    db_engine = create_engine(url, **_engine_options(url, kwargs))
+    if db_engine.dialect.name == "sqlite":
+        event.listen(db_engine, "connect", _set_sqlite_pragmas)
+    return db_engine
+
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False},
-)
+def async_url_for(url: str) -> str:
+    """Map a sync database URL to its asyncio driver (aiosqlite / asyncpg); explicit drivers are kept."""
+    parsed = make_url(url)
+    drivers = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+    if "+" in parsed.drivername or parsed.drivername not in drivers:
+        return url
+    return parsed.set(drivername=drivers[parsed.drivername]).render_as_string(hide_password=False)
+
+
+def create_async_db_engine(url: str, **kwargs) -> AsyncEngine:
+    """Async counterpart of `create_db_engine` with the same pool settings and SQLite pragmas."""
+    db_engine = create_async_engine(url, **_engine_options(url, kwargs))
+    if db_engine.dialect.name == "sqlite":
+        event.listen(db_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    return db_engine
+
+
+# Sync engine: schema creation, scripts and background workers
+engine = create_db_engine(DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine: request handlers
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or async_url_for(DATABASE_URL)
+
+async_engine = create_async_db_engine(ASYNC_DATABASE_URL)
+
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 def get_db():
@@ -19,3 +91,9 @@ def get_db():
         yield db
     finally:
         db.close() 
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
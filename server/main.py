@@ -1,7 +1,9 @@
+import asyncio
 import logging
+import os
 from contextlib import asynccontextmanager
 from pathlib import Path
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
@@ -20,23 +22,56 @@ except Exception:
     # dotenv not available; ignore in prod
     pass
 
-from server.db import Base, engine, get_db
+from server.db import AsyncSessionLocal, Base, SessionLocal, async_engine, engine, get_db
 from server.routes import auth as auth_routes
+from server.routes import media as media_routes
 from server.routes import movies as movies_routes
+from server.services.jobs import job_queue
+from server.usecases.video_pipeline import run_video_job
+from server.services import metrics
+from server.services.passwords import password_hasher
+from server.services.query_stats import QueryStatsMiddleware, instrument_engine
+from server.services.resumable import sweep_expired_sessions
+from server.services.response_cache import catalog_cache
+from server.services.user_cache import user_cache
+from server.services.search import Fts5SearchBackend
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Import models so they are registered with SQLAlchemy's metadata
     from server.models import user  # noqa: F401
     from server.models import movie  # noqa: F401
+    from server.models import job  # noqa: F401
 
-    # Create tables
+    # Create tables, plus indexes added to tables that already existed
     Base.metadata.create_all(bind=engine)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    if engine.dialect.name == "sqlite":
+        with engine.begin() as conn:
+            Fts5SearchBackend.install(conn)
+
+    # Abandoned resumable uploads; sessions are also swept whenever a new one starts
+    sweep_expired_sessions()
+
+    # Resume jobs queued (or interrupted) before the last shutdown; results are saved through this loop
+    job_queue.register("upload-video", run_video_job)
+    job_queue.register("upload-trailer", run_video_job)
+    job_queue.start(SessionLocal, loop=asyncio.get_running_loop(), async_session_factory=AsyncSessionLocal)
     yield
+    job_queue.shutdown(wait=False)
+    password_hasher.shutdown(wait=False)
+    await async_engine.dispose()
 
 
 app = FastAPI(title="Netflix Clone API", version="0.1.0", lifespan=lifespan)
 
+# Per-request SQL count/time in a Server-Timing header, plus the slow-query log
+instrument_engine(engine)
+instrument_engine(async_engine)
+app.add_middleware(QueryStatsMiddleware)
+
 # Minimal CORS setup (adjust origins as needed)
 app.add_middleware(
     CORSMiddleware,
@@ -44,13 +79,44 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Cache", "ETag", "Last-Modified", "Server-Timing"],
 )
 
+# Outermost, so latency covers every other middleware
+app.add_middleware(metrics.MetricsMiddleware)
+
+# Optional bearer token required to scrape /metrics (env override supported)
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+
+@metrics.registry.collector
+def _runtime_samples():
+    # Read at scrape time: pool checkouts and cache counters are already tracked by their owners
+    yield from metrics.pool_samples("sync", engine.pool)
+    yield from metrics.pool_samples("async", async_engine.sync_engine.pool)
+    yield from metrics.cache_samples("user", user_cache.stats())
+    yield from metrics.cache_samples("catalog", catalog_cache.stats.summary())
+    yield "video_jobs_pending", "Background jobs queued or running.", {}, job_queue.pending
+
+
 @app.get("/")
 def read_root():
     return {"message": "Netflix Clone FastAPI server is running"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics_api(request: Request):
+    """
+    Prometheus text exposition: per-route latency histograms, in-flight requests, DB pool
+    utilization, job durations, upload throughput and cache hit ratios.
+
+    Security: Open unless METRICS_TOKEN is set, then requires `Authorization: Bearer <token>`.
+    """
+    if METRICS_TOKEN and request.headers.get("authorization") != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    return Response(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+
 # -----------------------------
 # Centralized Error Handling
 # -----------------------------
@@ -69,7 +135,11 @@ def _error_payload(request: Request, status_code: int, message: str, code: str |
 
 @app.exception_handler(StarletteHTTPException)
 async def http_exception_handler(request: Request, exc: StarletteHTTPException):
-    return JSONResponse(status_code=exc.status_code, content=_error_payload(request, exc.status_code, exc.detail))
+    return JSONResponse(
+        status_code=exc.status_code,
+        content=_error_payload(request, exc.status_code, exc.detail),
+        headers=getattr(exc, "headers", None),
+    )
 
 
 @app.exception_handler(RequestValidationError)
@@ -94,3 +164,5 @@ async def unhandled_exception_handler(request: Request, exc: Exception):
 # Routers
 app.include_router(auth_routes.router)
 app.include_router(movies_routes.router)
+app.include_router(movies_routes.transfer_router)
+app.include_router(media_routes.router)
@@ -0,0 +1,33 @@
+from sqlalchemy import DateTime, Float, Index, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from server.db import Base
+
+
+class VideoJob(Base):
+    """Persistent record of a background job; the queue itself (see server/services/jobs.py)."""
+
+    __tablename__ = "video_jobs"
+
+    id: Mapped[str] = mapped_column(String(32), primary_key=True)
+    kind: Mapped[str] = mapped_column(String(32), nullable=False)
+    movie_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    # Lower runs first; ties run oldest first
+    priority: Mapped[int] = mapped_column(Integer, nullable=False, server_default="100")
+    status: Mapped[str] = mapped_column(String(16), nullable=False)
+    stage: Mapped[str] = mapped_column(String(32), nullable=False)
+    progress: Mapped[float] = mapped_column(Float, nullable=False, server_default="0")
+    # JSON: keyword arguments for the kind's handler, and its result once succeeded
+    params: Mapped[str] = mapped_column(Text, nullable=False)
+    result: Mapped[str | None] = mapped_column(Text, nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+
+    created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), nullable=False)
+    started_at: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # Claiming the next job is a range scan over queued rows in run order
+        Index("ix_video_jobs_queue", "status", "priority", "created_at"),
+    )
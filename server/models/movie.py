@@ -1,5 +1,6 @@
+from datetime import datetime, UTC
 from enum import Enum as PyEnum
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Numeric, CheckConstraint, UniqueConstraint, func
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Numeric, CheckConstraint, UniqueConstraint, Index, func
 from sqlalchemy import Enum as SAEnum
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -39,11 +40,17 @@ class Movie(Base):
     is_premium: Mapped[bool] = mapped_column(Boolean, nullable=False, server_default="0")
 
     created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # Set client-side on update: SQLite's now() has 1 s resolution and updated_at versions the row (ETags)
     updated_at: Mapped[DateTime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+        DateTime(timezone=True), server_default=func.now(), onupdate=lambda: datetime.now(UTC), nullable=False
     )
 
     __table_args__ = (
         CheckConstraint("rating IS NULL OR (rating >= 0 AND rating <= 5)", name="ck_movies_rating_range"),
         UniqueConstraint("title", name="uq_movies_title"),
+        # Keyset pagination: each list ordering is a range scan on (sort column, id)
+        Index("ix_movies_created_at_id", "created_at", "id"),
+        Index("ix_movies_rating_id", "rating", "id"),
+        # max(updated_at) validates list responses on every list request
+        Index("ix_movies_updated_at", "updated_at"),
     )
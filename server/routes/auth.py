@@ -1,20 +1,27 @@
 from datetime import datetime, UTC
 from fastapi import APIRouter, Depends, HTTPException, Response, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from server.db import get_db
+from server.db import get_async_db
 from server.schema.user import UserCreate, UserOut
 from server.schema.auth import LoginRequest, AuthResponse
 from server.usecases.auth import signup_user, login_user
 from server.security import set_auth_cookie, clear_auth_cookie, get_current_user
+from server.services.rate_limit import rate_limit
 
-router = APIRouter(prefix="/auth", tags=["auth"])
+router = APIRouter(prefix="/auth", tags=["auth"], dependencies=[Depends(rate_limit("default"))])
 
 
-@router.post("/signup", response_model=AuthResponse, status_code=status.HTTP_201_CREATED)
-def signup(payload: UserCreate, response: Response, db: Session = Depends(get_db)):
+# Password hashing makes signup and login the most CPU-expensive requests per call
+@router.post(
+    "/signup",
+    response_model=AuthResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(rate_limit("auth"))],
+)
+async def signup(payload: UserCreate, response: Response, db: AsyncSession = Depends(get_async_db)):
     try:
-        user, token = signup_user(
+        user, token = await signup_user(
             db,
             email=payload.email,
             name=payload.name,
@@ -35,10 +42,10 @@ def signup(payload: UserCreate, response: Response, db: Session = Depends(get_db
     )
 
 
-@router.post("/login", response_model=AuthResponse)
-def login(payload: LoginRequest, response: Response, db: Session = Depends(get_db)):
+@router.post("/login", response_model=AuthResponse, dependencies=[Depends(rate_limit("auth"))])
+async def login(payload: LoginRequest, response: Response, db: AsyncSession = Depends(get_async_db)):
     try:
-        user, token = login_user(db, email=payload.email, password=payload.password)
+        user, token = await login_user(db, email=payload.email, password=payload.password)
     except ValueError as e:
         if str(e) == "INVALID_CREDENTIALS":
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid email or password")
@@ -54,11 +61,11 @@ def login(payload: LoginRequest, response: Response, db: Session = Depends(get_d
 
 
 @router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
-def logout(response: Response):
+async def logout(response: Response):
     clear_auth_cookie(response)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
 @router.get("/me", response_model=UserOut)
-def me(current_user = Depends(get_current_user)):
+async def me(current_user = Depends(get_current_user)):
     return current_user
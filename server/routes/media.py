@@ -0,0 +1,49 @@
+import os
+from datetime import datetime, UTC
+
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
+
+from server.services.http_cache import entity_tag, http_date, is_not_modified, not_modified
+from server.services.storage import InvalidKey, cache_control_for, media_storage, media_type_for
+
+# Players fetch a segment every few seconds per viewer: no per-client rate limit here
+router = APIRouter(prefix="/media", tags=["media"])
+
+
+@router.api_route("/{key:path}", methods=["GET", "HEAD"], include_in_schema=False)
+async def serve_media(key: str, request: Request):
+    """
+    Serve HLS playlists, segments and other media published to the local storage backend.
+
+    Range requests (single and multiple ranges, If-Range) are answered by FileResponse, which
+    hands the file to the server's zero-copy path (ASGI pathsend) when available and streams it in
+    chunks otherwise. Segments live under a per-publish folder and never change, so they are cached
+    as immutable; playlists get a short max-age. ETag / Last-Modified derive from the file's stat,
+    and If-None-Match / If-Modified-Since get a 304.
+
+    Returns 404 for unknown keys, and for every key when media isn't stored locally.
+
+    Security: Public, like the CDN URLs the other backends hand out.
+    """
+    local = media_storage.local
+    if local is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+    try:
+        path = local.path_for(key)
+        stat = await run_in_threadpool(os.stat, path)
+    except (InvalidKey, FileNotFoundError, NotADirectoryError):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+    if not path.is_file() or path.name.startswith("."):
+        # Directories, and files still being written under a temporary dot-name
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+
+    headers = {
+        "ETag": entity_tag(stat.st_mtime_ns, stat.st_size),
+        "Last-Modified": http_date(datetime.fromtimestamp(stat.st_mtime, UTC)),
+        "Cache-Control": cache_control_for(key),
+    }
+    if is_not_modified(request.headers, headers):
+        return not_modified(headers)
+    return FileResponse(path, headers=headers, media_type=media_type_for(key), stat_result=stat)
@@ -1,101 +1,281 @@
 from datetime import datetime
-from typing import Any
+from typing import Any, AsyncIterator, Literal
 
-import os
+import shutil
 import tempfile
+import time
 from pathlib import Path
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status, Query
-from sqlalchemy.orm import Session
 
-from server.db import get_db
-from server.security import get_current_user
-from server.models.user import User
-from server.models.movie import Movie, MovieGenre
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status, Query, Header, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from server.db import get_async_db
+from server.security import UserPrincipal, get_current_principal, get_current_user
+from server.models.movie import MovieGenre
 from server.schema.movie import (
     MovieCreate,
+    MovieImportReport,
     MovieOut,
     MovieUpdate,
     UpdateMovieResponse,
-    MovieVideoUploadResponse,
 )
-from server.usecases.movies import create_movie, update_movie, get_movie, MovieTitleTaken
-from server.services.hls_transcoder import transcode_to_hls, FFmpegNotFound
-from server.services.cloudinary_uploader import upload_files_as_raw, raw_url_for
-import cloudinary.uploader
+from server.schema.job import JobAccepted, JobOut, JobProgress
+from server.schema.upload import UploadSessionCreate, UploadSessionOut
+from server.usecases.movies import (
+    CATALOG_ROW_FIELDS,
+    catalog_stamp,
+    create_movie,
+    update_movie,
+    get_movie,
+    import_movies,
+    iter_catalog_rows,
+    list_movies,
+    resolve_order,
+    MovieTitleTaken,
+)
+from server.services.jobs import Job, JobNotCancellable, JobNotFound, QueueFull, job_queue
+from server.services.catalog_io import FORMATS, Record, RowError, encode_rows, format_for, parse_records
+from server.services.fastjson import CATALOG_JSON_FAST_PATH, dumps_rows
+from server.services.hls_transcoder import HLS_ENCODING_PROFILE
+from server.services.media_index import media_index
+from server.services.storage import StorageNotConfigured, media_storage
+from server.services.rate_limit import rate_limit
+from server.services.http_cache import entity_tag, is_not_modified, not_modified, validators
+from server.services.response_cache import CachedResponse, catalog_cache
+from server.services.ingest import (
+    IngestResult,
+    UploadTooLarge,
+    ingest_upload,
+    MAX_IMAGE_UPLOAD_BYTES,
+    MAX_TRAILER_UPLOAD_BYTES,
+    MAX_VIDEO_UPLOAD_BYTES,
+)
+from server.services.resumable import (
+    UploadBusy,
+    UploadExceedsLength,
+    UploadIncomplete,
+    UploadOffsetMismatch,
+    UploadSession,
+    UploadSessionNotFound,
+    create_session as create_upload_session,
+    delete_session as delete_upload_session,
+    finalize_session as finalize_upload_session,
+    get_session as get_upload_session,
+    hold_session as hold_upload_session,
+    restore_session as restore_upload_session,
+    write_chunk as write_upload_chunk,
+)
 
-router = APIRouter(prefix="/movies", tags=["movies"])
+router = APIRouter(prefix="/movies", tags=["movies"], dependencies=[Depends(rate_limit("default"))])
+# Resumable upload chunks and job polling: many small requests per upload, drawn from their own
+# budgets instead of the default one
+transfer_router = APIRouter(prefix="/movies", tags=["movies"])
 
 
-def _ensure_admin(user: User):
+def _ensure_admin(user: UserPrincipal):
     if user.role != "admin":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required")
 
 
+_movie_list_adapter = TypeAdapter(list[MovieOut])
+
+
+def _cached_json(request: Request, cached: CachedResponse, *, hit: bool, started: float) -> Response:
+    catalog_cache.stats.record(hit, time.perf_counter() - started)
+    if is_not_modified(request.headers, cached.headers):
+        catalog_cache.stats.not_modified += 1
+        return not_modified(cached.headers)
+    headers = {**cached.headers, "X-Cache": "HIT" if hit else "MISS"}
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+
+async def _validated_records(records: AsyncIterator[Record]) -> AsyncIterator[Record]:
+    # Same rules as POST /movies, row by row
+    async for line, record in records:
+        if isinstance(record, RowError):
+            yield line, record
+            continue
+        try:
+            yield line, MovieCreate.model_validate(record).model_dump()
+        except ValidationError as e:
+            message = "; ".join(f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors())
+            title = record.get("title")
+            yield line, RowError(message, title if isinstance(title, str) else None)
+
+
+def _ingest(file: UploadFile, dest: Path, max_bytes: int) -> IngestResult:
+    # Stream the upload to disk in chunks; never hold the whole file in memory
+    try:
+        return ingest_upload(file.file, str(dest), max_bytes=max_bytes)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    finally:
+        file.file.close()
+
+
 @router.post("", response_model=MovieOut, status_code=status.HTTP_201_CREATED)
-def create_movie_api(
+async def create_movie_api(
     payload: MovieCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
     _ensure_admin(current_user)
     try:
-        movie = create_movie(db, data=payload.model_dump(exclude_unset=True))
+        movie = await create_movie(db, data=payload.model_dump(exclude_unset=True))
     except MovieTitleTaken:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Movie title already exists")
     return MovieOut.model_validate(movie)
 
 
 @router.get("", response_model=list[MovieOut])
-def list_movies_api(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-    q: str | None = Query(None, min_length=1, max_length=255, description="Search by title"),
+async def list_movies_api(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_principal),
+    q: str | None = Query(None, min_length=1, max_length=255, description="Search title and description (prefix match)"),
     genre: MovieGenre | None = Query(None, description="Filter by genre"),
     is_premium: bool | None = Query(None, description="Filter by premium flag"),
     limit: int = Query(20, ge=1, le=100, description="Page size (max 100)"),
-    offset: int = Query(0, ge=0, description="Offset for pagination"),
-    order: str = Query("newest", description="Sort order: newest|oldest|rating_desc|rating_asc"),
+    offset: int = Query(0, ge=0, description="Offset for pagination (ignored when cursor is set)"),
+    cursor: str | None = Query(None, max_length=512, description="Opaque cursor from X-Next-Cursor"),
+    order: str | None = Query(
+        None, description="Sort order: relevance|newest|oldest|rating_desc|rating_asc (default: relevance with q, else newest)"
+    ),
 ):
     """
     List movies.
 
+    The cursor for the next page, if any, is returned in the X-Next-Cursor header. Pages are served
+    from the catalog cache (X-Cache: HIT|MISS) until the next catalog write, and carry an ETag and
+    Last-Modified derived from the catalog's row count and newest updated_at. Those are read from
+    the database on every request, so writes made by other processes are seen: If-None-Match /
+    If-Modified-Since get a 304.
+
     Security: Authenticated users. Admin not required.
     """
-    query = db.query(Movie)
-
-    # Filters
+    started = time.perf_counter()
     if q:
-        query = query.filter(Movie.title.ilike(f"%{q}%"))
-    if genre is not None:
-        query = query.filter(Movie.genre == genre)
-    if is_premium is not None:
-        query = query.filter(Movie.is_premium == is_premium)
-
-    # Ordering
-    if order == "oldest":
-        query = query.order_by(Movie.created_at.asc())
-    elif order == "rating_desc":
-        query = query.order_by(Movie.rating.desc().nullslast())
-    elif order == "rating_asc":
-        query = query.order_by(Movie.rating.asc().nullsfirst())
+        # Search is case-insensitive, so equivalent spellings of q share one cache entry
+        q = " ".join(q.split()).lower() or None
+    stamp = await catalog_stamp(db)
+    key = catalog_cache.list_key(
+        f"{stamp.count}:{stamp.last_modified}",
+        q=q,
+        genre=genre.value if genre else None,
+        is_premium=is_premium,
+        order=resolve_order(order, q),
+        limit=limit,
+        offset=None if cursor else offset,
+        cursor=cursor,
+    )
+    # Lists are versioned by the catalog as a whole, so revalidation needs only the stamp
+    conditional = validators(entity_tag(key), stamp.last_modified)
+    if is_not_modified(request.headers, conditional):
+        catalog_cache.stats.not_modified += 1
+        return not_modified(conditional)
+
+    cached = await catalog_cache.get(key)
+    if cached is not None:
+        return _cached_json(request, cached, hit=True, started=started)
+
+    try:
+        page, next_cursor = await list_movies(
+            db,
+            q=q,
+            genre=genre,
+            is_premium=is_premium,
+            order=order,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+            as_rows=CATALOG_JSON_FAST_PATH,
+        )
+    except ValueError as e:
+        if str(e) == "INVALID_CURSOR":
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        raise
+    if CATALOG_JSON_FAST_PATH:
+        # Column tuples straight to JSON: no ORM hydration, no per-row model validation
+        body = dumps_rows(CATALOG_ROW_FIELDS, page)
     else:
-        query = query.order_by(Movie.created_at.desc())
+        body = _movie_list_adapter.dump_json(_movie_list_adapter.validate_python(page, from_attributes=True))
+    headers = dict(conditional)
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    cached = CachedResponse(body=body, headers=headers)
+    await catalog_cache.set(key, cached.body, cached.headers)
+    return _cached_json(request, cached, hit=False, started=started)
+
+
+@router.post("/import", response_model=MovieImportReport)
+async def import_movies_api(
+    request: Request,
+    format: str | None = Query(None, pattern="^(ndjson|csv)$", description="ndjson|csv (default: from Content-Type)"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_user),
+):
+    """
+    Bulk-create movies from an NDJSON or CSV (header row) request body.
+
+    The body is streamed and parsed as it arrives; rows are validated like POST /movies and
+    inserted in batches, one transaction per batch. Invalid rows and title conflicts are reported
+    per line and don't stop the import. Batches committed before a failure stay in.
+
+    Security: Admin only.
+    """
+    _ensure_admin(current_user)
+    fmt = format_for(request.headers.get("content-type"), format)
+    if fmt is None:
+        raise HTTPException(status_code=415, detail="Send application/x-ndjson or text/csv")
+    try:
+        report = await import_movies(db, _validated_records(parse_records(fmt, request.stream())))
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    return MovieImportReport.model_validate(report)
+
 
-    movies = query.offset(offset).limit(limit).all()
-    return [MovieOut.model_validate(m) for m in movies]
+@router.get("/export")
+async def export_movies_api(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="ndjson|csv"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_user),
+):
+    """
+    Stream the whole catalog as NDJSON or CSV, in id order. The output re-imports through POST /movies/import.
+
+    Security: Admin only.
+    """
+    _ensure_admin(current_user)
+    # The body outlives the request-scoped session: pages are read through their own sessions
+    session_factory = async_sessionmaker(bind=db.bind, expire_on_commit=False)
+
+    async def body():
+        if format == "csv":
+            yield encode_rows(format, CATALOG_ROW_FIELDS, [], header=True)
+        async for rows in iter_catalog_rows(session_factory):
+            yield encode_rows(format, CATALOG_ROW_FIELDS, rows)
+
+    return StreamingResponse(
+        body(),
+        media_type=FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="movies.{format}"'},
+    )
 
 
 @router.put("/{movie_id}", response_model=UpdateMovieResponse)
-def update_movie_api(
+async def update_movie_api(
     movie_id: int,
     payload: MovieUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
     _ensure_admin(current_user)
     try:
-        movie = update_movie(db, movie_id=movie_id, data=payload.model_dump(exclude_unset=True))
+        movie = await update_movie(db, movie_id=movie_id, data=payload.model_dump(exclude_unset=True))
     except ValueError as e:
         if str(e) == "NOT_FOUND":
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Movie not found")
@@ -107,14 +287,17 @@ def update_movie_api(
 
 
 @router.post("/{movie_id}/upload-trailer", response_model=UpdateMovieResponse)
-def upload_movie_trailer_api(
+async def upload_movie_trailer_api(
     movie_id: int,
     file: UploadFile = File(..., description="Trailer video file to upload"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    force: bool = Query(False, description="Upload even if identical content was published before"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
     """
-    Upload a trailer video to Cloudinary and update the movie's trailer_url.
+    Upload a trailer video to media storage and update the movie's trailer_url.
+
+    A trailer whose content (SHA-256) was published before reuses that URL without uploading again.
 
     Security: Admin-only.
     """
@@ -123,37 +306,25 @@ def upload_movie_trailer_api(
     if not file.content_type or not file.content_type.startswith("video/"):
         raise HTTPException(status_code=400, detail="Invalid trailer file type")
 
-    cloud_name = os.getenv("CLOUDINARY_CLOUD_NAME")
-    if not cloud_name or not os.getenv("CLOUDINARY_API_KEY") or not os.getenv("CLOUDINARY_API_SECRET"):
-        raise HTTPException(status_code=500, detail="Cloudinary is not configured on the server")
+    _require_storage()
 
     with tempfile.TemporaryDirectory(prefix="upload_trailer_") as tmpdir:
-        tmp_path = Path(tmpdir) / file.filename
-        try:
-            with tmp_path.open("wb") as f:
-                f.write(file.file.read())
-        finally:
-            file.file.close()
-
-        folder = f"movies/{movie_id}/trailers"
-        public_basename = Path(file.filename).stem
-        try:
-            res = cloudinary.uploader.upload(
-                str(tmp_path),
-                resource_type="video",
-                folder=folder,
-                public_id=public_basename,
-                overwrite=True,
-            )
-        except Exception:
-            raise HTTPException(status_code=502, detail="Failed to upload trailer to Cloudinary")
-
-    url = res.get("secure_url") or res.get("url")
-    if not url:
-        raise HTTPException(status_code=502, detail="Cloudinary did not return a URL for trailer")
+        tmp_path = Path(tmpdir) / Path(file.filename).name
+        ingested = await run_in_threadpool(_ingest, file, tmp_path, MAX_TRAILER_UPLOAD_BYTES)
+
+        published = None if force else media_index.get("trailer", ingested.sha256, media_storage.backend.name)
+        if published is not None:
+            url = published["url"]
+        else:
+            key = f"movies/{movie_id}/trailers/{tmp_path.name}"
+            try:
+                url = await run_in_threadpool(media_storage.put_file, str(tmp_path), key, "video")
+            except Exception:
+                raise HTTPException(status_code=502, detail="Failed to upload trailer to media storage")
+            media_index.put("trailer", ingested.sha256, {"url": url}, media_storage.backend.name)
 
     try:
-        movie = update_movie(db, movie_id=movie_id, data={"trailer_url": url})
+        movie = await update_movie(db, movie_id=movie_id, data={"trailer_url": url})
     except ValueError as e:
         if str(e) == "NOT_FOUND":
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Movie not found")
@@ -163,109 +334,440 @@ def upload_movie_trailer_api(
 
 
 @router.get("/{movie_id}", response_model=MovieOut)
-def get_movie_details_api(
+async def get_movie_details_api(
     movie_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_principal),
 ):
     """
-    Return details for a single movie.
+    Return details for a single movie, served from the catalog cache when possible.
+
+    The ETag and Last-Modified derive from the movie's id and updated_at; If-None-Match /
+    If-Modified-Since get a 304.
 
     Security: Authenticated users. Admin not required.
     """
+    started = time.perf_counter()
+    key = catalog_cache.detail_key(await catalog_cache.version(), movie_id)
+    cached = await catalog_cache.get(key)
+    if cached is not None:
+        return _cached_json(request, cached, hit=True, started=started)
+
     try:
-        movie = get_movie(db, movie_id=movie_id)
+        movie = await get_movie(db, movie_id=movie_id)
     except ValueError as e:
         if str(e) == "NOT_FOUND":
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Movie not found")
         raise
-    return MovieOut.model_validate(movie)
+    conditional = validators(entity_tag(movie.id, movie.updated_at), movie.updated_at)
+    if is_not_modified(request.headers, conditional):
+        # Unchanged for this client: skip serialization
+        catalog_cache.stats.not_modified += 1
+        return not_modified(conditional)
+    cached = CachedResponse(body=MovieOut.model_validate(movie).model_dump_json().encode(), headers=conditional)
+    await catalog_cache.set(key, cached.body, cached.headers)
+    return _cached_json(request, cached, hit=False, started=started)
+
+
+@router.post(
+    "/{movie_id}/upload-video",
+    response_model=JobAccepted,
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(rate_limit("transcode"))],
+)
+async def upload_movie_video_api(
+    movie_id: int,
+    file: UploadFile = File(..., description="Video file to upload"),
+    force: bool = Query(False, description="Transcode and upload even if identical content was published before"),
+    asset: Literal["feature", "trailer"] = Query("feature", description="Publish as the movie's video_url or trailer_url"),
+    profile: Literal["fast_publish", "bandwidth_optimized"] | None = Query(
+        None, description="Encoding profile: publish fast, or spend more CPU for smaller segments"
+    ),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_user),
+):
+    """
+    Accept a source video and queue a background job that converts it to HLS (m3u8 + .ts chunks) via ffmpeg,
+    uploads the assets to media storage and updates the movie's video_url with the playlist URL.
+
+    Returns 202 with the job id; poll GET /movies/{movie_id}/jobs/{job_id} for the outcome.
+    Returns 503 with Retry-After while the transcode queue is full.
+    A source whose content (SHA-256) was published before skips ffmpeg and only updates video_url.
+    With asset=trailer the playlist becomes trailer_url instead; trailer jobs run before queued features.
+    `profile` (default HLS_ENCODING_PROFILE) is stored with the job; the job result reports the
+    encode fps and average bitrate per rendition it produced.
+
+    Security: Admin-only; rate limited per user (transcode budget).
+    """
+    _ensure_admin(current_user)
+
+    _require_storage()
+    await _ensure_movie_exists(db, movie_id)
+    _admit_video_job()
+
+    # Working directory outlives the request; the job removes it when done
+    workdir = tempfile.mkdtemp(prefix="upload_hls_")
+    src_path = Path(workdir) / Path(file.filename).name
+
+    # Save the uploaded file to disk
+    try:
+        ingested = await run_in_threadpool(_ingest, file, src_path, MAX_VIDEO_UPLOAD_BYTES)
+    except HTTPException:
+        shutil.rmtree(workdir, ignore_errors=True)
+        raise
+
+    try:
+        return _enqueue_video_job(
+            movie_id=movie_id,
+            workdir=workdir,
+            src_path=src_path,
+            content_hash=ingested.sha256,
+            force=force,
+            asset=asset,
+            profile=profile,
+        )
+    except QueueFull as e:
+        # Lost the race for the last slot since the admission check
+        shutil.rmtree(workdir, ignore_errors=True)
+        raise _queue_full(e)
+
+
+def _require_storage() -> None:
+    try:
+        media_storage.ensure_configured()
+    except StorageNotConfigured as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def _ensure_movie_exists(db: AsyncSession, movie_id: int) -> None:
+    # Fail fast instead of transcoding for a movie that doesn't exist
+    try:
+        await get_movie(db, movie_id=movie_id)
+    except ValueError as e:
+        if str(e) == "NOT_FOUND":
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Movie not found")
+        raise
+
+
+def _queue_full(e: QueueFull) -> HTTPException:
+    # Server-wide overload rather than this client's quota: 503, not 429
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many videos are being processed, retry later",
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+
+def _admit_video_job() -> None:
+    # Refuse before spending disk and I/O on the source when no transcode slot is free
+    try:
+        job_queue.admit()
+    except QueueFull as e:
+        raise _queue_full(e)
+
 
+# Uploaded asset -> (job kind, movie column the playlist URL is written to)
+_VIDEO_ASSETS = {"feature": ("upload-video", "video_url"), "trailer": ("upload-trailer", "trailer_url")}
 
-@router.post("/{movie_id}/upload-video", response_model=MovieVideoUploadResponse)
-def upload_movie_video_api(
+
+def _enqueue_video_job(
+    *,
     movie_id: int,
-    file: UploadFile = File(..., description="Video file to upload"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    workdir: str,
+    src_path: Path,
+    content_hash: str | None = None,
+    force: bool = False,
+    asset: str = "feature",
+    profile: str | None = None,
+) -> JobAccepted:
+    """
+    Raises:
+        QueueFull: the caller still owns `workdir` and decides what happens to the source.
+    """
+    kind, field = _VIDEO_ASSETS[asset]
+    job = job_queue.submit(
+        kind=kind,
+        movie_id=movie_id,
+        params={
+            "movie_id": movie_id,
+            "src_path": str(src_path),
+            "workdir": workdir,
+            "base_name": src_path.stem,
+            "content_hash": content_hash,
+            "reuse_published": not force,
+            "field": field,
+            # Stored with the job, so a resumed job encodes the way it was requested
+            "profile": profile or HLS_ENCODING_PROFILE,
+        },
+    )
+    return JobAccepted(job_id=job.id, status=job.status, status_url=f"/movies/{movie_id}/jobs/{job.id}")
+
+
+async def _get_movie_job(movie_id: int, job_id: str) -> Job:
+    try:
+        # Finished jobs are read back from the jobs table
+        job = await run_in_threadpool(job_queue.get, job_id)
+    except JobNotFound:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    if job.movie_id != movie_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job
+
+
+@transfer_router.get("/{movie_id}/jobs/{job_id}", response_model=JobOut, dependencies=[Depends(rate_limit("poll"))])
+async def get_movie_job_api(
+    movie_id: int,
+    job_id: str,
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
     """
-    Upload a source video, convert to HLS (m3u8 + .ts chunks) via ffmpeg, upload assets to Cloudinary (raw),
-    update the movie's video_url with the playlist URL, and return it.
+    Return status, progress and (once finished) the result or error of a background job.
+
+    Security: Admin-only; rate limited per user (poll budget).
+    """
+    _ensure_admin(current_user)
+    return JobOut.model_validate(await _get_movie_job(movie_id, job_id))
+
+
+@transfer_router.get(
+    "/{movie_id}/jobs/{job_id}/progress", response_model=JobProgress, dependencies=[Depends(rate_limit("poll"))]
+)
+async def get_movie_job_progress_api(
+    movie_id: int,
+    job_id: str,
+    current_user: UserPrincipal = Depends(get_current_user),
+):
+    """
+    Lightweight progress view of a background job, meant for frequent polling.
+
+    Security: Admin-only; rate limited per user (poll budget).
+    """
+    _ensure_admin(current_user)
+    return JobProgress.model_validate(await _get_movie_job(movie_id, job_id))
+
+
+@router.delete("/{movie_id}/jobs/{job_id}", response_model=JobOut, status_code=status.HTTP_202_ACCEPTED)
+async def cancel_movie_job_api(
+    movie_id: int,
+    job_id: str,
+    current_user: UserPrincipal = Depends(get_current_user),
+):
+    """
+    Cancel a background job. A queued job is cancelled at once; a running one stops at its next
+    checkpoint (poll the job until its status is cancelled). Returns 409 if the job already finished.
 
     Security: Admin-only.
     """
     _ensure_admin(current_user)
+    await _get_movie_job(movie_id, job_id)
+    try:
+        job = await run_in_threadpool(job_queue.cancel, job_id)
+    except JobNotFound:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    except JobNotCancellable:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Job already finished")
+    return JobOut.model_validate(job)
 
-    # Validate env for Cloudinary
-    cloud_name = os.getenv("CLOUDINARY_CLOUD_NAME")
-    print(cloud_name)
-    if not cloud_name or not os.getenv("CLOUDINARY_API_KEY") or not os.getenv("CLOUDINARY_API_SECRET"):
-        raise HTTPException(status_code=500, detail="Cloudinary is not configured on the server")
 
-    # Create temp working directory
-    with tempfile.TemporaryDirectory(prefix="upload_hls_") as tmpdir:
-        tmpdir_path = Path(tmpdir)
-        src_path = tmpdir_path / file.filename
+def _upload_session_out(session: UploadSession) -> UploadSessionOut:
+    try:
+        offset = session.offset
+    except UploadSessionNotFound:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload session not found")
+    return UploadSessionOut(
+        upload_id=session.id,
+        movie_id=session.movie_id,
+        filename=session.filename,
+        length=session.length,
+        offset=offset,
+        upload_url=f"/movies/{session.movie_id}/uploads/{session.id}",
+    )
+
+
+def _get_upload_session(movie_id: int, upload_id: str) -> UploadSession:
+    try:
+        session = get_upload_session(upload_id)
+    except UploadSessionNotFound:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload session not found")
+    if session.movie_id != movie_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload session not found")
+    return session
 
-        # Save the uploaded file to disk
-        try:
-            with src_path.open("wb") as f:
-                f.write(file.file.read())
-        finally:
-            file.file.close()
-
-        # Transcode to HLS
-        base_name = Path(file.filename).stem
-        hls_dir = tmpdir_path / "hls"
-        try:
-            index_path, outputs = transcode_to_hls(str(src_path), str(hls_dir), base_name=base_name)
-        except FFmpegNotFound as e:
-            raise HTTPException(status_code=500, detail=str(e))
-        except Exception:
-            raise HTTPException(status_code=500, detail="ffmpeg failed to process the video")
 
-        # Prepare uploads list (upload m3u8 and .ts)
-        folder = f"movies/{movie_id}/{base_name}"
-        upload_pairs: list[tuple[str, str]] = []
-        for local in outputs:
-            lp = Path(local)
-            upload_pairs.append((str(lp), lp.name))
+@router.post("/{movie_id}/uploads", response_model=UploadSessionOut, status_code=status.HTTP_201_CREATED)
+async def create_upload_session_api(
+    movie_id: int,
+    payload: UploadSessionCreate,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_user),
+):
+    """
+    Start a resumable upload of a source video.
 
-        # Upload to Cloudinary as raw assets
-        try:
-            upload_files_as_raw(upload_pairs, folder=folder)
-        except Exception:
-            raise HTTPException(status_code=502, detail="Failed to upload HLS assets to Cloudinary")
+    Flow: create a session, PUT the bytes in chunks (header Upload-Offset), query the offset after
+    a failure to resume, then POST .../complete to queue the transcode job.
 
-        playlist_filename = Path(index_path).name
-        final_m3u8_url = raw_url_for(cloud_name, folder, playlist_filename)
+    Security: Admin-only.
+    """
+    _ensure_admin(current_user)
+    _require_storage()
+    await _ensure_movie_exists(db, movie_id)
+    if payload.length > MAX_VIDEO_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"Upload exceeds the maximum size of {MAX_VIDEO_UPLOAD_BYTES} bytes")
+
+    session = create_upload_session(movie_id=movie_id, filename=payload.filename, length=payload.length)
+    out = _upload_session_out(session)
+    response.headers["Location"] = out.upload_url
+    return out
+
+
+@transfer_router.api_route(
+    "/{movie_id}/uploads/{upload_id}",
+    methods=["GET", "HEAD"],
+    response_model=UploadSessionOut,
+    dependencies=[Depends(rate_limit("upload"))],
+)
+async def get_upload_session_api(
+    movie_id: int,
+    upload_id: str,
+    response: Response,
+    current_user: UserPrincipal = Depends(get_current_user),
+):
+    """
+    Report how many bytes of a resumable upload have been received (also as Upload-Offset header).
 
-        # Persist URL to DB
-        try:
-            movie = update_movie(db, movie_id=movie_id, data={"video_url": final_m3u8_url})
-        except ValueError as e:
-            if str(e) == "NOT_FOUND":
-                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Movie not found")
-            raise
+    Security: Admin-only; rate limited per user (upload budget).
+    """
+    _ensure_admin(current_user)
+    out = _upload_session_out(_get_upload_session(movie_id, upload_id))
+    response.headers["Upload-Offset"] = str(out.offset)
+    response.headers["Upload-Length"] = str(out.length)
+    response.headers["Cache-Control"] = "no-store"
+    return out
+
+
+@transfer_router.put(
+    "/{movie_id}/uploads/{upload_id}", response_model=UploadSessionOut, dependencies=[Depends(rate_limit("upload"))]
+)
+async def put_upload_chunk_api(
+    movie_id: int,
+    upload_id: str,
+    request: Request,
+    response: Response,
+    upload_offset: int = Header(..., alias="Upload-Offset", ge=0),
+    current_user: UserPrincipal = Depends(get_current_user),
+):
+    """
+    Append the raw request body to a resumable upload at Upload-Offset, which must match the
+    current offset (409 otherwise, with the expected value in the Upload-Offset header).
+
+    Security: Admin-only; rate limited per user (upload budget).
+    """
+    _ensure_admin(current_user)
+    session = _get_upload_session(movie_id, upload_id)
+    try:
+        offset = await write_upload_chunk(session, upload_offset, request.stream())
+    except UploadOffsetMismatch as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e), headers={"Upload-Offset": str(e.expected)})
+    except UploadBusy:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="This upload is being written to or completed")
+    except UploadSessionNotFound:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload session not found")
+    except UploadExceedsLength:
+        raise HTTPException(status_code=413, detail="Chunk exceeds the declared upload length")
+
+    response.headers["Upload-Offset"] = str(offset)
+    return _upload_session_out(session)
+
+
+@router.post(
+    "/{movie_id}/uploads/{upload_id}/complete",
+    response_model=JobAccepted,
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(rate_limit("transcode"))],
+)
+async def complete_upload_session_api(
+    movie_id: int,
+    upload_id: str,
+    force: bool = Query(False, description="Transcode and upload even if identical content was published before"),
+    asset: Literal["feature", "trailer"] = Query("feature", description="Publish as the movie's video_url or trailer_url"),
+    profile: Literal["fast_publish", "bandwidth_optimized"] | None = Query(
+        None, description="Encoding profile: publish fast, or spend more CPU for smaller segments"
+    ),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_user),
+):
+    """
+    Finalize a fully received resumable upload and queue the same background job as upload-video.
+    Returns 503 with Retry-After while the transcode queue is full; the upload is kept for a retry.
+
+    Security: Admin-only; rate limited per user (transcode budget).
+    """
+    _ensure_admin(current_user)
+    _require_storage()
+    session = _get_upload_session(movie_id, upload_id)
+    await _ensure_movie_exists(db, movie_id)
+    _admit_video_job()
+
+    # Held from finalize to delete: a concurrent complete (a client retry) or chunk PUT gets a 409,
+    # and one arriving afterwards finds the session gone (404)
+    try:
+        async with hold_upload_session(session):
+            try:
+                workdir, src_path = finalize_upload_session(session)
+            except UploadIncomplete:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"Upload incomplete: {session.offset} of {session.length} bytes received",
+                )
+            try:
+                accepted = _enqueue_video_job(
+                    movie_id=movie_id, workdir=workdir, src_path=src_path, force=force, asset=asset, profile=profile
+                )
+            except QueueFull as e:
+                # Lost the race for the last slot since the admission check; keep the upload for a retry
+                restore_upload_session(session, workdir, src_path)
+                raise _queue_full(e)
+            delete_upload_session(session)
+    except UploadBusy:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="This upload is being written to or completed")
+    except UploadSessionNotFound:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload session not found")
+    return accepted
+
+
+@router.delete("/{movie_id}/uploads/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_upload_session_api(
+    movie_id: int,
+    upload_id: str,
+    current_user: UserPrincipal = Depends(get_current_user),
+):
+    """
+    Abort a resumable upload and discard the received bytes.
 
-        return MovieVideoUploadResponse(video_url=final_m3u8_url, playlist_filename=playlist_filename)
+    Security: Admin-only.
+    """
+    _ensure_admin(current_user)
+    delete_upload_session(_get_upload_session(movie_id, upload_id))
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
 @router.post("/{movie_id}/upload-thumbnail", response_model=UpdateMovieResponse)
-def upload_movie_thumbnail_api(
+async def upload_movie_thumbnail_api(
     movie_id: int,
     file: UploadFile = File(..., description="Image file to upload as thumbnail"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
     """
-    Upload a thumbnail image to Cloudinary and update the movie's thumbnail_url.
+    Upload a thumbnail image to media storage and update the movie's thumbnail_url.
 
     Steps:
     - Authentication via cookie, Authorization: admin only
-    - Validate file type and Cloudinary env config
-    - Stream to temp, upload to Cloudinary (resource_type=image)
+    - Validate file type and media storage config
+    - Stream to temp, upload to media storage (Cloudinary: resource_type=image)
     - Persist URL to DB and return UpdateMovieResponse
     """
     _ensure_admin(current_user)
@@ -273,37 +775,20 @@ def upload_movie_thumbnail_api(
     if not file.content_type or not file.content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="Invalid thumbnail file type")
 
-    cloud_name = os.getenv("CLOUDINARY_CLOUD_NAME")
-    if not cloud_name or not os.getenv("CLOUDINARY_API_KEY") or not os.getenv("CLOUDINARY_API_SECRET"):
-        raise HTTPException(status_code=500, detail="Cloudinary is not configured on the server")
+    _require_storage()
 
     with tempfile.TemporaryDirectory(prefix="upload_thumb_") as tmpdir:
-        tmp_path = Path(tmpdir) / file.filename
-        try:
-            with tmp_path.open("wb") as f:
-                f.write(file.file.read())
-        finally:
-            file.file.close()
+        tmp_path = Path(tmpdir) / Path(file.filename).name
+        await run_in_threadpool(_ingest, file, tmp_path, MAX_IMAGE_UPLOAD_BYTES)
 
-        folder = f"movies/{movie_id}/thumbnails"
-        public_basename = Path(file.filename).stem
+        key = f"movies/{movie_id}/thumbnails/{tmp_path.name}"
         try:
-            res = cloudinary.uploader.upload(
-                str(tmp_path),
-                resource_type="image",
-                folder=folder,
-                public_id=public_basename,
-                overwrite=True,
-            )
+            url = await run_in_threadpool(media_storage.put_file, str(tmp_path), key, "image")
         except Exception:
-            raise HTTPException(status_code=502, detail="Failed to upload thumbnail to Cloudinary")
-
-    url = res.get("secure_url") or res.get("url")
-    if not url:
-        raise HTTPException(status_code=502, detail="Cloudinary did not return a URL for thumbnail")
+            raise HTTPException(status_code=502, detail="Failed to upload thumbnail to media storage")
 
     try:
-        movie = update_movie(db, movie_id=movie_id, data={"thumbnail_url": url})
+        movie = await update_movie(db, movie_id=movie_id, data={"thumbnail_url": url})
     except ValueError as e:
         if str(e) == "NOT_FOUND":
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Movie not found")
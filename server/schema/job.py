@@ -0,0 +1,31 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+from server.schema.movie import MovieVideoUploadResponse
+
+
+class JobAccepted(BaseModel):
+    job_id: str
+    status: str
+    status_url: str
+
+
+class JobProgress(BaseModel):
+    id: str
+    status: str
+    stage: str
+    progress: float
+
+    model_config = {"from_attributes": True}
+
+
+class JobOut(JobProgress):
+    kind: str
+    movie_id: int
+    error: Optional[str] = None
+    result: Optional[MovieVideoUploadResponse] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
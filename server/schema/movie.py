@@ -53,11 +53,43 @@ class MovieOut(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class MovieImportError(BaseModel):
+    line: int = Field(..., description="Line of the row in the upload (first line for multi-line CSV records)")
+    title: Optional[str] = None
+    error: str
+
+
+class MovieImportReport(BaseModel):
+    inserted: int
+    failed: int
+    errors: list[MovieImportError] = Field(default_factory=list)
+    errors_truncated: bool = Field(False, description="More rows failed than are listed in errors")
+
+
 class UpdateMovieResponse(BaseModel):
     message: str = "Movie updated successfully"
     movie: MovieOut
 
 
+class VariantEncodeStats(BaseModel):
+    average_kbps: float
+    crf: Optional[int] = None
+    maxrate: Optional[str] = None
+
+
+class EncodeStats(BaseModel):
+    profile: str
+    encoder: str
+    complexity: float = Field(description="Source complexity from the probe pass, 1.0 = average")
+    encode_seconds: float
+    media_seconds: float
+    speed: float = Field(description="Media seconds encoded per wall-clock second")
+    encode_fps: Optional[float] = None
+    variants: dict[str, VariantEncodeStats] = Field(default_factory=dict)
+
+
 class MovieVideoUploadResponse(BaseModel):
-    video_url: str
+    video_url: str  # master playlist
     playlist_filename: str
+    renditions: list[str] = Field(default_factory=list, description="Variant names, highest first")
+    encoding: Optional[EncodeStats] = None
@@ -0,0 +1,15 @@
+from pydantic import BaseModel, Field
+
+
+class UploadSessionCreate(BaseModel):
+    filename: str = Field(..., min_length=1, max_length=255)
+    length: int = Field(..., ge=1, description="Total size of the file in bytes")
+
+
+class UploadSessionOut(BaseModel):
+    upload_id: str
+    movie_id: int
+    filename: str
+    length: int
+    offset: int
+    upload_url: str
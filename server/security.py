@@ -1,14 +1,17 @@
 import os
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta, UTC
-from typing import Optional
+from typing import Any, Dict, Optional, Tuple
 
 from fastapi import Depends, HTTPException, Request, Response, status
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from server.db import get_db
+from server.db import get_async_db
 from server.models.user import User
+from server.services.passwords import hash_password, needs_rehash, password_hasher, verify_password  # noqa: F401
+from server.services.user_cache import user_cache
 
 # Configuration (env override supported)
 SECRET_KEY = os.getenv("SECRET_KEY", "CHANGE_ME_DEV_ONLY_SECRET")
@@ -17,21 +20,14 @@ ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", str(6
 COOKIE_NAME = os.getenv("JWT_COOKIE_NAME", "access_token")
 COOKIE_SECURE = os.getenv("JWT_COOKIE_SECURE", "true").lower() == "true"
 COOKIE_SAMESITE = os.getenv("JWT_COOKIE_SAMESITE", "none")
+# Embed the user's role in issued tokens so read-only routes can authorize without a DB lookup
+JWT_ROLE_CLAIM = os.getenv("JWT_ROLE_CLAIM", "false").lower() == "true"
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
-
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
-
-
-def create_access_token(subject: str, expires_delta: Optional[timedelta] = None) -> str:
+def create_access_token(subject: str, expires_delta: Optional[timedelta] = None, *, role: Optional[str] = None) -> str:
     expire = datetime.now(UTC) + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode = {"sub": subject, "exp": expire}
+    to_encode: Dict[str, Any] = {"sub": subject, "exp": expire}
+    if role is not None and JWT_ROLE_CLAIM:
+        to_encode["role"] = role
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
@@ -61,23 +57,92 @@ def _extract_token_from_cookie(request: Request) -> Optional[str]:
     return request.cookies.get(COOKIE_NAME)
 
 
-async def get_current_user(
-    request: Request,
-    db: Session = Depends(get_db),
-) -> User:
+@dataclass(frozen=True)
+class UserPrincipal:
+    """
+    Authenticated caller as seen by the routes: a detached, immutable snapshot of the User row.
+
+    Principals built from token claims alone only carry `id` and `role`.
+    """
+
+    id: int
+    role: str
+    email: Optional[str] = None
+    name: Optional[str] = None
+    profile_picture: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserPrincipal":
+        return cls(
+            id=user.id,
+            role=user.role,
+            email=user.email,
+            name=user.name,
+            profile_picture=user.profile_picture,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+        )
+
+
+def _decode_request_token(request: Request) -> Tuple[str, int, Dict[str, Any]]:
     token = _extract_token_from_cookie(request)
-    print(request.cookies)
     if not token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-    except JWTError:
+        user_id = int(payload.get("sub"))
+    except (JWTError, TypeError, ValueError):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    return token, user_id, payload
+
+
+def optional_token_subject(request: Request) -> Optional[int]:
+    """User id of a valid access token on the request, or None; never raises."""
+    token = _extract_token_from_cookie(request)
+    if not token:
+        return None
+    try:
+        return int(jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("sub"))
+    except (JWTError, TypeError, ValueError):
+        return None
+
 
-    user = db.query(User).filter(User.id == int(user_id)).first()
+async def _resolve_user(db: AsyncSession, token: str, user_id: int, payload: Dict[str, Any]) -> UserPrincipal:
+    principal = user_cache.get(user_id, token)
+    if principal is not None:
+        return principal
+
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-    return user
+    principal = UserPrincipal.from_user(user)
+    exp = payload.get("exp")
+    user_cache.set(user_id, token, principal, token_expires_in=(exp - time.time()) if exp else None)
+    return principal
+
+
+async def get_current_user(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+) -> UserPrincipal:
+    token, user_id, payload = _decode_request_token(request)
+    return await _resolve_user(db, token, user_id, payload)
+
+
+async def get_current_principal(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+) -> UserPrincipal:
+    """
+    Lightweight dependency for read-only routes.
+
+    Tokens carrying a role claim (JWT_ROLE_CLAIM) are authorized from the claims alone, with no DB
+    round trip; the role is then as fresh as the token. Other tokens fall back to `get_current_user`.
+    """
+    token, user_id, payload = _decode_request_token(request)
+    role = payload.get("role")
+    if role is not None:
+        return UserPrincipal(id=user_id, role=role)
+    return await _resolve_user(db, token, user_id, payload)
@@ -0,0 +1,142 @@
+import codecs
+import csv
+import io
+import json
+import os
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, AsyncIterator, Dict, Iterable, NamedTuple, Optional, Sequence, Tuple, Union
+
+from server.services.fastjson import dumps
+from server.services.ingest import UploadTooLarge
+
+# Configuration (env override supported)
+BULK_IMPORT_BATCH_SIZE = int(os.getenv("BULK_IMPORT_BATCH_SIZE", "1000"))
+MAX_IMPORT_UPLOAD_BYTES = int(os.getenv("MAX_IMPORT_UPLOAD_BYTES", str(256 * 1024 * 1024)))
+IMPORT_MAX_REPORTED_ERRORS = int(os.getenv("IMPORT_MAX_REPORTED_ERRORS", "1000"))
+
+FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+class RowError(NamedTuple):
+    """A rejected import row; `title` when it could be read."""
+
+    message: str
+    title: Optional[str] = None
+
+
+# (line number, parsed record or why it was rejected)
+Record = Tuple[int, Union[Dict[str, Any], RowError]]
+
+
+def format_for(content_type: Optional[str], requested: Optional[str] = None) -> Optional[str]:
+    """Resolve "ndjson" | "csv" from an explicit format or the Content-Type; None if unsupported."""
+    if requested:
+        return requested if requested in FORMATS else None
+    media = (content_type or "").split(";")[0].strip().lower()
+    if media in ("application/x-ndjson", "application/jsonl", "application/ndjson"):
+        return "ndjson"
+    if media in ("text/csv", "application/csv"):
+        return "csv"
+    return None
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], *, max_bytes: int = MAX_IMPORT_UPLOAD_BYTES) -> AsyncIterator[str]:
+    """
+    Split a streamed UTF-8 body into lines (without terminators) as it arrives.
+
+    Raises:
+        UploadTooLarge: once more than `max_bytes` have been received.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    received = 0
+    async for chunk in chunks:
+        received += len(chunk)
+        if received > max_bytes:
+            raise UploadTooLarge(max_bytes)
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+async def parse_ndjson(lines: AsyncIterator[str]) -> AsyncIterator[Record]:
+    line_no = 0
+    async for line in lines:
+        line_no += 1
+        if not line.strip():
+            continue
+        try:
+            value = json.loads(line)
+        except ValueError as e:
+            yield line_no, RowError(f"Invalid JSON: {e.msg}")
+            continue
+        yield line_no, value if isinstance(value, dict) else RowError("Expected a JSON object")
+
+
+async def parse_csv(lines: AsyncIterator[str]) -> AsyncIterator[Record]:
+    """
+    Parse CSV with a header row. Empty cells become None so optional fields validate as missing.
+
+    Quoted fields may span lines: physical lines are joined until the quotes balance, and records
+    are numbered by their first line.
+    """
+    header: Optional[Sequence[str]] = None
+    record, start, line_no = "", 0, 0
+    async for line in lines:
+        line_no += 1
+        if not record:
+            start = line_no
+        record = f"{record}\n{line}" if record else line
+        if record.count('"') % 2:
+            continue
+        text, record = record, ""
+        if not text.strip():
+            continue
+        try:
+            fields = next(csv.reader([text], strict=True))
+        except csv.Error as e:
+            yield start, RowError(f"Invalid CSV: {e}")
+            continue
+        if header is None:
+            header = [name.strip() for name in fields]
+            continue
+        if len(fields) != len(header):
+            yield start, RowError(f"Expected {len(header)} columns, got {len(fields)}")
+            continue
+        yield start, {name: (value if value != "" else None) for name, value in zip(header, fields)}
+    if record:
+        yield start, RowError("Invalid CSV: unterminated quoted field")
+
+
+def parse_records(fmt: str, chunks: AsyncIterator[bytes], *, max_bytes: int = MAX_IMPORT_UPLOAD_BYTES) -> AsyncIterator[Record]:
+    lines = iter_lines(chunks, max_bytes=max_bytes)
+    return parse_ndjson(lines) if fmt == "ndjson" else parse_csv(lines)
+
+
+def _csv_value(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, Enum):
+        return str(value.value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def encode_rows(fmt: str, fields: Sequence[str], rows: Iterable[Sequence[Any]], *, header: bool = False) -> bytes:
+    """Encode column tuples as NDJSON lines or CSV records (optionally preceded by the header row)."""
+    if fmt == "ndjson":
+        return b"".join(dumps(dict(zip(fields, row))) + b"\n" for row in rows)
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    if header:
+        writer.writerow(fields)
+    writer.writerows([_csv_value(v) for v in row] for row in rows)
+    return buf.getvalue().encode()
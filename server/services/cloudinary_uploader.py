@@ -1,10 +1,21 @@
+import logging
 import os
 import pathlib
-from typing import Iterable, Tuple
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Iterable, List, Optional, Tuple
 
 import cloudinary
 import cloudinary.uploader
+from cloudinary import utils as cloudinary_utils
+from cloudinary.exceptions import AlreadyExists, AuthorizationRequired, BadRequest, NotAllowed, NotFound
 
+if TYPE_CHECKING:
+    from server.services.storage import StorageBackend
+
+logger = logging.getLogger("uvicorn.error")
 
 # Initialize Cloudinary config from environment variables
 # Required envs: CLOUDINARY_CLOUD_NAME, CLOUDINARY_API_KEY, CLOUDINARY_API_SECRET
@@ -15,27 +26,229 @@ cloudinary.config(
     secure=True,
 )
 
+# Upload tuning (env override supported)
+UPLOAD_CONCURRENCY = int(os.getenv("CLOUDINARY_UPLOAD_CONCURRENCY", "8"))
+UPLOAD_MAX_ATTEMPTS = int(os.getenv("CLOUDINARY_UPLOAD_MAX_ATTEMPTS", "4"))
+UPLOAD_BACKOFF_SECONDS = float(os.getenv("CLOUDINARY_UPLOAD_BACKOFF_SECONDS", "0.5"))
+
+# Client errors that will not succeed on retry
+PERMANENT_ERRORS = (BadRequest, AuthorizationRequired, NotAllowed, NotFound, AlreadyExists)
+
+# The SDK sends every upload through one module-level urllib3 manager, `cloudinary.uploader._http`
+# (relied on as of cloudinary 1.46; the SDK has no public option to pass a pool). It keeps a single
+# idle connection per host, so concurrent uploads would open and discard a socket each time.
+# `ensure_http_pool` swaps in a manager sized to the concurrency that blocks when exhausted, so
+# every worker reuses a persistent keep-alive connection. It is built on first use from the
+# configuration current then, and rebuilt when the connection settings change.
+_HTTP_POOL_SETTINGS = ("api_proxy", "disable_tcp_keep_alive")
+_http_pool_lock = threading.Lock()
+_http_pool_key: Optional[tuple] = None
+
+
+def ensure_http_pool() -> None:
+    """Install the sized connection pool into the SDK, (re)built for the current configuration."""
+    global _http_pool_key
+    config = cloudinary.config()
+    key = tuple(getattr(config, name, None) for name in _HTTP_POOL_SETTINGS)
+    with _http_pool_lock:
+        if key == _http_pool_key:
+            return
+        _http_pool_key = key
+        if not hasattr(cloudinary.uploader, "_http"):
+            # A newer SDK manages connections differently: keep its own
+            logger.warning("cloudinary.uploader._http not found; uploads use the SDK's default connection pool")
+            return
+        cloudinary.uploader._http = cloudinary_utils.get_http_connector(
+            config, {**cloudinary.CERT_KWARGS, "maxsize": UPLOAD_CONCURRENCY, "block": True}
+        )
+
+
+class UploadBatchStats:
+    """Throughput and latency summary for one batch of uploads."""
+
+    def __init__(self):
+        self.files = 0
+        self.bytes = 0
+        self.retries = 0
+        self.latencies: List[float] = []
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, size: int, latency: float, retries: int) -> None:
+        with self._lock:
+            self.files += 1
+            self.bytes += size
+            self.retries += retries
+            self.latencies.append(latency)
+
+    def finish(self) -> "UploadBatchStats":
+        self.elapsed = time.perf_counter() - self.started
+        return self
+
+    @property
+    def bytes_per_sec(self) -> float:
+        return self.bytes / self.elapsed if self.elapsed > 0 else 0.0
+
+    def _percentile(self, q: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def summary(self) -> dict:
+        return {
+            "files": self.files,
+            "bytes": self.bytes,
+            "retries": self.retries,
+            "elapsed_s": round(self.elapsed, 3),
+            "bytes_per_sec": round(self.bytes_per_sec, 1),
+            "latency_p50_ms": round(self._percentile(0.50) * 1000, 1),
+            "latency_p95_ms": round(self._percentile(0.95) * 1000, 1),
+            "latency_max_ms": round(max(self.latencies, default=0.0) * 1000, 1),
+        }
+
+
+def upload_raw(local_path: str, folder: str, public_basename: str) -> None:
+    """Upload a file as a raw resource with public id f"{folder}/{public_basename}", replacing any previous one."""
+    ensure_http_pool()
+    cloudinary.uploader.upload(
+        local_path,
+        resource_type="raw",
+        folder=folder,
+        public_id=public_basename,  # will be combined with folder
+        overwrite=True,
+    )
+
+
+class ParallelUploader:
+    """
+    Bounded-concurrency raw uploader for one folder, to Cloudinary or the given storage backend.
+
+    Media files are submitted as they become available and upload in parallel; playlists are
+    passed to `finish`, which uploads them only after every submitted file succeeded, so a
+    published manifest never references a missing segment.
+    """
+
+    def __init__(
+        self,
+        folder: str,
+        *,
+        max_workers: int = UPLOAD_CONCURRENCY,
+        max_attempts: int = UPLOAD_MAX_ATTEMPTS,
+        backoff: float = UPLOAD_BACKOFF_SECONDS,
+        on_uploaded: Optional[Callable[[int, int], None]] = None,
+        storage: Optional["StorageBackend"] = None,
+    ):
+        self.folder = folder
+        self.storage = storage
+        self.permanent_errors = storage.permanent_errors if storage is not None else PERMANENT_ERRORS
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.on_uploaded = on_uploaded
+        self.stats = UploadBatchStats()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="upload")
+        self._futures: List[Future] = []
+        self._expected = 0
+        self._lock = threading.Lock()
+
+    def expect(self, total: int) -> None:
+        """Set the total used for progress callbacks when it is known up front."""
+        self._expected = total
+
+    def submit(self, local_path: str, public_basename: str) -> Future:
+        future = self._executor.submit(self._upload_with_retry, local_path, public_basename)
+        with self._lock:
+            self._futures.append(future)
+        return future
+
+    def _upload_with_retry(self, local_path: str, public_basename: str) -> None:
+        size = pathlib.Path(local_path).stat().st_size
+        start = time.perf_counter()
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                if self.storage is None:
+                    upload_raw(local_path, self.folder, public_basename)
+                else:
+                    self.storage.put_file(local_path, f"{self.folder}/{public_basename}")
+                break
+            except self.permanent_errors:
+                raise
+            except Exception as e:
+                if attempt == self.max_attempts:
+                    raise
+                # Exponential backoff with jitter
+                delay = self.backoff * (2 ** (attempt - 1)) * (0.5 + random.random())
+                logger.warning("Upload of %s failed (attempt %d): %s; retrying in %.2fs", public_basename, attempt, e, delay)
+                time.sleep(delay)
+        self.stats.record(size, time.perf_counter() - start, attempt - 1)
+        if self.on_uploaded is not None:
+            # total is 0 while it is still unknown (e.g. segments streamed from a running encoder)
+            self.on_uploaded(self.stats.files, self._expected)
+
+    def cancel(self) -> None:
+        """Drop queued uploads and release the workers without publishing anything else."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def finish(self, playlists: Iterable[Tuple[str, str]] = ()) -> UploadBatchStats:
+        """
+        Wait for submitted uploads, then upload `playlists` in order (master last).
+
+        Raises the first upload error; playlists are not uploaded in that case.
+        """
+        try:
+            for future in list(self._futures):
+                future.result()
+            for local_path, public_basename in playlists:
+                self._upload_with_retry(local_path, public_basename)
+        finally:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+        self.stats.finish()
+        logger.info("Uploaded batch to %s: %s", self.folder, self.stats.summary())
+        return self.stats
+
+
+def order_playlists(paths: Iterable[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """Order playlists so variant playlists come before master playlists (those listing variants)."""
+
+    def is_master(local_path: str) -> bool:
+        try:
+            return "#EXT-X-STREAM-INF" in pathlib.Path(local_path).read_text(errors="ignore")
+        except OSError:
+            return False
+
+    return sorted(paths, key=lambda pair: is_master(pair[0]))
+
 
 def upload_files_as_raw(
     files: Iterable[Tuple[str, str]],
     folder: str,
-) -> None:
+    on_uploaded: Optional[Callable[[int, int], None]] = None,
+    max_workers: int = UPLOAD_CONCURRENCY,
+) -> UploadBatchStats:
     """
     Upload multiple files to Cloudinary as raw resources under the same folder.
 
+    Segments upload concurrently with per-file retry; .m3u8 playlists upload last.
+
     Args:
         files: Iterable of (local_path, public_id_basename). The final public_id will be f"{folder}/{public_id_basename}".
         folder: Folder prefix in Cloudinary.
+        on_uploaded: Optional callback invoked as (uploaded_count, total) after each file.
+        max_workers: Maximum number of concurrent uploads.
+
+    Returns:
+        Throughput and latency stats for the batch.
     """
-    for local_path, public_basename in files:
-        public_id = f"{folder}/{public_basename}"
-        cloudinary.uploader.upload(
-            local_path,
-            resource_type="raw",
-            folder=folder,
-            public_id=public_basename,  # will be combined with folder
-            overwrite=True,
-        )
+    files = list(files)
+    playlists = [pair for pair in files if pair[0].endswith(".m3u8")]
+    media = [pair for pair in files if not pair[0].endswith(".m3u8")]
+
+    uploader = ParallelUploader(folder, max_workers=max_workers, on_uploaded=on_uploaded)
+    uploader.expect(len(files))
+    for local_path, public_basename in media:
+        uploader.submit(local_path, public_basename)
+    return uploader.finish(order_playlists(playlists))
 
 
 def raw_url_for(cloud_name: str, folder: str, filename: str) -> str:
@@ -0,0 +1,43 @@
+import json
+import os
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Iterable, Sequence
+
+try:
+    import orjson  # type: ignore
+except ImportError:
+    # Optional speedup; the stdlib encoder produces the same JSON, only slower
+    orjson = None
+
+# Configuration (env override supported): serve catalog lists from column tuples instead of ORM objects
+CATALOG_JSON_FAST_PATH = os.getenv("CATALOG_JSON_FAST_PATH", "true").lower() == "true"
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        text = value.isoformat()
+        return text[:-6] + "Z" if text.endswith("+00:00") else text
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value: Any) -> bytes:
+    """
+    Encode to compact JSON bytes, matching pydantic's output for the types catalog rows contain
+    (datetimes in ISO 8601 with "Z" for UTC, enums by value, decimals as floats).
+    """
+    if orjson is not None:
+        return orjson.dumps(value, default=_default, option=orjson.OPT_UTC_Z)
+    return json.dumps(value, default=_default, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def dumps_rows(fields: Sequence[str], rows: Iterable[Sequence[Any]]) -> bytes:
+    """Encode column tuples as a JSON array of objects keyed by `fields`."""
+    return dumps([dict(zip(fields, row)) for row in rows])
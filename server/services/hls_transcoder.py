@@ -1,14 +1,132 @@
+import json
+import math
+import multiprocessing
 import os
+import shutil
 import subprocess
 import tempfile
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, wait
 from pathlib import Path
-from typing import List, Tuple
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Sequence, Set, Tuple
 
 
 class FFmpegNotFound(Exception):
     pass
 
 
+class TranscodeCancelled(Exception):
+    pass
+
+
+class Rendition(NamedTuple):
+    """One rung of the adaptive-bitrate ladder."""
+
+    name: str
+    height: int
+    video_bitrate: str
+    maxrate: str
+    bufsize: str
+    audio_bitrate: str
+
+
+# Known rungs, highest first. Bitrate caps follow common h264 VOD ladders.
+RENDITION_PRESETS = {
+    "1080p": Rendition("1080p", 1080, "5000k", "5350k", "7500k", "192k"),
+    "720p": Rendition("720p", 720, "2800k", "2996k", "4200k", "128k"),
+    "480p": Rendition("480p", 480, "1400k", "1498k", "2100k", "128k"),
+    "360p": Rendition("360p", 360, "800k", "856k", "1200k", "96k"),
+}
+
+
+class Encoder(NamedTuple):
+    """An H.264 encoder and how it spells constant-quality rate control and speed presets."""
+
+    name: str
+    quality_option: str
+    # Encoding profile name -> the encoder's own speed preset
+    presets: Mapping[str, str]
+    extra_args: Tuple[str, ...] = ()
+
+
+# Profiles map to comparable speed points on each encoder; pick one with HLS_VIDEO_ENCODER
+ENCODERS = {
+    "libx264": Encoder("libx264", "crf", {"fast_publish": "veryfast", "bandwidth_optimized": "slow"}),
+    "h264_nvenc": Encoder(
+        "h264_nvenc", "cq", {"fast_publish": "p2", "bandwidth_optimized": "p6"}, ("-rc", "vbr", "-b:v", "0")
+    ),
+    "h264_qsv": Encoder("h264_qsv", "global_quality", {"fast_publish": "veryfast", "bandwidth_optimized": "slower"}),
+}
+
+
+class EncodingProfile(NamedTuple):
+    """Trade-off between encode time and delivered bytes."""
+
+    name: str
+    # Constant-quality target for content of average complexity (x264 CRF scale)
+    crf: int
+    # Scales the ladder's maxrate/bufsize caps
+    maxrate_factor: float
+
+
+ENCODING_PROFILES = {
+    # Publish quickly at the ladder's full caps
+    "fast_publish": EncodingProfile("fast_publish", 23, 1.0),
+    # Several times the CPU per frame for noticeably smaller segments, under tighter caps
+    "bandwidth_optimized": EncodingProfile("bandwidth_optimized", 25, 0.8),
+}
+
+
+class RenditionEncoding(NamedTuple):
+    """Rate control chosen for one rung of a given source."""
+
+    rendition: Rendition
+    crf: int
+    maxrate: str
+    bufsize: str
+
+
+# Configuration (env override supported), e.g. HLS_LADDER="720p,480p" or "540p:540:1200k"
+HLS_LADDER = os.getenv("HLS_LADDER", "1080p,720p,480p,360p")
+HLS_VIDEO_ENCODER = os.getenv("HLS_VIDEO_ENCODER", "libx264")
+HLS_ENCODING_PROFILE = os.getenv("HLS_ENCODING_PROFILE", "fast_publish")
+# Per-title tuning: seconds of source encoded by the complexity probe (0 disables it)
+HLS_PROBE_SECONDS = int(os.getenv("HLS_PROBE_SECONDS", "20"))
+# Probe bitrate (360p, ultrafast, CRF 23) of content with average complexity
+PROBE_REFERENCE_KBPS = 600
+# Threads one ffmpeg run may use (encoders and filter graph); the job queue sizes its workers by it
+FFMPEG_THREADS = int(os.getenv("FFMPEG_THREADS", str(min(4, os.cpu_count() or 1))))
+# Segment-parallel mode: target chunk length (rounded to whole segments) and concurrent chunk encodes
+HLS_CHUNK_SECONDS = int(os.getenv("HLS_CHUNK_SECONDS", "60"))
+HLS_CHUNK_WORKERS = int(os.getenv("HLS_CHUNK_WORKERS", str(FFMPEG_THREADS)))
+
+
+def parse_ladder(spec: str) -> List[Rendition]:
+    """
+    Parse a comma separated ladder spec into renditions, highest first.
+
+    Each entry is either a preset name ("720p") or "name:height:video_bitrate" for a custom rung,
+    whose maxrate/bufsize are derived from the bitrate (x1.07 / x1.5).
+    """
+    ladder: List[Rendition] = []
+    for entry in (e.strip() for e in spec.split(",")):
+        if not entry:
+            continue
+        if entry in RENDITION_PRESETS:
+            ladder.append(RENDITION_PRESETS[entry])
+            continue
+        parts = entry.split(":")
+        if len(parts) != 3 or not parts[1].isdigit() or not parts[2].endswith("k") or not parts[2][:-1].isdigit():
+            raise ValueError(f"Invalid HLS ladder entry: {entry!r}")
+        kbps = int(parts[2][:-1])
+        ladder.append(
+            Rendition(parts[0], int(parts[1]), f"{kbps}k", f"{int(kbps * 1.07)}k", f"{int(kbps * 1.5)}k", "128k")
+        )
+    if not ladder:
+        raise ValueError("HLS ladder is empty")
+    return sorted(ladder, key=lambda r: r.height, reverse=True)
+
+
 def ensure_ffmpeg() -> None:
     from shutil import which
 
@@ -16,55 +134,314 @@ def ensure_ffmpeg() -> None:
         raise FFmpegNotFound("ffmpeg binary not found in PATH. Please install ffmpeg.")
 
 
-def transcode_to_hls(
+def probe_source(input_path: str) -> Tuple[Optional[int], bool]:
+    """
+    Return (video_height, has_audio) for a source file using ffprobe.
+
+    Falls back to (None, True) when ffprobe is unavailable or fails, which keeps the full ladder.
+    """
+    from shutil import which
+
+    if which("ffprobe") is None:
+        return None, True
+    try:
+        proc = subprocess.run(
+            ["ffprobe", "-v", "error", "-show_entries", "stream=codec_type,height", "-of", "json", input_path],
+            check=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        streams = json.loads(proc.stdout or b"{}").get("streams", [])
+    except (subprocess.CalledProcessError, ValueError):
+        return None, True
+    heights = [s["height"] for s in streams if s.get("codec_type") == "video" and s.get("height")]
+    has_audio = any(s.get("codec_type") == "audio" for s in streams)
+    return (max(heights) if heights else None), has_audio
+
+
+def select_renditions(ladder: Sequence[Rendition], source_height: Optional[int]) -> List[Rendition]:
+    """Drop rungs that would upscale the source, always keeping at least the smallest one."""
+    if source_height is None:
+        return list(ladder)
+    kept = [r for r in ladder if r.height <= source_height]
+    return kept or [min(ladder, key=lambda r: r.height)]
+
+
+def get_encoder(name: str) -> Encoder:
+    if name not in ENCODERS:
+        raise ValueError(f"Unsupported video encoder {name!r}, expected one of {sorted(ENCODERS)}")
+    return ENCODERS[name]
+
+
+def _kbps(rate: str) -> int:
+    return int(rate[:-1])
+
+
+def tune_renditions(
+    ladder: Sequence[Rendition], complexity: float = 1.0, profile: str = HLS_ENCODING_PROFILE
+) -> List[RenditionEncoding]:
+    """
+    Per-title rate control: CRF and VBV caps for every rung, given the source's complexity
+    (1.0 = average, see `probe_complexity`).
+
+    Busy content gets up to +4 CRF so it stays near its caps instead of hitting them constantly;
+    simple content gets a lower CRF and caps scaled down with its complexity (to 40% at most),
+    since it never needs the ladder's full bitrate.
+    """
+    if profile not in ENCODING_PROFILES:
+        raise ValueError(f"Unknown encoding profile {profile!r}, expected one of {sorted(ENCODING_PROFILES)}")
+    p = ENCODING_PROFILES[profile]
+    c = min(4.0, max(0.25, complexity))
+    crf = min(30, max(18, p.crf + round(2 * math.log2(c))))
+    cap = min(1.0, max(0.4, c)) * p.maxrate_factor
+    return [
+        RenditionEncoding(r, crf, f"{int(_kbps(r.maxrate) * cap)}k", f"{int(_kbps(r.bufsize) * cap)}k")
+        for r in ladder
+    ]
+
+
+def probe_complexity(input_path: str, sample_seconds: int = HLS_PROBE_SECONDS) -> float:
+    """
+    Fast complexity probe: encode the first `sample_seconds` at 360p with x264 ultrafast at a fixed
+    CRF and compare the resulting bitrate with PROBE_REFERENCE_KBPS. Runs in a few seconds whatever
+    encoder does the real pass.
+
+    Returns:
+        Complexity relative to average content; 1.0 when disabled or ffmpeg fails.
+    """
+    from shutil import which
+
+    if sample_seconds <= 0 or which("ffmpeg") is None:
+        return 1.0
+    with tempfile.TemporaryDirectory(prefix="hls_probe_") as tmpdir:
+        sample = Path(tmpdir) / "probe.mkv"
+        try:
+            subprocess.run(
+                [
+                    "ffmpeg", "-y", "-t", str(sample_seconds), "-i", input_path, "-map", "0:v:0", "-an",
+                    "-vf", "scale=-2:360", "-c:v", "libx264", "-preset", "ultrafast", "-crf", "23",
+                    "-threads", str(FFMPEG_THREADS), str(sample),
+                ],
+                check=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            )
+        except subprocess.CalledProcessError:
+            return 1.0
+        duration = probe_duration(str(sample))
+        if not duration:
+            return 1.0
+        kbps = sample.stat().st_size * 8 / 1000 / duration
+    return round(kbps / PROBE_REFERENCE_KBPS, 3)
+
+
+def _ffprobe_entry(input_path: str, args: Sequence[str]) -> Optional[str]:
+    from shutil import which
+
+    if which("ffprobe") is None:
+        return None
+    try:
+        proc = subprocess.run(
+            ["ffprobe", "-v", "error", *args, "-of", "default=noprint_wrappers=1:nokey=1", input_path],
+            check=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+    except subprocess.CalledProcessError:
+        return None
+    value = proc.stdout.decode().strip().splitlines()
+    return value[0] if value and value[0] not in ("", "N/A") else None
+
+
+def probe_duration(input_path: str) -> Optional[float]:
+    """Container duration in seconds, or None when unknown."""
+    value = _ffprobe_entry(input_path, ["-show_entries", "format=duration"])
+    return float(value) if value else None
+
+
+def probe_frame_rate(input_path: str) -> Optional[float]:
+    """Average frame rate of the first video stream, or None when unknown."""
+    value = _ffprobe_entry(input_path, ["-select_streams", "v:0", "-show_entries", "stream=avg_frame_rate"])
+    if not value:
+        return None
+    num, _, den = value.partition("/")
+    try:
+        rate = float(num) / float(den or 1)
+    except (ValueError, ZeroDivisionError):
+        return None
+    return rate or None
+
+
+def build_hls_command(
     input_path: str,
     output_dir: str,
     base_name: str,
+    ladder: Sequence[Rendition],
     segment_time: int = 6,
-) -> Tuple[str, List[str]]:
+    has_audio: bool = True,
+    hls_flags: Optional[str] = None,
+    threads: int = FFMPEG_THREADS,
+    output_ts_offset: Optional[float] = None,
+    profile: str = HLS_ENCODING_PROFILE,
+    complexity: float = 1.0,
+    encoder: str = HLS_VIDEO_ENCODER,
+) -> List[str]:
     """
-    Transcode a video into HLS format using ffmpeg.
+    Build a single ffmpeg invocation that decodes the source once, scales it to every rung
+    and writes per-variant playlists plus a master playlist named f"{base_name}.m3u8".
 
-    Args:
-        input_path: Local path to the source video file.
-        output_dir: Directory where HLS outputs should be written.
-        base_name: Base filename (without extension) for output assets.
-        segment_time: Segment duration in seconds.
+    `threads` caps the encoder and filter graph thread pools; left alone, ffmpeg sizes them to
+    every core, so concurrent jobs oversubscribe the host. `output_ts_offset` shifts output
+    timestamps, so a chunk of a longer source continues where the previous one ended.
 
-    Returns:
-        (index_path, all_output_files)
+    Video uses capped constant quality: a CRF per rung plus a VBV maxrate, both from
+    `tune_renditions` for the source's `complexity` under `profile`.
     """
-    ensure_ffmpeg()
-
+    enc = get_encoder(encoder)
+    encodings = tune_renditions(ladder, complexity, profile)
     out_dir = Path(output_dir)
-    out_dir.mkdir(parents=True, exist_ok=True)
-
-    index_path = out_dir / f"{base_name}.m3u8"
-    segment_pattern = out_dir / f"{base_name}_%03d.ts"
+    n = len(ladder)
+    split = f"[0:v]split={n}" + "".join(f"[v{i}]" for i in range(n))
+    scales = [f"[v{i}]scale=-2:{r.height}[v{i}out]" for i, r in enumerate(ladder)]
 
     cmd = [
         "ffmpeg",
         "-y",
         "-i",
         input_path,
-        "-c:v",
-        "h264",
-        "-c:a",
-        "aac",
-        "-ac",
-        "2",
+        "-filter_complex_threads",
+        str(threads),
+        "-filter_complex",
+        ";".join([split] + scales),
+    ]
+    stream_map = []
+    for i, (r, crf, maxrate, bufsize) in enumerate(encodings):
+        cmd += [
+            "-map", f"[v{i}out]",
+            f"-c:v:{i}", enc.name,
+            f"-{enc.quality_option}:v:{i}", str(crf),
+            f"-maxrate:v:{i}", maxrate,
+            f"-bufsize:v:{i}", bufsize,
+        ]
+        if has_audio:
+            cmd += ["-map", "0:a:0", f"-c:a:{i}", "aac", f"-b:a:{i}", r.audio_bitrate]
+            stream_map.append(f"v:{i},a:{i},name:{r.name}")
+        else:
+            stream_map.append(f"v:{i},name:{r.name}")
+    if has_audio:
+        cmd += ["-ac", "2"]
+
+    cmd += list(enc.extra_args)
+    cmd += [
+        "-threads",
+        str(threads),
         "-preset",
-        "veryfast",
+        enc.presets[profile],
+        # Keyframes on segment boundaries so every variant switches at the same points
+        "-force_key_frames",
+        f"expr:gte(t,n_forced*{segment_time})",
+        "-sc_threshold",
+        "0",
+    ]
+    if output_ts_offset is not None:
+        cmd += ["-output_ts_offset", f"{output_ts_offset:.6f}"]
+    cmd += [
         "-f",
         "hls",
         "-hls_time",
         str(segment_time),
         "-hls_playlist_type",
         "vod",
+    ]
+    if hls_flags:
+        cmd += ["-hls_flags", hls_flags]
+    cmd += [
         "-hls_segment_filename",
-        str(segment_pattern),
-        str(index_path),
+        str(out_dir / f"{base_name}_%v_%03d.ts"),
+        "-master_pl_name",
+        f"{base_name}.m3u8",
+        "-var_stream_map",
+        " ".join(stream_map),
+        str(out_dir / f"{base_name}_%v.m3u8"),
     ]
+    return cmd
+
+
+def variant_names(index_path: str, outputs: Sequence[str]) -> List[str]:
+    """Names of the variant playlists written next to a master playlist, e.g. ["1080p", "720p"]."""
+    master = Path(index_path)
+    prefix = f"{master.stem}_"
+    return sorted(
+        (
+            Path(p).stem[len(prefix):]
+            for p in outputs
+            if p.endswith(".m3u8") and Path(p) != master and Path(p).stem.startswith(prefix)
+        ),
+        key=lambda name: RENDITION_PRESETS[name].height if name in RENDITION_PRESETS else 0,
+        reverse=True,
+    )
+
+
+def rewrite_segment_uris(playlist_path: str, uris: Mapping[str, str]) -> int:
+    """
+    Point segment entries of a media playlist at other URIs (e.g. absolute URLs of identical
+    segments published earlier), in place. Tags and unmapped entries are left untouched.
+
+    Returns:
+        Number of entries rewritten.
+    """
+    path = Path(playlist_path)
+    lines = path.read_text().splitlines()
+    rewritten = 0
+    for i, line in enumerate(lines):
+        if line and not line.startswith("#") and line in uris:
+            lines[i] = uris[line]
+            rewritten += 1
+    if rewritten:
+        path.write_text("\n".join(lines) + "\n")
+    return rewritten
+
+
+def transcode_to_hls(
+    input_path: str,
+    output_dir: str,
+    base_name: str,
+    segment_time: int = 6,
+    ladder: Optional[Sequence[Rendition]] = None,
+    profile: str = HLS_ENCODING_PROFILE,
+    complexity: Optional[float] = None,
+) -> Tuple[str, List[str]]:
+    """
+    Transcode a video into an adaptive-bitrate HLS ladder using a single ffmpeg run.
+
+    Args:
+        input_path: Local path to the source video file.
+        output_dir: Directory where HLS outputs should be written.
+        base_name: Base filename (without extension) for output assets.
+        segment_time: Segment duration in seconds.
+        ladder: Renditions to produce; defaults to HLS_LADDER. Rungs above the source height are skipped.
+        profile: Encoding profile name (see ENCODING_PROFILES).
+        complexity: Source complexity for per-title tuning; probed when None.
+
+    Returns:
+        (master_playlist_path, all_output_files)
+    """
+    ensure_ffmpeg()
+
+    out_dir = Path(output_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    source_height, has_audio = probe_source(input_path)
+    renditions = select_renditions(ladder or parse_ladder(HLS_LADDER), source_height)
+
+    if complexity is None:
+        complexity = probe_complexity(input_path)
+
+    index_path = out_dir / f"{base_name}.m3u8"
+    cmd = build_hls_command(
+        input_path, str(out_dir), base_name, renditions, segment_time, has_audio,
+        profile=profile, complexity=complexity,
+    )
 
     subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
 
@@ -73,3 +450,393 @@ def transcode_to_hls(
     outputs += [str(p) for p in out_dir.glob(f"{base_name}_*.ts")]
 
     return str(index_path), sorted(outputs)
+
+
+def watch_segments(
+    output_dir: str,
+    base_name: str,
+    is_running: Callable[[], bool],
+    on_segment: Callable[[str], None],
+    poll_interval: float = 0.5,
+) -> List[str]:
+    """
+    Poll `output_dir` for finished .ts segments and hand each one to `on_segment` exactly once.
+
+    Relies on ffmpeg's `temp_file` HLS flag: segments are written as *.ts.tmp and renamed once
+    closed, so any *.ts present is complete. Does a final sweep after `is_running` turns false.
+
+    Returns:
+        All segment paths seen, in the order they were reported.
+    """
+    out_dir = Path(output_dir)
+    seen: Set[str] = set()
+    ordered: List[str] = []
+
+    def sweep() -> None:
+        for p in sorted(out_dir.glob(f"{base_name}_*.ts")):
+            path = str(p)
+            if path not in seen:
+                seen.add(path)
+                ordered.append(path)
+                on_segment(path)
+
+    while is_running():
+        sweep()
+        time.sleep(poll_interval)
+    sweep()
+    return ordered
+
+
+def transcode_to_hls_streaming(
+    input_path: str,
+    output_dir: str,
+    base_name: str,
+    on_segment: Callable[[str], None],
+    segment_time: int = 6,
+    ladder: Optional[Sequence[Rendition]] = None,
+    poll_interval: float = 0.5,
+    profile: str = HLS_ENCODING_PROFILE,
+    complexity: Optional[float] = None,
+) -> Tuple[str, List[str]]:
+    """
+    Same as `transcode_to_hls`, but reports each .ts segment through `on_segment` as soon as
+    ffmpeg closes it, so uploads can overlap with encoding.
+
+    Playlists are only complete once this returns; callers must publish them last.
+
+    Returns:
+        (master_playlist_path, all_output_files)
+    """
+    ensure_ffmpeg()
+
+    out_dir = Path(output_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    source_height, has_audio = probe_source(input_path)
+    renditions = select_renditions(ladder or parse_ladder(HLS_LADDER), source_height)
+
+    if complexity is None:
+        complexity = probe_complexity(input_path)
+
+    index_path = out_dir / f"{base_name}.m3u8"
+    cmd = build_hls_command(
+        input_path, str(out_dir), base_name, renditions, segment_time, has_audio, hls_flags="temp_file",
+        profile=profile, complexity=complexity,
+    )
+
+    with tempfile.TemporaryFile() as stderr:
+        proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=stderr)
+        try:
+            watch_segments(str(out_dir), base_name, lambda: proc.poll() is None, on_segment, poll_interval)
+        except BaseException:
+            proc.kill()
+            proc.wait()
+            raise
+        if proc.returncode != 0:
+            stderr.seek(0)
+            raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=stderr.read())
+
+    outputs = [str(p) for p in out_dir.glob(f"{base_name}*.m3u8")]
+    outputs += [str(p) for p in out_dir.glob(f"{base_name}_*.ts")]
+
+    return str(index_path), sorted(outputs)
+
+
+def probe_keyframes(input_path: str) -> List[float]:
+    """
+    Presentation times (seconds) of the first video stream's keyframes, from ffprobe packet flags.
+
+    Returns [] when ffprobe is unavailable or fails.
+    """
+    from shutil import which
+
+    if which("ffprobe") is None:
+        return []
+    try:
+        proc = subprocess.run(
+            [
+                "ffprobe", "-v", "error", "-select_streams", "v:0",
+                "-show_entries", "packet=pts_time,flags", "-of", "csv=p=0", input_path,
+            ],
+            check=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+    except subprocess.CalledProcessError:
+        return []
+    times = []
+    for line in proc.stdout.decode().splitlines():
+        pts, _, flags = line.partition(",")
+        if "K" in flags and pts not in ("", "N/A"):
+            times.append(float(pts))
+    return sorted(times)
+
+
+def plan_chunks(keyframes: Sequence[float], chunk_seconds: float, segment_time: int = 6) -> List[float]:
+    """
+    Pick chunk start times among `keyframes`: the first keyframe at or after every `chunk_seconds`
+    (rounded up to whole segments) since the previous cut. Cutting on keyframes lets chunks be
+    split without re-encoding (every chunk is a closed set of GOPs); on whole segments, HLS
+    segments keep their nominal length across chunk boundaries when the source has regular GOPs.
+
+    Returns:
+        Chunk start times, the first being the first keyframe; a single entry means "don't split".
+    """
+    if not keyframes:
+        return [0.0]
+    step = max(segment_time, math.ceil(chunk_seconds / segment_time) * segment_time)
+    starts = [keyframes[0]]
+    for t in keyframes[1:]:
+        if t - starts[-1] >= step - 1e-3:
+            starts.append(t)
+    return starts
+
+
+def split_at_keyframes(input_path: str, output_dir: str, starts: Sequence[float]) -> List[str]:
+    """
+    Split the source into stream-copied chunks (first video and audio stream) starting at `starts`,
+    which must be keyframe times, e.g. from `plan_chunks`.
+
+    Returns:
+        Chunk paths in order.
+    """
+    out_dir = Path(output_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    origin = starts[0]
+    # The segment muxer cuts at the first keyframe at or after each time; stay just below it
+    cuts = ",".join(f"{t - origin - 0.001:.3f}" for t in starts[1:])
+    cmd = ["ffmpeg", "-y", "-i", input_path, "-map", "0:v:0", "-map", "0:a:0?", "-c", "copy", "-f", "segment"]
+    if cuts:
+        cmd += ["-segment_times", cuts]
+    cmd += ["-reset_timestamps", "1", str(out_dir / "chunk_%03d.mkv")]
+    subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    return sorted(str(p) for p in out_dir.glob("chunk_*.mkv"))
+
+
+def _transcode_chunk(
+    chunk_path: str,
+    output_dir: str,
+    base_name: str,
+    renditions: Sequence[Rendition],
+    segment_time: int,
+    has_audio: bool,
+    offset: float,
+    threads: int,
+    profile: str,
+    complexity: float,
+    cancel_flag: str,
+    poll_interval: float = 0.5,
+) -> str:
+    # Runs in a pool worker: one ffmpeg for one chunk, timestamps shifted to the chunk's place.
+    # The caller can't reach this ffmpeg; it asks for a stop by creating `cancel_flag`.
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    cmd = build_hls_command(
+        chunk_path, output_dir, base_name, renditions, segment_time, has_audio,
+        threads=threads, output_ts_offset=offset, profile=profile, complexity=complexity,
+    )
+    with tempfile.TemporaryFile() as stderr:
+        proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=stderr)
+        try:
+            while proc.poll() is None:
+                if os.path.exists(cancel_flag):
+                    raise TranscodeCancelled(chunk_path)
+                time.sleep(poll_interval)
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+        if proc.returncode != 0:
+            stderr.seek(0)
+            raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=stderr.read())
+    return output_dir
+
+
+def read_media_playlist(playlist_path: str) -> List[Tuple[float, str]]:
+    """(duration, uri) of every segment listed in a media playlist."""
+    entries: List[Tuple[float, str]] = []
+    duration: Optional[float] = None
+    for line in Path(playlist_path).read_text().splitlines():
+        if line.startswith("#EXTINF:"):
+            duration = float(line[len("#EXTINF:"):].split(",", 1)[0])
+        elif line and not line.startswith("#") and duration is not None:
+            entries.append((duration, line))
+            duration = None
+    return entries
+
+
+def write_media_playlist(playlist_path: str, entries: Sequence[Tuple[float, str]]) -> None:
+    """Write a complete VOD media playlist for (duration, uri) entries."""
+    target = max((math.ceil(d) for d, _ in entries), default=1)
+    lines = [
+        "#EXTM3U",
+        "#EXT-X-VERSION:3",
+        f"#EXT-X-TARGETDURATION:{target}",
+        "#EXT-X-MEDIA-SEQUENCE:0",
+        "#EXT-X-PLAYLIST-TYPE:VOD",
+    ]
+    for duration, uri in entries:
+        lines += [f"#EXTINF:{duration:.6f},", uri]
+    lines.append("#EXT-X-ENDLIST")
+    Path(playlist_path).write_text("\n".join(lines) + "\n")
+
+
+def transcode_to_hls_parallel(
+    input_path: str,
+    output_dir: str,
+    base_name: str,
+    segment_time: int = 6,
+    ladder: Optional[Sequence[Rendition]] = None,
+    on_segment: Optional[Callable[[str], None]] = None,
+    chunk_seconds: float = HLS_CHUNK_SECONDS,
+    workers: int = HLS_CHUNK_WORKERS,
+    executor: Optional[Executor] = None,
+    profile: str = HLS_ENCODING_PROFILE,
+    complexity: Optional[float] = None,
+    checkpoint: Optional[Callable[[], None]] = None,
+    poll_interval: float = 0.5,
+) -> Tuple[str, List[str]]:
+    """
+    Same output as `transcode_to_hls`, encoded as independent chunks in parallel.
+
+    The source is split at keyframes into GOP-aligned chunks without re-encoding; each chunk is
+    transcoded to the full ladder by its own ffmpeg (`workers` at once, sharing the FFMPEG_THREADS
+    budget) with `-output_ts_offset` set to its start, so timestamps run on across chunks. The
+    chunk playlists are then stitched into one media playlist per variant, segments renamed to
+    the usual f"{base_name}_{variant}_%03d.ts" sequence.
+
+    Chunks are transcoded by a process pool unless `executor` is given; any executor works as long
+    as its workers see `output_dir` (e.g. hosts sharing a filesystem). `on_segment`, if given, gets
+    every segment in playback order as soon as its chunk and all earlier ones are done. Sources
+    that yield a single chunk, or whose keyframes can't be probed, take the single-process path.
+    The complexity probe runs once for the whole source, so every chunk gets the same rate control.
+
+    `checkpoint`, if given, is called every `poll_interval` seconds while waiting for chunks; an
+    exception raised from it (or from `on_segment`) aborts the encode: queued chunks are dropped
+    and the ffmpeg of every running chunk is killed before it propagates.
+
+    Returns:
+        (master_playlist_path, all_output_files)
+    """
+    ensure_ffmpeg()
+
+    out_dir = Path(output_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    if complexity is None:
+        complexity = probe_complexity(input_path)
+    starts = plan_chunks(probe_keyframes(input_path), chunk_seconds, segment_time)
+    if len(starts) < 2:
+        index_path, outputs = transcode_to_hls(
+            input_path, str(out_dir), base_name, segment_time, ladder, profile=profile, complexity=complexity
+        )
+        for path in outputs:
+            if on_segment is not None and path.endswith(".ts"):
+                on_segment(path)
+        return index_path, outputs
+
+    source_height, has_audio = probe_source(input_path)
+    renditions = select_renditions(ladder or parse_ladder(HLS_LADDER), source_height)
+    # Kept inside output_dir so executors on other hosts sharing it can reach the chunks
+    work_dir = out_dir / f".{base_name}_chunks"
+    cancel_flag = work_dir / "cancelled"
+    workers = max(1, min(workers, len(starts)))
+    threads = max(1, FFMPEG_THREADS // workers)
+    # Spawn, not fork: this process already runs job, upload and event loop threads
+    pool = executor or ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    futures: List[Future] = []
+    try:
+        chunks = split_at_keyframes(input_path, str(work_dir / "src"), starts)
+        futures = [
+            pool.submit(
+                _transcode_chunk, chunk, str(work_dir / f"{i:03d}"), base_name, renditions,
+                segment_time, has_audio, starts[i] - starts[0], threads, profile, complexity, str(cancel_flag),
+            )
+            for i, chunk in enumerate(chunks)
+        ]
+
+        # Stitch in playback order, each chunk as soon as it and all earlier ones are done
+        entries: Dict[str, List[Tuple[float, str]]] = {}
+        outputs: List[str] = []
+        for i, future in enumerate(futures):
+            while not wait([future], timeout=poll_interval).done:
+                if checkpoint is not None:
+                    checkpoint()
+            chunk_dir = Path(future.result())
+            for playlist in sorted(chunk_dir.glob(f"{base_name}_*.m3u8")):
+                variant = playlist.stem[len(base_name) + 1:]
+                stitched = entries.setdefault(variant, [])
+                for duration, uri in read_media_playlist(str(playlist)):
+                    target = out_dir / f"{base_name}_{variant}_{len(stitched):03d}.ts"
+                    os.replace(chunk_dir / uri, target)
+                    stitched.append((duration, target.name))
+                    outputs.append(str(target))
+                    if on_segment is not None:
+                        on_segment(str(target))
+            if i == 0:
+                # Variant URIs are the same in every chunk's master playlist
+                shutil.copyfile(chunk_dir / f"{base_name}.m3u8", out_dir / f"{base_name}.m3u8")
+    except BaseException:
+        for future in futures:
+            future.cancel()
+        if futures:
+            # Stop the chunks already encoding too, and let them exit before their files go
+            cancel_flag.touch()
+            wait(futures)
+        raise
+    finally:
+        if executor is None:
+            pool.shutdown(wait=True, cancel_futures=True)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    for variant, stitched in entries.items():
+        playlist = out_dir / f"{base_name}_{variant}.m3u8"
+        write_media_playlist(str(playlist), stitched)
+        outputs.append(str(playlist))
+    index_path = out_dir / f"{base_name}.m3u8"
+    outputs.append(str(index_path))
+    return str(index_path), sorted(outputs)
+
+
+def encode_report(
+    index_path: str,
+    outputs: Sequence[str],
+    elapsed: float,
+    *,
+    ladder: Sequence[Rendition],
+    profile: str = HLS_ENCODING_PROFILE,
+    complexity: float = 1.0,
+    frame_rate: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    What a transcode cost and produced: encode time and fps against the average bitrate of each
+    variant (segment bytes over playlist duration), with the rate control it was encoded under.
+    Call before playlists are rewritten or segments removed.
+
+    Returns:
+        Dict shaped like EncodeStats; encode_fps is None when the frame rate is unknown.
+    """
+    tuned = {e.rendition.name: e for e in tune_renditions(ladder, complexity, profile)}
+    by_name = {Path(p).name: p for p in outputs}
+    master = Path(index_path)
+    variants: Dict[str, Dict[str, Any]] = {}
+    media_seconds = 0.0
+    for name in variant_names(index_path, outputs):
+        entries = read_media_playlist(str(master.with_name(f"{master.stem}_{name}.m3u8")))
+        seconds = sum(d for d, _ in entries)
+        size = sum(os.path.getsize(by_name[uri]) for _, uri in entries if uri in by_name)
+        media_seconds = max(media_seconds, seconds)
+        variants[name] = {
+            "average_kbps": round(size * 8 / 1000 / seconds, 1) if seconds else 0.0,
+            "crf": tuned[name].crf if name in tuned else None,
+            "maxrate": tuned[name].maxrate if name in tuned else None,
+        }
+    elapsed = max(elapsed, 1e-6)
+    return {
+        "profile": profile,
+        "encoder": HLS_VIDEO_ENCODER,
+        "complexity": complexity,
+        "encode_seconds": round(elapsed, 3),
+        "media_seconds": round(media_seconds, 3),
+        "speed": round(media_seconds / elapsed, 2),
+        "encode_fps": round(media_seconds * frame_rate / elapsed, 1) if frame_rate else None,
+        "variants": variants,
+    }
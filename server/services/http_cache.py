@@ -0,0 +1,65 @@
+import hashlib
+from datetime import datetime, UTC
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Mapping, Optional
+
+from fastapi import Response
+
+# Authenticated catalog data: browsers may keep it but must revalidate before each reuse
+CACHE_CONTROL = "private, no-cache"
+
+
+def entity_tag(*parts: Any) -> str:
+    """Strong ETag (quoted) over the given version parts."""
+    digest = hashlib.blake2b("\x1f".join(str(p) for p in parts).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes; they are stored in UTC
+    return value.replace(tzinfo=UTC) if value.tzinfo is None else value.astimezone(UTC)
+
+
+def http_date(value: datetime) -> str:
+    return format_datetime(_as_utc(value).replace(microsecond=0), usegmt=True)
+
+
+def validators(etag: str, last_modified: Optional[datetime] = None) -> Dict[str, str]:
+    """Response headers carrying the validators for a representation."""
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def is_not_modified(request_headers: Mapping[str, str], response_headers: Mapping[str, str]) -> bool:
+    """
+    Evaluate If-None-Match / If-Modified-Since against a representation's validators (RFC 9110 13.2.2).
+
+    If-None-Match wins when present and uses the weak comparison; If-Modified-Since is only
+    consulted without it.
+    """
+    etag = response_headers.get("ETag")
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        if etag is None:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag.removeprefix("W/") in candidates
+
+    last_modified = response_headers.get("Last-Modified")
+    if_modified_since = request_headers.get("if-modified-since")
+    if last_modified is None or if_modified_since is None:
+        return False
+    try:
+        return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+
+
+def not_modified(response_headers: Mapping[str, str]) -> Response:
+    """304 carrying the same validators a 200 would have (no body)."""
+    keep = ("ETag", "Last-Modified", "Cache-Control")
+    return Response(status_code=304, headers={k: response_headers[k] for k in keep if k in response_headers})
@@ -0,0 +1,92 @@
+import hashlib
+import logging
+import os
+import time
+from pathlib import Path
+from typing import BinaryIO, NamedTuple
+
+from server.services.metrics import record_upload
+
+logger = logging.getLogger("uvicorn.error")
+
+# Configuration (env override supported)
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+MAX_VIDEO_UPLOAD_BYTES = int(os.getenv("MAX_VIDEO_UPLOAD_BYTES", str(20 * 1024**3)))
+MAX_TRAILER_UPLOAD_BYTES = int(os.getenv("MAX_TRAILER_UPLOAD_BYTES", str(2 * 1024**3)))
+MAX_IMAGE_UPLOAD_BYTES = int(os.getenv("MAX_IMAGE_UPLOAD_BYTES", str(20 * 1024**2)))
+
+
+class UploadTooLarge(Exception):
+    def __init__(self, max_bytes: int):
+        super().__init__(f"Upload exceeds the maximum size of {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+class IngestResult(NamedTuple):
+    path: str
+    size: int
+    sha256: str
+    elapsed: float
+
+    @property
+    def bytes_per_sec(self) -> float:
+        return self.size / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def ingest_upload(
+    src: BinaryIO,
+    dest_path: str,
+    *,
+    max_bytes: int,
+    chunk_size: int = UPLOAD_CHUNK_SIZE,
+) -> IngestResult:
+    """
+    Stream an uploaded file to disk in fixed-size chunks.
+
+    Memory stays bounded by `chunk_size` regardless of the upload size. The SHA-256 of the
+    content is computed on the fly, and the copy aborts as soon as `max_bytes` is exceeded.
+
+    Args:
+        src: Readable binary file object (e.g. UploadFile.file).
+        dest_path: Destination path; removed again if the upload is rejected.
+        max_bytes: Maximum accepted size in bytes.
+        chunk_size: Bytes copied per read.
+
+    Returns:
+        IngestResult with size, content hash and elapsed time.
+
+    Raises:
+        UploadTooLarge: if the stream is larger than `max_bytes`.
+    """
+    digest = hashlib.sha256()
+    buf = bytearray(chunk_size)
+    view = memoryview(buf)
+    readinto = getattr(src, "readinto", None)
+    size = 0
+    start = time.perf_counter()
+    dest = Path(dest_path)
+    try:
+        with dest.open("wb") as out:
+            while True:
+                if readinto is not None:
+                    n = readinto(buf)
+                    chunk = view[:n]
+                else:
+                    data = src.read(chunk_size)
+                    n = len(data)
+                    chunk = data
+                if not n:
+                    break
+                size += n
+                if size > max_bytes:
+                    raise UploadTooLarge(max_bytes)
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        dest.unlink(missing_ok=True)
+        raise
+
+    result = IngestResult(path=str(dest), size=size, sha256=digest.hexdigest(), elapsed=time.perf_counter() - start)
+    record_upload("multipart", size, result.elapsed)
+    logger.info("Ingested %s: %d bytes at %.1f MB/s", dest.name, size, result.bytes_per_sec / 1e6)
+    return result
@@ -0,0 +1,425 @@
+import json
+import logging
+import math
+import os
+import shutil
+import threading
+import uuid
+from datetime import datetime, UTC
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import sessionmaker
+
+from server.models.job import VideoJob
+from server.services.hls_transcoder import FFMPEG_THREADS
+from server.services.metrics import job_duration
+
+logger = logging.getLogger("uvicorn.error")
+
+# Configuration (env override supported)
+# One ffmpeg per worker, each with an FFMPEG_THREADS budget: together they fill the cores
+# instead of oversubscribing them
+VIDEO_JOB_WORKERS = int(os.getenv("VIDEO_JOB_WORKERS", str(max(1, (os.cpu_count() or 1) // FFMPEG_THREADS))))
+# Jobs queued or running at once; beyond this submissions are refused instead of piling up on disk
+VIDEO_JOB_MAX_PENDING = int(os.getenv("VIDEO_JOB_MAX_PENDING", str(VIDEO_JOB_WORKERS * 2)))
+# Retry-After hint for refused submissions until a job duration has been observed
+VIDEO_JOB_RETRY_AFTER_SECONDS = int(os.getenv("VIDEO_JOB_RETRY_AFTER_SECONDS", "30"))
+# Idle workers re-check the table this often (jobs queued by another process, missed wake-ups)
+VIDEO_JOB_POLL_SECONDS = float(os.getenv("VIDEO_JOB_POLL_SECONDS", "2"))
+
+# Run order between kinds: lower first. Trailers are short and usually publish before the feature.
+JOB_PRIORITIES = {"upload-trailer": 0, "upload-video": 10}
+DEFAULT_PRIORITY = 100
+
+
+class JobStatus:
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class JobNotFound(Exception):
+    pass
+
+
+class JobNotCancellable(Exception):
+    pass
+
+
+class JobCancelled(Exception):
+    """Raised inside a job function at a checkpoint once cancellation was requested."""
+
+
+class Job:
+    """
+    In-memory view of a background job; the `video_jobs` row is the durable copy.
+
+    Mutated only by the worker running it (through `update`) and read by the status endpoints.
+    """
+
+    def __init__(
+        self,
+        *,
+        kind: str,
+        movie_id: int,
+        params: Optional[Dict[str, Any]] = None,
+        priority: int = DEFAULT_PRIORITY,
+        id: Optional[str] = None,
+    ):
+        self.id = id or uuid.uuid4().hex
+        self.kind = kind
+        self.movie_id = movie_id
+        self.params: Dict[str, Any] = params or {}
+        self.priority = priority
+        self.status = JobStatus.QUEUED
+        self.stage = "queued"
+        self.progress = 0.0
+        self.error: Optional[str] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.created_at = datetime.now(UTC)
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self._cancel = threading.Event()
+
+    @classmethod
+    def from_row(cls, row: VideoJob) -> "Job":
+        job = cls(kind=row.kind, movie_id=row.movie_id, params=json.loads(row.params), priority=row.priority, id=row.id)
+        job.status = row.status
+        job.stage = row.stage
+        job.progress = row.progress
+        job.error = row.error
+        job.result = json.loads(row.result) if row.result else None
+        job.created_at = row.created_at
+        job.started_at = row.started_at
+        job.finished_at = row.finished_at
+        return job
+
+    def update(self, *, stage: Optional[str] = None, progress: Optional[float] = None) -> None:
+        if stage is not None:
+            self.stage = stage
+        if progress is not None:
+            # Progress only moves forward, clamped to [0, 100]
+            self.progress = max(self.progress, min(100.0, float(progress)))
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        """Checkpoint for job functions: raises JobCancelled once `JobQueue.cancel` was called."""
+        if self._cancel.is_set():
+            raise JobCancelled(self.id)
+
+    @property
+    def done(self) -> bool:
+        return self.status in (JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+
+class QueueFull(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__("Too many jobs in progress")
+        self.retry_after = retry_after
+
+
+class JobFailed(Exception):
+    """Raised by a job function to fail the job with a client-facing message."""
+
+
+# A handler receives its Job (arguments in `job.params`) plus the context passed to `start`/`bind`
+Handler = Callable[..., Dict[str, Any]]
+
+
+def _remove_workdir(job: Job) -> None:
+    workdir = job.params.get("workdir")
+    if workdir:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+class JobQueue:
+    """
+    Persistent, prioritized job queue with a fixed pool of worker threads.
+
+    Jobs are rows in `video_jobs`: `submit` inserts one, idle workers claim the next queued row
+    (lowest priority value, then oldest) with a conditional UPDATE, run the handler registered for
+    its kind and store the outcome. Because the queue lives in the database, `start` resumes it
+    after a restart: rows still marked running were interrupted by the crash and are queued again.
+    One process should run the workers for a given database.
+
+    A handler returns a JSON-serializable result dict. Raising `JobFailed` records its message,
+    `JobCancelled` (from `Job.raise_if_cancelled`) marks the job cancelled, and any other exception
+    records a generic error.
+
+    At most `max_pending` jobs are queued or running; `submit` raises QueueFull beyond that.
+
+    A job owns the scratch directory named by `params["workdir"]`, if any (e.g. the uploaded
+    source): the queue removes it once the job reaches a final state, cancelled while still queued
+    included.
+    """
+
+    def __init__(self, max_workers: int = VIDEO_JOB_WORKERS, max_pending: int = VIDEO_JOB_MAX_PENDING):
+        self._max_workers = max_workers
+        self.max_pending = max_pending
+        self._handlers: Dict[str, Handler] = {}
+        self._session_factory: Optional[sessionmaker] = None
+        self._context: Dict[str, Any] = {}
+        # Jobs queued or running, by id; finished jobs are read back from the table
+        self._active: Dict[str, Job] = {}
+        # Moving average of job run time, for Retry-After hints
+        self._avg_seconds: Optional[float] = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._stop: Optional[threading.Event] = None
+        self._threads: List[threading.Thread] = []
+
+    def register(self, kind: str, handler: Handler) -> None:
+        self._handlers[kind] = handler
+
+    def bind(self, session_factory: sessionmaker, **context: Any) -> None:
+        """Point the queue at a database (sync sessions) and add to the context handlers receive."""
+        self._session_factory = session_factory
+        self._context.update(context)
+
+    def start(self, session_factory: sessionmaker, *, recover: bool = True, **context: Any) -> int:
+        """
+        Bind, resume the persisted queue and start the workers.
+
+        Returns:
+            Number of queued jobs found (interrupted ones included).
+        """
+        self.bind(session_factory, **context)
+        resumed = self._recover() if recover else 0
+        with self._lock:
+            self._stop = stop = threading.Event()
+            self._threads = [
+                threading.Thread(target=self._work, args=(stop,), name=f"job-{i}", daemon=True)
+                for i in range(self._max_workers)
+            ]
+        for thread in self._threads:
+            thread.start()
+        return resumed
+
+    def _recover(self) -> int:
+        with self._session_factory() as db:
+            interrupted = db.execute(
+                update(VideoJob)
+                .where(VideoJob.status == JobStatus.RUNNING)
+                .values(status=JobStatus.QUEUED, stage="queued", progress=0.0, started_at=None)
+            ).rowcount
+            db.commit()
+            rows = db.scalars(select(VideoJob).where(VideoJob.status == JobStatus.QUEUED)).all()
+            with self._lock:
+                for row in rows:
+                    self._active.setdefault(row.id, Job.from_row(row))
+        if rows:
+            logger.info("Resuming %d queued jobs (%d interrupted)", len(rows), interrupted)
+        return len(rows)
+
+    @property
+    def pending(self) -> int:
+        return len(self._active)
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely to free up: a job's average run time spread over the workers."""
+        if self._avg_seconds is None:
+            return VIDEO_JOB_RETRY_AFTER_SECONDS
+        return max(1, math.ceil(self._avg_seconds / self._max_workers))
+
+    def admit(self) -> None:
+        """
+        Cheap pre-check before accepting work that will be submitted later (e.g. before receiving an
+        upload). It reserves nothing; `submit` enforces the cap.
+
+        Raises:
+            QueueFull: when the queue is at capacity.
+        """
+        if len(self._active) >= self.max_pending:
+            raise QueueFull(self.retry_after())
+
+    def submit(self, *, kind: str, movie_id: int, params: Dict[str, Any], priority: Optional[int] = None) -> Job:
+        """
+        Persist a job for the handler registered under `kind`; `params` must be JSON-serializable.
+
+        Raises:
+            QueueFull: when `max_pending` jobs are already queued or running.
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for job kind {kind!r}")
+        job = Job(
+            kind=kind,
+            movie_id=movie_id,
+            params=params,
+            priority=JOB_PRIORITIES.get(kind, DEFAULT_PRIORITY) if priority is None else priority,
+        )
+        with self._lock:
+            if len(self._active) >= self.max_pending:
+                raise QueueFull(self.retry_after())
+            self._active[job.id] = job
+        try:
+            with self._session_factory() as db:
+                db.add(
+                    VideoJob(
+                        id=job.id,
+                        kind=job.kind,
+                        movie_id=job.movie_id,
+                        priority=job.priority,
+                        status=job.status,
+                        stage=job.stage,
+                        progress=job.progress,
+                        params=json.dumps(job.params),
+                        created_at=job.created_at,
+                    )
+                )
+                db.commit()
+        except BaseException:
+            with self._lock:
+                self._active.pop(job.id, None)
+            raise
+        with self._wakeup:
+            self._wakeup.notify()
+        return job
+
+    def get(self, job_id: str) -> Job:
+        job = self._active.get(job_id)
+        if job is not None:
+            return job
+        with self._session_factory() as db:
+            row = db.get(VideoJob, job_id)
+        if row is None:
+            raise JobNotFound(job_id)
+        return Job.from_row(row)
+
+    def cancel(self, job_id: str) -> Job:
+        """
+        Cancel a job: a queued one immediately, a running one at its next checkpoint (its status
+        stays running until then).
+
+        Raises:
+            JobNotFound: unknown id.
+            JobNotCancellable: the job already finished.
+        """
+        job = self.get(job_id)
+        if job.done:
+            raise JobNotCancellable(job_id)
+        job._cancel.set()
+        with self._session_factory() as db:
+            dequeued = db.execute(
+                update(VideoJob)
+                .where(VideoJob.id == job_id, VideoJob.status == JobStatus.QUEUED)
+                .values(status=JobStatus.CANCELLED, stage="cancelled", finished_at=datetime.now(UTC))
+            ).rowcount
+            db.commit()
+        if dequeued:
+            job.status, job.stage, job.finished_at = JobStatus.CANCELLED, "cancelled", datetime.now(UTC)
+            with self._lock:
+                self._active.pop(job_id, None)
+            _remove_workdir(job)
+        return job
+
+    def _claim(self) -> Optional[Job]:
+        with self._session_factory() as db:
+            while True:
+                row = db.scalars(
+                    select(VideoJob)
+                    .where(VideoJob.status == JobStatus.QUEUED)
+                    .order_by(VideoJob.priority, VideoJob.created_at)
+                    .limit(1)
+                ).first()
+                if row is None:
+                    return None
+                # Snapshot before the commit expires the row
+                loaded = Job.from_row(row)
+                started_at = datetime.now(UTC)
+                claimed = db.execute(
+                    update(VideoJob)
+                    .where(VideoJob.id == row.id, VideoJob.status == JobStatus.QUEUED)
+                    .values(status=JobStatus.RUNNING, stage="starting", started_at=started_at, attempts=VideoJob.attempts + 1)
+                    .execution_options(synchronize_session=False)
+                ).rowcount
+                db.commit()
+                if claimed:
+                    break
+                # Another worker took it (or it was cancelled) in between; look again
+        with self._lock:
+            job = self._active.setdefault(loaded.id, loaded)
+        job.status, job.stage, job.started_at = JobStatus.RUNNING, "starting", started_at
+        return job
+
+    def _work(self, stop: threading.Event) -> None:
+        while not stop.is_set():
+            try:
+                job = self._claim()
+            except Exception as e:
+                logger.exception("Claiming the next job failed: %s", e)
+                job = None
+            if job is None:
+                with self._wakeup:
+                    if not stop.is_set():
+                        self._wakeup.wait(VIDEO_JOB_POLL_SECONDS)
+                continue
+            self._run(job)
+
+    def _run(self, job: Job) -> None:
+        try:
+            handler = self._handlers.get(job.kind)
+            if handler is None:
+                raise JobFailed(f"No handler for job kind {job.kind!r}")
+            job.raise_if_cancelled()
+            job.result = handler(job, **self._context)
+            job.update(stage="done", progress=100)
+            job.status = JobStatus.SUCCEEDED
+        except JobCancelled:
+            job.stage = "cancelled"
+            job.status = JobStatus.CANCELLED
+        except JobFailed as e:
+            job.error = str(e)
+            job.status = JobStatus.FAILED
+        except Exception as e:
+            logger.exception("Job %s (%s) failed: %s", job.id, job.kind, e)
+            job.error = "Internal error while processing job"
+            job.status = JobStatus.FAILED
+        finally:
+            job.finished_at = datetime.now(UTC)
+            elapsed = (job.finished_at - job.started_at).total_seconds()
+            job_duration.labels(job.kind, job.status).observe(elapsed)
+            _remove_workdir(job)
+            try:
+                self._save(job)
+            finally:
+                with self._lock:
+                    self._active.pop(job.id, None)
+                    self._avg_seconds = elapsed if self._avg_seconds is None else 0.8 * self._avg_seconds + 0.2 * elapsed
+
+    def _save(self, job: Job) -> None:
+        with self._session_factory() as db:
+            db.execute(
+                update(VideoJob)
+                .where(VideoJob.id == job.id)
+                .values(
+                    status=job.status,
+                    stage=job.stage,
+                    progress=job.progress,
+                    error=job.error,
+                    result=json.dumps(job.result) if job.result is not None else None,
+                    finished_at=job.finished_at,
+                )
+            )
+            db.commit()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the workers once their current job ends; unfinished jobs resume on the next `start`."""
+        with self._wakeup:
+            stop, self._stop = self._stop, None
+            threads, self._threads = self._threads, []
+            if stop is not None:
+                stop.set()
+            self._wakeup.notify_all()
+        if wait:
+            for thread in threads:
+                thread.join()
+
+
+# Process-wide queue used by the routes; started by the application lifespan
+job_queue = JobQueue()
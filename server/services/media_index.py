@@ -0,0 +1,71 @@
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from server.services.ingest import UPLOAD_CHUNK_SIZE
+
+# Configuration (env override supported)
+MEDIA_DEDUP_ENABLED = os.getenv("MEDIA_DEDUP_ENABLED", "true").lower() == "true"
+MEDIA_INDEX_DIR = os.getenv("MEDIA_INDEX_DIR", os.path.join(tempfile.gettempdir(), "netflix_media_index"))
+
+
+def hash_file(path: str, chunk_size: int = UPLOAD_CHUNK_SIZE) -> str:
+    """SHA-256 of a file, read in chunks (same digest as `ingest_upload` computes while streaming)."""
+    digest = hashlib.sha256()
+    buf = bytearray(chunk_size)
+    view = memoryview(buf)
+    with open(path, "rb") as f:
+        while n := f.readinto(buf):
+            digest.update(view[:n])
+    return digest.hexdigest()
+
+
+class MediaIndex:
+    """
+    Local content-addressed index: (kind, content hash, variant) -> record of published asset URLs.
+
+    One JSON file per entry, written to a temporary name and renamed into place, so concurrent
+    workers and processes never read a partial record. `variant` captures settings that change the
+    output for the same input (e.g. the HLS ladder), so a re-upload under other settings misses.
+
+    Entries are not verified against the CDN; pass `force` on the upload routes to republish.
+    """
+
+    def __init__(self, root: str = MEDIA_INDEX_DIR):
+        self.root = root
+
+    def _path(self, kind: str, content_hash: str, variant: str) -> Path:
+        name = content_hash
+        if variant:
+            name += "-" + hashlib.blake2b(variant.encode(), digest_size=8).hexdigest()
+        return Path(self.root) / kind / content_hash[:2] / f"{name}.json"
+
+    def get(self, kind: str, content_hash: str, variant: str = "") -> Optional[Dict[str, Any]]:
+        if not MEDIA_DEDUP_ENABLED:
+            return None
+        try:
+            return json.loads(self._path(kind, content_hash, variant).read_text())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def put(self, kind: str, content_hash: str, record: Dict[str, Any], variant: str = "") -> None:
+        path = self._path(kind, content_hash, variant)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(record, f)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def forget(self, kind: str, content_hash: str, variant: str = "") -> None:
+        self._path(kind, content_hash, variant).unlink(missing_ok=True)
+
+
+# Process-wide index used by the upload routes and the video pipeline
+media_index = MediaIndex()
@@ -0,0 +1,318 @@
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, NamedTuple, Sequence, Tuple
+
+# Configuration (env override supported)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+# Seconds; GET /movies SLOs are set against the 50-250 ms buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+JOB_DURATION_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600)
+THROUGHPUT_BUCKETS = tuple(mb * 1024 * 1024 for mb in (1, 5, 10, 25, 50, 100, 250, 500))
+ENCODE_FPS_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000)
+BITRATE_KBPS_BUCKETS = (250, 500, 1000, 1500, 2500, 4000, 6000, 8000)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# (suffix, label string, value) as rendered after the metric name
+Sample = Tuple[str, str, float]
+
+
+class _Sharded:
+    """
+    Per-thread value slots: a thread only ever writes its own slot, and a scrape sums them all.
+
+    Updates are plain list writes without a lock. The lock is only taken the first time a thread
+    touches the metric, to register its slot.
+    """
+
+    def __init__(self, width: int):
+        self._width = width
+        self._local = threading.local()
+        self._slots: List[list] = []
+        self._register = threading.Lock()
+
+    def _slot(self) -> list:
+        try:
+            return self._local.slot
+        except AttributeError:
+            slot = [0] * self._width
+            with self._register:
+                self._slots.append(slot)
+            self._local.slot = slot
+            return slot
+
+    def _totals(self) -> List[float]:
+        totals = [0] * self._width
+        for slot in list(self._slots):
+            for i, value in enumerate(slot):
+                totals[i] += value
+        return totals
+
+
+class Counter(_Sharded):
+    def __init__(self):
+        super().__init__(1)
+
+    def inc(self, amount: float = 1) -> None:
+        self._slot()[0] += amount
+
+    @property
+    def value(self) -> float:
+        return self._totals()[0]
+
+    def samples(self, labels: str) -> Iterable[Sample]:
+        yield "", labels, self.value
+
+
+class Gauge(Counter):
+    """Up/down gauge (e.g. requests in flight); increments and decrements may come from any thread."""
+
+    def dec(self, amount: float = 1) -> None:
+        self._slot()[0] -= amount
+
+
+class Histogram(_Sharded):
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        # One slot per bucket, +Inf, then the running sum
+        super().__init__(len(self.buckets) + 2)
+
+    def observe(self, value: float) -> None:
+        slot = self._slot()
+        slot[bisect_left(self.buckets, value)] += 1
+        slot[-1] += value
+
+    def samples(self, labels: str) -> Iterable[Sample]:
+        totals = self._totals()
+        sep = "," if labels else ""
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), totals):
+            cumulative += count
+            yield "_bucket", f'{labels}{sep}le="{_format_value(bound)}"', cumulative
+        yield "_sum", labels, totals[-1]
+        yield "_count", labels, cumulative
+
+
+class Family:
+    """
+    A named metric with a fixed set of label names. Children are created once per distinct label
+    values and reused, so hot paths should keep the child returned by `labels()`.
+    """
+
+    def __init__(self, name: str, help: str, kind: str, labelnames: Sequence[str] = (), factory: Callable = Counter):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self._factory = factory
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str):
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._factory())
+        return child
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in list(self._children.items()):
+            labels = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, values))
+            for suffix, sample_labels, value in child.samples(labels):
+                lines.append(_sample_line(self.name + suffix, sample_labels, value))
+        return lines
+
+
+class CollectedSample(NamedTuple):
+    """A value read at scrape time by a collector; plain (name, help, labels, value) tuples are gauges."""
+
+    name: str
+    help: str
+    labels: Dict[str, str]
+    value: float
+    kind: str = "gauge"
+
+
+class Registry:
+    """Metric families plus collectors that produce gauge (or counter) values at scrape time."""
+
+    def __init__(self):
+        self._families: List[Family] = []
+        self._collectors: List[Callable[[], Iterable[CollectedSample]]] = []
+
+    def family(self, name: str, help: str, kind: str, labelnames: Sequence[str] = (), factory: Callable = Counter) -> Family:
+        family = Family(name, help, kind, labelnames, factory)
+        self._families.append(family)
+        return family
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Family:
+        return self.family(name, help, "counter", labelnames, Counter)
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Family:
+        return self.family(name, help, "gauge", labelnames, Gauge)
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Family:
+        return self.family(name, help, "histogram", labelnames, lambda: Histogram(buckets))
+
+    def collector(self, fn: Callable[[], Iterable[CollectedSample]]) -> Callable:
+        """Register `fn` yielding samples when scraped."""
+        self._collectors.append(fn)
+        return fn
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for family in self._families:
+            lines.extend(family.render())
+        described = set()
+        for collect in self._collectors:
+            for item in collect():
+                name, help, labels, value, kind = CollectedSample(*item)
+                if name not in described:
+                    described.add(name)
+                    lines.append(f"# HELP {name} {help}")
+                    lines.append(f"# TYPE {name} {kind}")
+                text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+                lines.append(_sample_line(name, text, value))
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _sample_line(name: str, labels: str, value: float) -> str:
+    return f"{name}{{{labels}}} {_format_value(value)}" if labels else f"{name} {_format_value(value)}"
+
+
+registry = Registry()
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route")
+)
+http_requests_in_flight = registry.gauge("http_requests_in_flight", "HTTP requests currently being served.")
+http_server_errors = registry.counter(
+    "http_server_errors_total", "HTTP responses with a 5xx status by route template.", ("method", "route")
+)
+job_duration = registry.histogram(
+    "video_job_duration_seconds", "Background job run time (transcode + upload) by kind and outcome.",
+    ("kind", "status"), buckets=JOB_DURATION_BUCKETS,
+)
+upload_bytes = registry.counter("upload_bytes_total", "Bytes received from media uploads.", ("kind",))
+upload_throughput = registry.histogram(
+    "upload_throughput_bytes_per_second", "Per-upload receive rate.", ("kind",), buckets=THROUGHPUT_BUCKETS
+)
+encode_fps = registry.histogram(
+    "video_encode_fps", "Source frames transcoded per second, by encoding profile.", ("profile",),
+    buckets=ENCODE_FPS_BUCKETS,
+)
+output_bitrate = registry.histogram(
+    "video_output_bitrate_kbps", "Average bitrate of each published variant.", ("profile", "rendition"),
+    buckets=BITRATE_KBPS_BUCKETS,
+)
+
+_UNMATCHED = "<unmatched>"
+
+
+class _RouteMetrics:
+    __slots__ = ("latency", "errors")
+
+    def __init__(self, method: str, route: str):
+        self.latency = http_request_duration.labels(method, route)
+        self.errors = http_server_errors.labels(method, route)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing each HTTP request under its route template (`/movies/{movie_id}`, not
+    the concrete path), so label cardinality is bounded by the route table. Per-route children are
+    resolved once and cached by route and method; a request allocates no label values.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._in_flight = http_requests_in_flight.labels()
+        self._by_route: Dict[int, Dict[str, _RouteMetrics]] = {}
+
+    def _route_metrics(self, scope) -> _RouteMetrics:
+        route = scope.get("route")
+        # Routes define __eq__ and aren't hashable; they live as long as the app, so key by identity
+        by_method = self._by_route.get(id(route))
+        if by_method is None:
+            by_method = self._by_route.setdefault(id(route), {})
+        metrics = by_method.get(scope["method"])
+        if metrics is None:
+            template = getattr(route, "path", None) or _UNMATCHED
+            metrics = by_method.setdefault(scope["method"], _RouteMetrics(scope["method"], template))
+        return metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        self._in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self._in_flight.dec()
+            metrics = self._route_metrics(scope)
+            metrics.latency.observe(time.perf_counter() - start)
+            if status_code >= 500:
+                metrics.errors.inc()
+
+
+def record_upload(kind: str, size: int, elapsed: float) -> None:
+    upload_bytes.labels(kind).inc(size)
+    if elapsed > 0:
+        upload_throughput.labels(kind).observe(size / elapsed)
+
+
+def record_encode(report: Dict) -> None:
+    """Observe the encode fps and per-variant bitrates of a transcode (see hls_transcoder.encode_report)."""
+    if report["encode_fps"] is not None:
+        encode_fps.labels(report["profile"]).observe(report["encode_fps"])
+    for name, variant in report["variants"].items():
+        output_bitrate.labels(report["profile"], name).observe(variant["average_kbps"])
+
+
+def pool_samples(name: str, pool) -> Iterable[CollectedSample]:
+    """Utilization gauges of a QueuePool-like pool (pools without a size, e.g. NullPool, yield nothing)."""
+    if not all(hasattr(pool, attr) for attr in ("size", "checkedout", "overflow")):
+        return
+    labels = {"engine": name}
+    yield "db_pool_size", "Configured connections kept in the pool.", labels, pool.size()
+    yield "db_pool_checked_out", "Connections currently in use.", labels, pool.checkedout()
+    yield "db_pool_overflow", "Connections open beyond the pool size.", labels, max(pool.overflow(), 0)
+    max_overflow = getattr(pool, "_max_overflow", 0)
+    capacity = pool.size() + max(max_overflow, 0)
+    yield "db_pool_utilization", "Checked-out connections over pool size plus max overflow.", labels, (
+        pool.checkedout() / capacity if capacity else 0.0
+    )
+
+
+def cache_samples(name: str, stats: Dict[str, float]) -> Iterable[CollectedSample]:
+    labels = {"cache": name}
+    # Monotonic since start: counters, so rate() works on them
+    yield CollectedSample("cache_hits_total", "Cache hits since start.", labels, stats.get("hits", 0), "counter")
+    yield CollectedSample("cache_misses_total", "Cache misses since start.", labels, stats.get("misses", 0), "counter")
+    yield "cache_hit_ratio", "Hits over lookups since start.", labels, stats.get("hit_ratio", 0.0)
@@ -0,0 +1,75 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from passlib.context import CryptContext
+
+logger = logging.getLogger("uvicorn.error")
+
+# Configuration (env override supported)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# 0 hashes inline on the calling thread (scripts, tests); default is one worker per core
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    """True when a stored hash uses a deprecated scheme or a bcrypt cost other than BCRYPT_ROUNDS (either way)."""
+    return pwd_context.needs_update(hashed_password)
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a bounded process pool so hashing neither holds the GIL nor blocks the event loop.
+
+    The pool is created lazily with the "spawn" start method: workers only import this module, and
+    forking a process that already runs DB/upload threads is unsafe.
+    """
+
+    def __init__(self, max_workers: int = PASSWORD_HASH_WORKERS):
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+                logger.info("Password hashing pool started (%d workers, bcrypt rounds=%d)", self.max_workers, BCRYPT_ROUNDS)
+            return self._executor
+
+    async def _run(self, fn, *args):
+        if self.max_workers <= 0:
+            return fn(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), fn, *args)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,135 @@
+import logging
+import os
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger("uvicorn.error")
+
+# Configuration (env override supported)
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+# Debug only: EXPLAIN each slow SELECT on the same connection and log the plan
+SQL_EXPLAIN_SLOW_QUERIES = os.getenv("SQL_EXPLAIN_SLOW_QUERIES", "false").lower() == "true"
+QUERY_STATS_ENABLED = os.getenv("QUERY_STATS_ENABLED", "true").lower() == "true"
+
+_EXPLAIN_PREFIX = {"sqlite": "EXPLAIN QUERY PLAN ", "postgresql": "EXPLAIN ", "mysql": "EXPLAIN "}
+_START_KEY = "query_stats_start"
+
+
+@dataclass
+class QueryStats:
+    """SQL cost of one request: statement count, total and slowest execution time."""
+
+    count: int = 0
+    total_ms: float = 0.0
+    slowest_ms: float = 0.0
+    slowest_statement: Optional[str] = None
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        if elapsed_ms > self.slowest_ms:
+            self.slowest_ms = elapsed_ms
+            self.slowest_statement = statement
+
+    def server_timing(self) -> str:
+        """Server-Timing header value, e.g. `db;dur=12.40;desc="5 queries", db-slowest;dur=6.10`."""
+        return f'db;dur={self.total_ms:.2f};desc="{self.count} queries", db-slowest;dur={self.slowest_ms:.2f}'
+
+
+# Set per request by QueryStatsMiddleware; statements outside a request are only checked for slowness
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+_current_route: ContextVar[str] = ContextVar("query_stats_route", default="-")
+
+
+def current_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault(_START_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - conn.info[_START_KEY].pop()) * 1000
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, elapsed_ms)
+    if elapsed_ms >= SLOW_QUERY_MS:
+        logger.warning("Slow query (%.1f ms) during %s: %s", elapsed_ms, _current_route.get(), statement)
+        if SQL_EXPLAIN_SLOW_QUERIES and not executemany:
+            _log_plan(conn, statement, parameters)
+
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute; drop its start time
+    conn = exception_context.connection
+    if conn is not None and conn.info.get(_START_KEY):
+        conn.info[_START_KEY].pop()
+
+
+def _log_plan(conn, statement: str, parameters) -> None:
+    prefix = _EXPLAIN_PREFIX.get(conn.dialect.name)
+    if prefix is None or not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+        return
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        # Straight on the DBAPI cursor so the EXPLAIN itself isn't instrumented
+        cursor.execute(prefix + statement, parameters)
+        plan = "\n".join("  " + " | ".join(str(col) for col in row) for row in cursor.fetchall())
+        logger.warning("Query plan:\n%s", plan)
+    except Exception as e:
+        logger.debug("EXPLAIN failed: %s", e)
+    finally:
+        cursor.close()
+
+
+def instrument_engine(db_engine: Engine | AsyncEngine) -> None:
+    """Time every statement on `db_engine` (idempotent; async engines are hooked via their sync engine)."""
+    if isinstance(db_engine, AsyncEngine):
+        db_engine = db_engine.sync_engine
+    if event.contains(db_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(db_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(db_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(db_engine, "handle_error", _handle_error)
+
+
+class QueryStatsMiddleware:
+    """
+    ASGI middleware collecting the SQL statements each HTTP request runs on instrumented engines,
+    reported in a `Server-Timing` header.
+
+    The header goes out with the response start, so statements issued while a streaming body is
+    being sent (e.g. the catalog export) are logged if slow but not included in it.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not QUERY_STATS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        stats_token = _current.set(stats)
+        route_token = _current_route.set(f"{scope['method']} {scope['path']}")
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", stats.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(stats_token)
+            _current_route.reset(route_token)
@@ -0,0 +1,159 @@
+import math
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+
+from server.security import optional_token_subject
+
+# Configuration (env override supported). Budgets are "<requests>/<second|minute|hour>".
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_DEFAULT = os.getenv("RATE_LIMIT_DEFAULT", "100/minute")
+# bcrypt-heavy: signup and login
+RATE_LIMIT_AUTH = os.getenv("RATE_LIMIT_AUTH", "5/minute")
+# ffmpeg-heavy: upload-video and completing a resumable upload
+RATE_LIMIT_TRANSCODE = os.getenv("RATE_LIMIT_TRANSCODE", "10/hour")
+# Chunk PUTs and offset queries of resumable uploads: a large file takes many of them
+RATE_LIMIT_UPLOAD = os.getenv("RATE_LIMIT_UPLOAD", "1200/minute")
+# Job status and progress polling
+RATE_LIMIT_POLL = os.getenv("RATE_LIMIT_POLL", "120/minute")
+# Key by the first X-Forwarded-For address; only enable behind a proxy that sets it
+RATE_LIMIT_TRUST_FORWARDED = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "false").lower() == "true"
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+
+_PERIODS = {"second": 1.0, "minute": 60.0, "hour": 3600.0}
+
+
+class Rate(NamedTuple):
+    """A token bucket holding up to `capacity` requests, refilled evenly over `period` seconds."""
+
+    capacity: int
+    period: float
+
+    @property
+    def per_second(self) -> float:
+        return self.capacity / self.period
+
+
+def parse_rate(spec: str) -> Rate:
+    count, _, unit = spec.strip().partition("/")
+    period = _PERIODS.get(unit.strip().lower().rstrip("s"))
+    if period is None or not count.strip().isdigit() or int(count) <= 0:
+        raise ValueError(f"Invalid rate {spec!r}; expected e.g. '5/minute'")
+    return Rate(int(count), period)
+
+
+class RateLimitStore(ABC):
+    """
+    Token-bucket state shared by the workers that should enforce one budget together.
+
+    `take` must be atomic per key. A Redis implementation would keep (tokens, updated_at) in a hash
+    and run the refill/take in a Lua script; the in-memory store only covers one process.
+    """
+
+    @abstractmethod
+    async def take(self, key: str, rate: Rate, cost: float = 1.0) -> Tuple[bool, float]:
+        """
+        Refill the bucket for the time elapsed, then take `cost` tokens if available.
+
+        Returns:
+            (allowed, seconds until enough tokens are available when not allowed, else 0)
+        """
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    """Per-process buckets; the least recently used keys are dropped beyond `max_keys`."""
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def take(self, key: str, rate: Rate, cost: float = 1.0) -> Tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (float(rate.capacity), now))
+            tokens = min(float(rate.capacity), tokens + (now - updated) * rate.per_second)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            # A dropped bucket comes back full, so evicting idle keys only errs on the lenient side
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, 0.0 if allowed else (cost - tokens) / rate.per_second
+
+
+class RateLimited(Exception):
+    def __init__(self, budget: str, retry_after: float):
+        super().__init__(f"Rate limit exceeded for {budget}")
+        self.budget = budget
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """Named per-route budgets over a pluggable store."""
+
+    def __init__(self, budgets: Dict[str, Rate], store: Optional[RateLimitStore] = None):
+        self.budgets = budgets
+        self.store = store or MemoryRateLimitStore()
+
+    async def check(self, budget: str, client_key: str) -> None:
+        """Raises RateLimited when `client_key` has used up `budget`."""
+        allowed, retry_after = await self.store.take(f"{budget}:{client_key}", self.budgets[budget])
+        if not allowed:
+            raise RateLimited(budget, retry_after)
+
+
+limiter = RateLimiter(
+    {
+        "default": parse_rate(RATE_LIMIT_DEFAULT),
+        "auth": parse_rate(RATE_LIMIT_AUTH),
+        "transcode": parse_rate(RATE_LIMIT_TRANSCODE),
+        "upload": parse_rate(RATE_LIMIT_UPLOAD),
+        "poll": parse_rate(RATE_LIMIT_POLL),
+    }
+)
+
+
+def client_key(request: Request) -> str:
+    """`user:<id>` for a request carrying a valid access token, else `ip:<address>`."""
+    user_id = optional_token_subject(request)
+    if user_id is not None:
+        return f"user:{user_id}"
+    address = request.client.host if request.client else "unknown"
+    if RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            address = forwarded.split(",")[0].strip()
+    return f"ip:{address}"
+
+
+def rate_limit(budget: str):
+    """
+    Dependency enforcing `budget` per user (or per IP when anonymous).
+
+    Raises:
+        HTTPException 429 with Retry-After once the budget is used up.
+    """
+    if budget not in limiter.budgets:
+        raise ValueError(f"Unknown rate limit budget {budget!r}")
+
+    async def dependency(request: Request) -> None:
+        if not RATE_LIMIT_ENABLED:
+            return
+        try:
+            await limiter.check(budget, client_key(request))
+        except RateLimited as e:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests",
+                headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))},
+            )
+
+    return dependency
@@ -0,0 +1,200 @@
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, NamedTuple, Optional, Tuple
+from urllib.parse import urlencode
+
+# Configuration (env override supported)
+CATALOG_CACHE_ENABLED = os.getenv("CATALOG_CACHE_ENABLED", "true").lower() == "true"
+# Upper bound on a movie detail's staleness when another process writes it (per-process backends only)
+CATALOG_CACHE_TTL_SECONDS = float(os.getenv("CATALOG_CACHE_TTL_SECONDS", "60"))
+CATALOG_CACHE_MAX_ENTRIES = int(os.getenv("CATALOG_CACHE_MAX_ENTRIES", "1024"))
+
+
+class CacheBackend(ABC):
+    """
+    Key/value store behind the response cache.
+
+    The methods are the subset of Redis commands the cache needs (GET, SET with EX, DELETE, INCR)
+    with the same semantics, so a Redis (or Redis-compatible) client can be dropped in by
+    implementing them.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ex: Optional[float] = None) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> int:
+        ...
+
+    @abstractmethod
+    async def incr(self, key: str) -> int:
+        ...
+
+
+class MemoryLRUBackend(CacheBackend):
+    """In-process LRU with per-key expiry; the default backend."""
+
+    def __init__(self, max_entries: int = CATALOG_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[Optional[float], bytes]]" = OrderedDict()
+        # INCR counters live outside the LRU so they are never evicted ahead of the entries they version
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            if key in self._counters:
+                return str(self._counters[key]).encode()
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    async def set(self, key: str, value: bytes, ex: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + ex if ex else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    async def delete(self, *keys: str) -> int:
+        with self._lock:
+            return sum(
+                (self._data.pop(key, None) is not None) + (self._counters.pop(key, None) is not None) for key in keys
+            )
+
+    async def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    headers: Dict[str, str]
+
+
+class CacheStats:
+    """Hit ratio plus a sliding window of request latencies for cache hits and misses."""
+
+    def __init__(self, window: int = 1024):
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.invalidations = 0
+        self._latencies: Dict[bool, Deque[float]] = {True: deque(maxlen=window), False: deque(maxlen=window)}
+        self._lock = threading.Lock()
+
+    def record(self, hit: bool, latency: float) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            self._latencies[hit].append(latency)
+
+    @staticmethod
+    def _percentile(values, q: float) -> float:
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def summary(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            out: Dict[str, Any] = {
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+                "invalidations": self.invalidations,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+            for hit, name in ((True, "hit"), (False, "miss")):
+                values = list(self._latencies[hit])
+                out[f"{name}_latency_p50_ms"] = round(self._percentile(values, 0.50) * 1000, 2)
+                out[f"{name}_latency_p95_ms"] = round(self._percentile(values, 0.95) * 1000, 2)
+            return out
+
+
+class CatalogCache:
+    """
+    Read-through cache of serialized catalog responses (movie list pages and movie details).
+
+    Keys embed a catalog version, which orphans every cached page at once on a write without
+    scanning keys (orphans age out through the TTL/LRU). A response computed while a write lands is
+    stored under the version read before the query, so it can never be served afterwards.
+
+    Details use the counter `invalidate()` bumps. It lives in the backend, so with the per-process
+    default another process's writes show up only after the TTL. List pages are keyed by a stamp
+    read from the database instead (see `catalog_stamp`), which every write changes whatever
+    process made it.
+    """
+
+    VERSION_KEY = "catalog:version"
+
+    def __init__(
+        self,
+        backend: Optional[CacheBackend] = None,
+        *,
+        ttl: float = CATALOG_CACHE_TTL_SECONDS,
+        enabled: bool = CATALOG_CACHE_ENABLED,
+    ):
+        self.backend = backend or MemoryLRUBackend()
+        self.ttl = ttl
+        self.enabled = enabled
+        self.stats = CacheStats()
+
+    async def version(self) -> int:
+        raw = await self.backend.get(self.VERSION_KEY)
+        return int(raw) if raw else 0
+
+    @staticmethod
+    def list_key(version: Any, **params: Any) -> str:
+        """Key for a list page; None-valued params are dropped and the rest sorted, so equivalent queries share it."""
+        items = sorted((k, str(v)) for k, v in params.items() if v is not None)
+        return f"catalog:v{version}:list:{urlencode(items)}"
+
+    @staticmethod
+    def detail_key(version: int, movie_id: int) -> str:
+        return f"catalog:v{version}:movie:{movie_id}"
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        if not self.enabled:
+            return None
+        raw = await self.backend.get(key)
+        if raw is None:
+            return None
+        # Stored as: <headers JSON>\n<body>
+        head, _, body = raw.partition(b"\n")
+        return CachedResponse(body=body, headers=json.loads(head))
+
+    async def set(self, key: str, body: bytes, headers: Optional[Dict[str, str]] = None) -> None:
+        if not self.enabled:
+            return
+        await self.backend.set(key, json.dumps(headers or {}).encode() + b"\n" + body, ex=self.ttl)
+
+    async def invalidate(self) -> int:
+        self.stats.invalidations += 1
+        return await self.backend.incr(self.VERSION_KEY)
+
+
+catalog_cache = CatalogCache()
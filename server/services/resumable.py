@@ -0,0 +1,242 @@
+import asyncio
+import contextlib
+import json
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from datetime import datetime, UTC
+from pathlib import Path
+from typing import AsyncIterable, AsyncIterator, Dict, Optional, Tuple
+
+import anyio
+from fastapi.concurrency import run_in_threadpool
+
+from server.services.metrics import record_upload
+
+# Configuration (env override supported). Finalized uploads are renamed into a job working
+# directory under the same root, so keep it on one filesystem.
+UPLOAD_SESSIONS_DIR = os.getenv("UPLOAD_SESSIONS_DIR", os.path.join(tempfile.gettempdir(), "netflix_uploads"))
+# Sessions that received no bytes for this long are abandoned and deleted by `sweep_expired_sessions`
+UPLOAD_SESSION_TTL_SECONDS = int(os.getenv("UPLOAD_SESSION_TTL_SECONDS", str(24 * 3600)))
+# Request bodies arrive in small pieces; they are gathered into writes of this size off the event loop
+UPLOAD_WRITE_BUFFER_BYTES = 1024 * 1024
+
+
+class UploadSessionNotFound(Exception):
+    pass
+
+
+class UploadOffsetMismatch(Exception):
+    def __init__(self, expected: int):
+        super().__init__(f"Upload-Offset must be {expected}")
+        self.expected = expected
+
+
+class UploadExceedsLength(Exception):
+    pass
+
+
+class UploadIncomplete(Exception):
+    pass
+
+
+class UploadBusy(Exception):
+    pass
+
+
+class UploadSession:
+    """
+    A resumable upload stored as `<root>/<id>/meta.json` plus the `<root>/<id>/data` file
+    that chunks are written into in place. The current offset is the data file size.
+    """
+
+    def __init__(self, *, id: str, movie_id: int, filename: str, length: int, created_at: str):
+        self.id = id
+        self.movie_id = movie_id
+        self.filename = filename
+        self.length = length
+        self.created_at = created_at
+
+    @property
+    def dir(self) -> Path:
+        return Path(UPLOAD_SESSIONS_DIR) / self.id
+
+    @property
+    def data_path(self) -> Path:
+        return self.dir / "data"
+
+    @property
+    def offset(self) -> int:
+        try:
+            return self.data_path.stat().st_size
+        except FileNotFoundError:
+            # Completed (or deleted) since it was looked up
+            raise UploadSessionNotFound(self.id)
+
+    @property
+    def complete(self) -> bool:
+        return self.offset == self.length
+
+
+# One writer (or completion) per session at a time
+_locks: Dict[str, asyncio.Lock] = {}
+
+
+@contextlib.asynccontextmanager
+async def hold_session(session: UploadSession) -> AsyncIterator[None]:
+    """
+    Exclusive use of a session: a chunk write, or completing it (finalize, enqueue, delete).
+
+    Raises:
+        UploadBusy: if another request holds the session.
+    """
+    lock = _locks.setdefault(session.id, asyncio.Lock())
+    if lock.locked():
+        raise UploadBusy(session.id)
+    async with lock:
+        yield
+
+
+def create_session(*, movie_id: int, filename: str, length: int) -> UploadSession:
+    sweep_expired_sessions()
+    session = UploadSession(
+        id=uuid.uuid4().hex,
+        movie_id=movie_id,
+        filename=Path(filename).name,
+        length=length,
+        created_at=datetime.now(UTC).isoformat(),
+    )
+    session.dir.mkdir(parents=True)
+    session.data_path.touch()
+    (session.dir / "meta.json").write_text(json.dumps(vars(session)))
+    return session
+
+
+def _is_session_id(name: str) -> bool:
+    return len(name) == 32 and all(c in "0123456789abcdef" for c in name)
+
+
+def get_session(upload_id: str) -> UploadSession:
+    # Ids are uuid hex; reject anything else before touching the filesystem
+    if not _is_session_id(upload_id):
+        raise UploadSessionNotFound(upload_id)
+    meta = Path(UPLOAD_SESSIONS_DIR) / upload_id / "meta.json"
+    try:
+        return UploadSession(**json.loads(meta.read_text()))
+    except FileNotFoundError:
+        raise UploadSessionNotFound(upload_id)
+
+
+async def write_chunk(session: UploadSession, offset: int, chunks: AsyncIterable[bytes]) -> int:
+    """
+    Write a request body into the session's data file at `offset`, which must equal the current offset.
+
+    Bytes received before a disconnect are kept, so the client resumes from the new offset.
+
+    Returns:
+        The new offset.
+
+    Raises:
+        UploadSessionNotFound: if the session was completed or deleted meanwhile.
+    """
+    async with hold_session(session):
+        current = session.offset
+        if offset != current:
+            raise UploadOffsetMismatch(current)
+        start = time.perf_counter()
+        # File I/O runs on the threadpool, never on the event loop
+        try:
+            f = await run_in_threadpool(session.data_path.open, "r+b")
+        except FileNotFoundError:
+            raise UploadSessionNotFound(session.id)
+        await run_in_threadpool(f.seek, offset)
+        written = offset
+        pending = bytearray()
+        try:
+            async for chunk in chunks:
+                if written + len(pending) + len(chunk) > session.length:
+                    pending.clear()
+                    await run_in_threadpool(f.truncate, offset)
+                    written = offset
+                    raise UploadExceedsLength(session.id)
+                pending += chunk
+                if len(pending) >= UPLOAD_WRITE_BUFFER_BYTES:
+                    written += await run_in_threadpool(f.write, bytes(pending))
+                    pending.clear()
+        finally:
+            # Keep what arrived before a disconnect, even if the request is being cancelled
+            with anyio.CancelScope(shield=True):
+                try:
+                    if pending:
+                        written += await run_in_threadpool(f.write, bytes(pending))
+                finally:
+                    await run_in_threadpool(f.close)
+                    record_upload("resumable", written - offset, time.perf_counter() - start)
+        return written
+
+
+def finalize_session(session: UploadSession) -> Tuple[str, Path]:
+    """
+    Move the assembled file into a fresh working directory (a rename, not a copy).
+
+    The session itself stays until `delete_session`, so `restore_session` can undo this when the
+    file can't be handed over (e.g. no transcode slot is free).
+
+    Returns:
+        (workdir, source_path); the caller owns workdir from here on.
+
+    Raises:
+        UploadIncomplete: if not every byte has been received yet.
+        UploadSessionNotFound: if the session was completed or deleted meanwhile.
+    """
+    if not session.complete:
+        raise UploadIncomplete(session.id)
+    workdir = tempfile.mkdtemp(prefix="upload_hls_", dir=UPLOAD_SESSIONS_DIR)
+    dest = Path(workdir) / session.filename
+    try:
+        os.replace(session.data_path, dest)
+    except FileNotFoundError:
+        shutil.rmtree(workdir, ignore_errors=True)
+        raise UploadSessionNotFound(session.id)
+    return workdir, dest
+
+
+def restore_session(session: UploadSession, workdir: str, source_path: Path) -> None:
+    """Undo `finalize_session`: the file goes back into the session, which can be completed again."""
+    os.replace(source_path, session.data_path)
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+def delete_session(session: UploadSession) -> None:
+    shutil.rmtree(session.dir, ignore_errors=True)
+    _locks.pop(session.id, None)
+
+
+def sweep_expired_sessions(ttl_seconds: int = UPLOAD_SESSION_TTL_SECONDS, now: Optional[float] = None) -> int:
+    """
+    Delete sessions that received no bytes for `ttl_seconds` (abandoned uploads). Job working
+    directories under the same root belong to their jobs and are left alone.
+
+    Returns:
+        Number of sessions deleted.
+    """
+    root = Path(UPLOAD_SESSIONS_DIR)
+    if not root.is_dir():
+        return 0
+    cutoff = (time.time() if now is None else now) - ttl_seconds
+    swept = 0
+    for entry in root.iterdir():
+        if not _is_session_id(entry.name) or (entry.name in _locks and _locks[entry.name].locked()):
+            continue
+        try:
+            # Every chunk write updates the data file's mtime
+            last_write = max(p.stat().st_mtime for p in (entry, *entry.iterdir()))
+        except OSError:
+            continue
+        if last_write < cutoff:
+            shutil.rmtree(entry, ignore_errors=True)
+            _locks.pop(entry.name, None)
+            swept += 1
+    return swept
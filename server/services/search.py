@@ -0,0 +1,131 @@
+import os
+import re
+from abc import ABC, abstractmethod
+from typing import Any, Iterable, Optional, Tuple
+
+from sqlalchemy import DDL, Select, bindparam, column, event, false, literal_column, or_, table, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server.models.movie import Movie
+
+# Configuration (env override supported): "auto" picks FTS5 on SQLite and LIKE elsewhere
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "auto")
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class SearchBackend(ABC):
+    """
+    Full-text search over movie titles and descriptions.
+
+    `apply` narrows a select over Movie to the matches of `q` and returns it with a rank
+    expression (lower ranks first), or None when the backend can't rank.
+    `index`/`index_many`/`remove` keep the index in sync and must run inside the caller's
+    transaction so the catalog and its index commit together.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def apply(self, query: Select, q: str) -> Tuple[Select, Optional[Any]]:
+        ...
+
+    async def index(self, db: AsyncSession, movie_id: int, title: str, description: Optional[str]) -> None:
+        pass
+
+    async def index_many(self, db: AsyncSession, rows: Iterable[Tuple[int, str, Optional[str]]]) -> None:
+        for movie_id, title, description in rows:
+            await self.index(db, movie_id, title, description)
+
+    async def remove(self, db: AsyncSession, movie_id: int) -> None:
+        pass
+
+
+class LikeSearchBackend(SearchBackend):
+    """Portable fallback: case-insensitive substring match, no index and no relevance."""
+
+    name = "like"
+
+    def apply(self, query: Select, q: str) -> Tuple[Select, Optional[Any]]:
+        pattern = f"%{q}%"
+        return query.where(or_(Movie.title.ilike(pattern), Movie.description.ilike(pattern))), None
+
+
+class Fts5SearchBackend(SearchBackend):
+    """
+    SQLite FTS5 index `movies_fts(title, description)` keyed by rowid = movies.id.
+
+    Queries are tokenized and every token is prefix-matched (typeahead), ranked by bm25 with
+    title hits weighted above description hits.
+    """
+
+    name = "fts5"
+    TABLE = "movies_fts"
+    CREATE_SQL = (
+        "CREATE VIRTUAL TABLE IF NOT EXISTS movies_fts USING fts5("
+        "title, description, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    TITLE_WEIGHT = 10.0
+    DESCRIPTION_WEIGHT = 1.0
+
+    _fts = table("movies_fts", column("rowid"))
+
+    @staticmethod
+    def to_fts_query(q: str) -> str:
+        # Quote each token so user input can't inject FTS operators; "*" makes it a prefix query
+        return " ".join(f'"{token}"*' for token in _TOKEN_RE.findall(q))
+
+    def apply(self, query: Select, q: str) -> Tuple[Select, Optional[Any]]:
+        fts_query = self.to_fts_query(q)
+        if not fts_query:
+            return query.where(false()), None
+        query = query.join(self._fts, self._fts.c.rowid == Movie.id).where(
+            literal_column(self.TABLE).op("MATCH")(bindparam("fts_query", fts_query))
+        )
+        rank = literal_column(f"bm25({self.TABLE}, {self.TITLE_WEIGHT}, {self.DESCRIPTION_WEIGHT})")
+        return query, rank
+
+    async def index(self, db: AsyncSession, movie_id: int, title: str, description: Optional[str]) -> None:
+        await self.index_many(db, [(movie_id, title, description)])
+
+    async def index_many(self, db: AsyncSession, rows: Iterable[Tuple[int, str, Optional[str]]]) -> None:
+        params = [
+            {"id": movie_id, "title": title, "description": description or ""}
+            for movie_id, title, description in rows
+        ]
+        if params:
+            await db.execute(
+                text(f"INSERT OR REPLACE INTO {self.TABLE}(rowid, title, description) VALUES (:id, :title, :description)"),
+                params,
+            )
+
+    async def remove(self, db: AsyncSession, movie_id: int) -> None:
+        await db.execute(text(f"DELETE FROM {self.TABLE} WHERE rowid = :id"), {"id": movie_id})
+
+    @classmethod
+    def install(cls, conn: Connection) -> None:
+        """Create the index if missing and backfill it from movies when it is empty."""
+        conn.exec_driver_sql(cls.CREATE_SQL)
+        if conn.exec_driver_sql(f"SELECT count(*) FROM {cls.TABLE}").scalar() == 0:
+            conn.exec_driver_sql(
+                f"INSERT INTO {cls.TABLE}(rowid, title, description) "
+                "SELECT id, title, coalesce(description, '') FROM movies"
+            )
+
+
+_backends = {"like": LikeSearchBackend(), "fts5": Fts5SearchBackend()}
+
+
+def search_backend_for(dialect_name: str) -> SearchBackend:
+    if SEARCH_BACKEND != "auto":
+        return _backends[SEARCH_BACKEND]
+    return _backends["fts5" if dialect_name == "sqlite" else "like"]
+
+
+def get_search_backend(db: AsyncSession) -> SearchBackend:
+    return search_backend_for(db.bind.dialect.name)
+
+
+# Create the FTS5 table alongside movies (create_all); existing databases get it via install()
+event.listen(Movie.__table__, "after_create", DDL(Fts5SearchBackend.CREATE_SQL).execute_if(dialect="sqlite"))
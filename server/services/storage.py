@@ -0,0 +1,245 @@
+import mimetypes
+import os
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
+from pathlib import Path, PurePosixPath
+from typing import Any, Dict, Optional, Tuple
+
+import cloudinary.uploader
+
+try:
+    import boto3  # type: ignore
+except ImportError:
+    # Only needed for STORAGE_BACKEND=s3
+    boto3 = None
+
+from server.services import cloudinary_uploader
+
+# Configuration (env override supported)
+# Where published media goes: cloudinary, local or s3
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "cloudinary")
+MEDIA_ROOT = os.getenv("MEDIA_ROOT", str(Path(__file__).resolve().parents[1] / "media"))
+# URL prefix local media is served under (the app's /media route, or a CDN/web server in front of MEDIA_ROOT)
+MEDIA_PUBLIC_URL = os.getenv("MEDIA_PUBLIC_URL", "/media")
+S3_BUCKET = os.getenv("S3_BUCKET")
+# S3-compatible endpoint (MinIO, R2, ...); unset for AWS
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL")
+# Public URL prefix of the bucket; defaults to path-style "<endpoint>/<bucket>"
+S3_PUBLIC_URL = os.getenv("S3_PUBLIC_URL")
+# Browser/CDN caching of playlists and of other media (trailers, thumbnails); segments are immutable
+MEDIA_PLAYLIST_MAX_AGE = int(os.getenv("MEDIA_PLAYLIST_MAX_AGE", "10"))
+MEDIA_MAX_AGE = int(os.getenv("MEDIA_MAX_AGE", "3600"))
+
+# HLS segments are written once under a per-publish folder and never change
+SEGMENT_CACHE_CONTROL = "public, max-age=31536000, immutable"
+_SEGMENT_SUFFIXES = (".ts", ".m4s", ".aac")
+_MEDIA_TYPES = {".m3u8": "application/vnd.apple.mpegurl", ".ts": "video/mp2t", ".m4s": "video/iso.segment"}
+
+
+class StorageNotConfigured(Exception):
+    pass
+
+
+class InvalidKey(ValueError):
+    pass
+
+
+def media_type_for(key: str) -> str:
+    suffix = PurePosixPath(key).suffix.lower()
+    return _MEDIA_TYPES.get(suffix) or mimetypes.guess_type(key)[0] or "application/octet-stream"
+
+
+def cache_control_for(key: str) -> str:
+    """Cache-Control for a published object: immutable segments, briefly cached playlists."""
+    suffix = PurePosixPath(key).suffix.lower()
+    if suffix in _SEGMENT_SUFFIXES:
+        return SEGMENT_CACHE_CONTROL
+    if suffix == ".m3u8":
+        return f"public, max-age={MEDIA_PLAYLIST_MAX_AGE}"
+    return f"public, max-age={MEDIA_MAX_AGE}"
+
+
+def _check_key(key: str) -> PurePosixPath:
+    path = PurePosixPath(key)
+    if not key or path.is_absolute() or any(part in ("", ".", "..") for part in key.split("/")):
+        raise InvalidKey(f"Invalid media key: {key!r}")
+    return path
+
+
+class StorageBackend(ABC):
+    """
+    Where published media lives. Objects are addressed by "/"-separated keys such as
+    "movies/1/feature/ab12/feature_720p_000.ts" and exposed through public URLs.
+
+    `kind` tells backends that treat media types differently (Cloudinary) what a file is:
+    "raw" (HLS playlists and segments), "video" or "image".
+    """
+
+    name = ""
+    # Upload errors not worth retrying
+    permanent_errors: Tuple[type, ...] = (InvalidKey,)
+
+    def ensure_configured(self) -> None:
+        """Raises StorageNotConfigured when uploads can't work (missing credentials, ...)."""
+
+    @abstractmethod
+    def put_file(self, local_path: str, key: str, kind: str = "raw") -> str:
+        """Store a local file under `key`, replacing any previous object, and return its public URL."""
+
+    @abstractmethod
+    def url_for(self, key: str) -> str:
+        ...
+
+
+class CloudinaryStorage(StorageBackend):
+    """Cloudinary: HLS files as raw resources (public id keeps the extension), videos/images by stem."""
+
+    name = "cloudinary"
+    permanent_errors = StorageBackend.permanent_errors + cloudinary_uploader.PERMANENT_ERRORS
+
+    def _cloud_name(self) -> str:
+        cloud_name = os.getenv("CLOUDINARY_CLOUD_NAME")
+        if not cloud_name or not os.getenv("CLOUDINARY_API_KEY") or not os.getenv("CLOUDINARY_API_SECRET"):
+            raise StorageNotConfigured("Cloudinary is not configured on the server")
+        return cloud_name
+
+    def ensure_configured(self) -> None:
+        self._cloud_name()
+
+    def put_file(self, local_path: str, key: str, kind: str = "raw") -> str:
+        path = _check_key(key)
+        folder = str(path.parent)
+        if kind == "raw":
+            cloudinary_uploader.upload_raw(local_path, folder, path.name)
+            return self.url_for(key)
+        cloudinary_uploader.ensure_http_pool()
+        res = cloudinary.uploader.upload(
+            local_path, resource_type=kind, folder=folder, public_id=path.stem, overwrite=True
+        )
+        url = res.get("secure_url") or res.get("url")
+        if not url:
+            raise RuntimeError(f"Cloudinary did not return a URL for {key}")
+        return url
+
+    def url_for(self, key: str) -> str:
+        path = _check_key(key)
+        return cloudinary_uploader.raw_url_for(self._cloud_name(), str(path.parent), path.name)
+
+
+class LocalStorage(StorageBackend):
+    """
+    Files under `root`, served by the app's /media route (or anything serving `root` at `base_url`).
+
+    Files are copied to a temporary name and renamed into place, so a reader never sees a
+    partially written segment or playlist.
+    """
+
+    name = "local"
+
+    def __init__(self, root: str = MEDIA_ROOT, base_url: str = MEDIA_PUBLIC_URL):
+        self.root = root
+        self.base_url = base_url.rstrip("/")
+
+    def path_for(self, key: str) -> Path:
+        return Path(self.root).joinpath(*_check_key(key).parts)
+
+    def put_file(self, local_path: str, key: str, kind: str = "raw") -> str:
+        target = self.path_for(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as dst, open(local_path, "rb") as src:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+            os.replace(tmp, target)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        return self.url_for(key)
+
+    def url_for(self, key: str) -> str:
+        return f"{self.base_url}/{_check_key(key)}"
+
+
+class S3Storage(StorageBackend):
+    """
+    S3 or an S3-compatible object store (MinIO, R2, ...) through a boto3-style client
+    (`upload_file(Filename, Bucket, Key, ExtraArgs=...)`). Objects carry their Content-Type and
+    Cache-Control, so the bucket or a CDN in front of it serves them with the right caching.
+    """
+
+    name = "s3"
+
+    def __init__(
+        self,
+        bucket: Optional[str] = S3_BUCKET,
+        *,
+        client: Any = None,
+        endpoint_url: Optional[str] = S3_ENDPOINT_URL,
+        public_url: Optional[str] = S3_PUBLIC_URL,
+    ):
+        self.bucket = bucket
+        self.endpoint_url = endpoint_url
+        self.public_url = public_url
+        self._client = client
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            self.ensure_configured()
+            # Credentials come from the usual AWS_* environment / config chain
+            self._client = boto3.client("s3", endpoint_url=self.endpoint_url)
+        return self._client
+
+    def ensure_configured(self) -> None:
+        if not self.bucket:
+            raise StorageNotConfigured("S3_BUCKET is not set")
+        if self._client is None and boto3 is None:
+            raise StorageNotConfigured("boto3 is required for the s3 storage backend")
+
+    def put_file(self, local_path: str, key: str, kind: str = "raw") -> str:
+        _check_key(key)
+        extra: Dict[str, str] = {"ContentType": media_type_for(key), "CacheControl": cache_control_for(key)}
+        self.client.upload_file(Filename=local_path, Bucket=self.bucket, Key=key, ExtraArgs=extra)
+        return self.url_for(key)
+
+    def url_for(self, key: str) -> str:
+        _check_key(key)
+        if self.public_url:
+            base = self.public_url.rstrip("/")
+        elif self.endpoint_url:
+            base = f"{self.endpoint_url.rstrip('/')}/{self.bucket}"
+        else:
+            base = f"https://{self.bucket}.s3.amazonaws.com"
+        return f"{base}/{key}"
+
+
+def create_storage(name: str = STORAGE_BACKEND) -> StorageBackend:
+    backends = {"cloudinary": CloudinaryStorage, "local": LocalStorage, "s3": S3Storage}
+    if name not in backends:
+        raise ValueError(f"Unknown STORAGE_BACKEND {name!r}, expected one of {sorted(backends)}")
+    return backends[name]()
+
+
+class MediaStorage:
+    """Process-wide handle on the configured backend; swap `backend` to publish elsewhere."""
+
+    def __init__(self, backend: StorageBackend):
+        self.backend = backend
+
+    @property
+    def local(self) -> Optional[LocalStorage]:
+        """The backend when media is stored on local disk (and served by this app), else None."""
+        return self.backend if isinstance(self.backend, LocalStorage) else None
+
+    def ensure_configured(self) -> None:
+        self.backend.ensure_configured()
+
+    def put_file(self, local_path: str, key: str, kind: str = "raw") -> str:
+        return self.backend.put_file(local_path, key, kind)
+
+    def url_for(self, key: str) -> str:
+        return self.backend.url_for(key)
+
+
+media_storage = MediaStorage(create_storage())
@@ -0,0 +1,140 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from server.models.user import User
+
+# Configuration (env override supported); a TTL of 0 disables the cache
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "30"))
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
+
+
+class UserCache:
+    """
+    In-process TTL + LRU cache of resolved user principals, keyed by (user_id, token).
+
+    Entries expire after `ttl` seconds (or earlier, at the token's own expiry) and the least recently
+    used entry is evicted once `max_entries` is reached. `invalidate(user_id)` drops every token cached for
+    that user; it is wired to ORM updates/deletes of User below, so role or profile changes take
+    effect on the next request.
+    """
+
+    def __init__(self, *, ttl: float = USER_CACHE_TTL_SECONDS, max_entries: int = USER_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[int, str], Tuple[float, Any]]" = OrderedDict()
+        self._by_user: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0
+
+    def get(self, user_id: int, token: str) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        key = (user_id, token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, principal = entry
+            if expires_at <= time.monotonic():
+                self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return principal
+
+    def set(self, user_id: int, token: str, principal: Any, *, token_expires_in: Optional[float] = None) -> None:
+        if not self.enabled:
+            return
+        ttl = self.ttl if token_expires_in is None else min(self.ttl, token_expires_in)
+        if ttl <= 0:
+            return
+        key = (user_id, token)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, principal)
+            self._entries.move_to_end(key)
+            self._by_user.setdefault(user_id, set()).add(token)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            tokens = self._by_user.pop(user_id, None)
+            if not tokens:
+                return
+            for token in tokens:
+                self._entries.pop((user_id, token), None)
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _drop(self, key: Tuple[int, str]) -> None:
+        # Caller holds the lock
+        self._entries.pop(key, None)
+        tokens = self._by_user.get(key[0])
+        if tokens is not None:
+            tokens.discard(key[1])
+            if not tokens:
+                del self._by_user[key[0]]
+
+
+user_cache = UserCache()
+
+
+# Invalidate on every flushed update/delete of a User, and once more after the commit so a request
+# that re-cached the old row between flush and commit cannot keep serving it.
+_PENDING_KEY = "user_cache_pending_invalidations"
+
+
+def _on_user_changed(mapper, connection, target: User) -> None:
+    user_cache.invalidate(target.id)
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, set()).add(target.id)
+
+
+def _on_commit(session: Session) -> None:
+    pending: Optional[Set[int]] = session.info.pop(_PENDING_KEY, None)
+    for user_id in pending or ():
+        user_cache.invalidate(user_id)
+
+
+def _on_rollback(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+event.listen(User, "after_update", _on_user_changed)
+event.listen(User, "after_delete", _on_user_changed)
+event.listen(Session, "after_commit", _on_commit)
+event.listen(Session, "after_soft_rollback", _on_rollback)
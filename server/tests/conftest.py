@@ -1,32 +1,55 @@
 import os
 import tempfile
+from pathlib import Path
+
 import pytest
+
+# Cheap bcrypt for the suite; must be set before server modules read their config
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+# The app's own engine (lifespan, job workers) uses a temporary SQLite file instead of server/app.db
+_TEST_DB = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+_TEST_DB.close()
+os.environ["DATABASE_URL"] = f"sqlite:///{_TEST_DB.name}"
+os.environ.pop("ASYNC_DATABASE_URL", None)
+
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.pool import NullPool
 
 from server.main import app
-from server.db import Base, get_db
+from server import db as app_db
+from server.db import Base, create_async_db_engine, create_db_engine, get_async_db, get_db
 from server import models as _models_pkg  # noqa: F401
 from server.models import user as _user_model  # noqa: F401
 from server.models import movie as _movie_model  # noqa: F401
+from server.models import job as _job_model  # noqa: F401
+from server.services import cloudinary_uploader
+from server.services.jobs import job_queue
+from server.services.media_index import media_index
+from server.services.query_stats import instrument_engine
+from server.services.rate_limit import MemoryRateLimitStore, limiter
+from server.services.response_cache import MemoryLRUBackend, catalog_cache
+from server.services.user_cache import user_cache
+from server.usecases import video_pipeline
 
 
 @pytest.fixture(scope="session")
 def db_engine():
-    # Use a temporary SQLite file to persist across connections
-    tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
-    tmp.close()
-    engine = create_engine(f"sqlite:///{tmp.name}", connect_args={"check_same_thread": False})
+    # The same temporary SQLite file the app's engine points at, so it persists across connections
+    engine = create_db_engine(f"sqlite:///{_TEST_DB.name}")
     Base.metadata.create_all(bind=engine)
     try:
         yield engine
     finally:
-        # Cleanup file
-        try:
-            os.remove(tmp.name)
-        except FileNotFoundError:
-            pass
+        # Cleanup file (plus WAL side files)
+        engine.dispose()
+        app_db.engine.dispose()
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.remove(_TEST_DB.name + suffix)
+            except FileNotFoundError:
+                pass
 
 
 @pytest.fixture()
@@ -42,6 +65,11 @@ def db_session(db_engine):
 @pytest.fixture()
 def client(db_engine):
     TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=db_engine)
+    # NullPool: each TestClient runs its own event loop, so don't carry connections across loops
+    async_engine = create_async_db_engine(f"sqlite+aiosqlite:///{db_engine.url.database}", poolclass=NullPool)
+    instrument_engine(db_engine)
+    instrument_engine(async_engine)
+    TestingAsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
 
     def override_get_db():
         db = TestingSessionLocal()
@@ -50,8 +78,82 @@ def client(db_engine):
         finally:
             db.close()
 
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as db:
+            yield db
+
     # Override app dependency
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    # Tests reuse user ids and write rows directly, so cached state must not leak between them
+    user_cache.clear()
+    catalog_cache.backend = MemoryLRUBackend()
+    # Every test client shares one address; start each test with full buckets
+    limiter.store = MemoryRateLimitStore()
     with TestClient(app) as c:
+        # The lifespan started the job workers on the same file; keep its loop, use the test sessions
+        job_queue.bind(TestingSessionLocal, async_session_factory=TestingAsyncSessionLocal)
         yield c
     app.dependency_overrides.clear()
+    user_cache.clear()
+
+
+def fake_transcode_to_hls(input_path, output_dir, base_name, segment_time=6, ladder=None, **tuning):
+    # Local stand-in for ffmpeg: a master playlist plus two variants of two segments each.
+    # Like a deterministic encoder, segment i only depends on the i-th "|"-separated part of the
+    # source, so re-edits that keep a part keep its segments byte for byte.
+    out_dir = Path(output_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    index_path = out_dir / f"{base_name}.m3u8"
+    parts = Path(input_path).read_bytes().split(b"|")
+    outputs = []
+    for variant in ("720p", "360p"):
+        entries = []
+        for i in range(2):
+            seg = out_dir / f"{base_name}_{variant}_{i:03d}.ts"
+            seg.write_bytes(f"{variant}:{i}:".encode() + parts[i % len(parts)])
+            outputs.append(str(seg))
+            entries.append(f"#EXTINF:{segment_time}.0,\n{seg.name}\n")
+        playlist = out_dir / f"{base_name}_{variant}.m3u8"
+        playlist.write_text("#EXTM3U\n" + "".join(entries) + "#EXT-X-ENDLIST\n")
+        outputs.append(str(playlist))
+    index_path.write_text(
+        "#EXTM3U\n"
+        f"#EXT-X-STREAM-INF:BANDWIDTH=2800000\n{base_name}_720p.m3u8\n"
+        f"#EXT-X-STREAM-INF:BANDWIDTH=800000\n{base_name}_360p.m3u8\n"
+    )
+    outputs.append(str(index_path))
+    return str(index_path), sorted(outputs)
+
+
+def fake_transcode_to_hls_streaming(
+    input_path, output_dir, base_name, on_segment, segment_time=6, ladder=None, **tuning
+):
+    index_path, outputs = fake_transcode_to_hls(input_path, output_dir, base_name, segment_time, ladder)
+    for path in outputs:
+        if path.endswith(".ts"):
+            on_segment(path)
+    return index_path, outputs
+
+
+@pytest.fixture()
+def fake_media(monkeypatch, tmp_path):
+    """
+    Local stand-ins for ffmpeg and the Cloudinary upload call, plus an empty media dedup index;
+    yields the (folder, name) uploads.
+    """
+    uploaded: list[tuple[str, str]] = []
+
+    def fake_upload_raw(local_path, folder, public_basename):
+        assert Path(local_path).exists()
+        uploaded.append((folder, public_basename))
+
+    monkeypatch.setenv("CLOUDINARY_CLOUD_NAME", "demo")
+    monkeypatch.setenv("CLOUDINARY_API_KEY", "key")
+    monkeypatch.setenv("CLOUDINARY_API_SECRET", "secret")
+    monkeypatch.setattr(video_pipeline, "transcode_to_hls", fake_transcode_to_hls)
+    monkeypatch.setattr(video_pipeline, "transcode_to_hls_streaming", fake_transcode_to_hls_streaming)
+    monkeypatch.setattr(video_pipeline, "transcode_to_hls_parallel", fake_transcode_to_hls_streaming)
+    monkeypatch.setattr(cloudinary_uploader, "upload_raw", fake_upload_raw)
+    monkeypatch.setattr(media_index, "root", str(tmp_path / "media_index"))
+    return uploaded
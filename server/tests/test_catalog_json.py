@@ -0,0 +1,56 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from server.models.movie import Movie, MovieGenre
+from server.routes import movies as movie_routes
+from server.schema.movie import MovieOut
+from server.services import fastjson
+from server.services.response_cache import MemoryLRUBackend, catalog_cache
+from server.usecases.movies import CATALOG_ROW_FIELDS
+from server.tests.test_movies import auth_client_for_user, make_user
+
+
+def test_row_fields_match_response_schema():
+    assert CATALOG_ROW_FIELDS == tuple(MovieOut.model_fields)
+
+
+@pytest.mark.parametrize("with_orjson", [True, False])
+def test_fast_path_matches_model_serialization(
+    client: TestClient, db_session: Session, monkeypatch, with_orjson: bool
+):
+    if not with_orjson:
+        monkeypatch.setattr(fastjson, "orjson", None)
+    user = make_user(db_session, email=f"json-{with_orjson}@example.com", name="Json")
+    auth_client_for_user(client, user)
+    db_session.add_all(
+        [
+            Movie(
+                title=f"Überflieger {with_orjson}",
+                description="Ünïcode ✓",
+                genre=MovieGenre.SciFi,
+                rating=4.5,
+                release_year=1999,
+                duration=121,
+                is_premium=True,
+                video_url="https://cdn.example.com/x.m3u8",
+            ),
+            Movie(title=f"Plain {with_orjson}", genre=MovieGenre.Drama),
+            Movie(title=f"Whole {with_orjson}", genre=MovieGenre.Comedy, rating=4),
+        ]
+    )
+    db_session.commit()
+
+    pages = {}
+    for fast_path in (True, False):
+        monkeypatch.setattr(movie_routes, "CATALOG_JSON_FAST_PATH", fast_path)
+        catalog_cache.backend = MemoryLRUBackend()
+        res = client.get("/movies", params={"limit": 100})
+        assert res.status_code == 200
+        pages[fast_path] = res.content
+
+    assert pages[True] == pages[False]
+    row = next(m for m in json.loads(pages[True]) if m["title"].startswith("Überflieger"))
+    assert row["genre"] == "Sci-Fi" and row["rating"] == 4.5 and row["is_premium"] is True
@@ -0,0 +1,137 @@
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import cloudinary
+import pytest
+
+from server.services import cloudinary_uploader
+from server.services.cloudinary_uploader import UPLOAD_CONCURRENCY, ParallelUploader, upload_files_as_raw
+
+
+class FakeUploadServer(ThreadingHTTPServer):
+    """Local stand-in for the Cloudinary upload API recording public ids and client ports."""
+
+    daemon_threads = True
+
+    def __init__(self, fail_once: set[str]):
+        super().__init__(("127.0.0.1", 0), FakeUploadHandler)
+        self.fail_once = set(fail_once)
+        self.uploads: list[str] = []
+        self.client_ports: set[int] = set()
+        self.lock = threading.Lock()
+
+
+class FakeUploadHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        public_id = re.search(rb'name="public_id"\r\n\r\n([^\r]+)', body).group(1).decode()
+        server: FakeUploadServer = self.server  # type: ignore[assignment]
+        with server.lock:
+            server.client_ports.add(self.client_address[1])
+            fail = public_id in server.fail_once
+            server.fail_once.discard(public_id)
+            if not fail:
+                server.uploads.append(public_id)
+        if fail:
+            self._reply(500, {"error": {"message": "transient"}})
+        else:
+            self._reply(200, {"public_id": public_id, "secure_url": f"https://example/{public_id}"})
+
+    def _reply(self, code: int, payload: dict):
+        data = json.dumps(payload).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def fake_server():
+    server = FakeUploadServer(fail_once={"seg_003.ts"})
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    config = cloudinary.config()
+    saved = (config.upload_prefix, config.cloud_name, config.api_key, config.api_secret)
+    cloudinary.config(
+        upload_prefix=f"http://127.0.0.1:{server.server_address[1]}",
+        cloud_name="demo",
+        api_key="key",
+        api_secret="secret",
+    )
+    try:
+        yield server
+    finally:
+        config.upload_prefix, config.cloud_name, config.api_key, config.api_secret = saved
+        server.shutdown()
+        server.server_close()
+
+
+def test_parallel_upload_retries_and_uploads_playlists_last(tmp_path: Path, fake_server):
+    files = []
+    for i in range(12):
+        seg = tmp_path / f"seg_{i:03d}.ts"
+        seg.write_bytes(b"\x47" * 188 * 10)
+        files.append((str(seg), seg.name))
+    variant = tmp_path / "movie_720p.m3u8"
+    variant.write_text("#EXTM3U\n#EXTINF:6.0,\nseg_000.ts\n")
+    master = tmp_path / "movie.m3u8"
+    master.write_text("#EXTM3U\n#EXT-X-STREAM-INF:BANDWIDTH=2800000\nmovie_720p.m3u8\n")
+    files = [(str(master), master.name), (str(variant), variant.name)] + files
+
+    progress = []
+    stats = upload_files_as_raw(files, folder="movies/1/movie", on_uploaded=lambda d, t: progress.append((d, t)), max_workers=4)
+
+    uploads = fake_server.uploads
+    assert len(uploads) == 14
+    assert uploads[-2:] == ["movie_720p.m3u8", "movie.m3u8"]
+    summary = stats.summary()
+    assert summary["files"] == 14
+    assert summary["retries"] == 1
+    assert summary["bytes"] == 12 * 1880 + variant.stat().st_size + master.stat().st_size
+    assert summary["bytes_per_sec"] > 0
+    assert progress[-1] == (14, 14)
+    # Keep-alive connections are reused instead of one per file
+    assert len(fake_server.client_ports) <= UPLOAD_CONCURRENCY
+
+
+def test_playlists_not_uploaded_when_a_segment_fails(tmp_path: Path, fake_server):
+    seg = tmp_path / "seg_003.ts"
+    seg.write_bytes(b"\x47" * 188)
+    playlist = tmp_path / "movie.m3u8"
+    playlist.write_text("#EXTM3U\n")
+
+    uploader = ParallelUploader("movies/1/movie", max_attempts=1)
+    uploader.submit(str(seg), seg.name)
+    with pytest.raises(Exception):
+        uploader.finish([(str(playlist), playlist.name)])
+    assert fake_server.uploads == []
+
+
+def test_http_pool_follows_later_cloudinary_config(monkeypatch):
+    config = cloudinary.config()
+    monkeypatch.setattr(cloudinary_uploader, "_http_pool_key", None)
+    monkeypatch.setattr(cloudinary.uploader, "_http", cloudinary.uploader._http)
+    monkeypatch.setattr(config, "api_proxy", None, raising=False)
+
+    cloudinary_uploader.ensure_http_pool()
+    pooled = cloudinary.uploader._http
+    assert pooled.connection_pool_kw["maxsize"] == UPLOAD_CONCURRENCY
+    cloudinary_uploader.ensure_http_pool()
+    assert cloudinary.uploader._http is pooled
+
+    # Configured after import (e.g. a proxy): the next upload gets a pool built for it
+    cloudinary.config(api_proxy="http://proxy.internal:3128")
+    cloudinary_uploader.ensure_http_pool()
+    proxied = cloudinary.uploader._http
+    assert proxied is not pooled
+    assert proxied.proxy.host == "proxy.internal"
+    assert proxied.connection_pool_kw["maxsize"] == UPLOAD_CONCURRENCY
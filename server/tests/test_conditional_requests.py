@@ -0,0 +1,92 @@
+from datetime import datetime, UTC
+
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from server.models.movie import Movie
+from server.services.http_cache import is_not_modified
+from server.services.response_cache import MemoryLRUBackend, catalog_cache
+from server.tests.test_movies import auth_client_for_user, make_user
+
+
+def test_if_none_match_comparison():
+    headers = {"ETag": '"abc"', "Last-Modified": "Sat, 17 Oct 2026 10:00:00 GMT"}
+    assert is_not_modified({"if-none-match": '"abc"'}, headers)
+    assert is_not_modified({"if-none-match": 'W/"abc"'}, headers)
+    assert is_not_modified({"if-none-match": '"x", "abc"'}, headers)
+    assert is_not_modified({"if-none-match": "*"}, headers)
+    assert not is_not_modified({"if-none-match": '"x"'}, headers)
+    # If-None-Match takes precedence over If-Modified-Since
+    assert not is_not_modified(
+        {"if-none-match": '"x"', "if-modified-since": "Sat, 17 Oct 2026 11:00:00 GMT"}, headers
+    )
+    assert is_not_modified({"if-modified-since": "Sat, 17 Oct 2026 10:00:00 GMT"}, headers)
+    assert not is_not_modified({"if-modified-since": "Sat, 17 Oct 2026 09:59:59 GMT"}, headers)
+    assert not is_not_modified({"if-modified-since": "garbage"}, headers)
+
+
+def test_movie_detail_revalidation(client: TestClient, db_session: Session):
+    admin = make_user(db_session, email="etag-admin@example.com", name="ETag Admin", role="admin")
+    auth_client_for_user(client, admin)
+    movie_id = client.post("/movies", json={"title": "Validator", "genre": "Drama"}).json()["id"]
+
+    first = client.get(f"/movies/{movie_id}")
+    etag = first.headers["ETag"]
+    assert first.headers["Last-Modified"].endswith("GMT")
+
+    res = client.get(f"/movies/{movie_id}", headers={"If-None-Match": etag})
+    assert res.status_code == 304
+    assert res.content == b""
+    assert res.headers["ETag"] == etag
+
+    # Cold cache: answered from the row's validators without serializing it
+    catalog_cache.backend = MemoryLRUBackend()
+    assert client.get(f"/movies/{movie_id}", headers={"If-None-Match": etag}).status_code == 304
+    res = client.get(f"/movies/{movie_id}", headers={"If-Modified-Since": first.headers["Last-Modified"]})
+    assert res.status_code == 304
+
+    # Updates within the same second still produce a new ETag
+    client.put(f"/movies/{movie_id}", json={"description": "v2"})
+    res = client.get(f"/movies/{movie_id}", headers={"If-None-Match": etag})
+    assert res.status_code == 200
+    assert res.headers["ETag"] != etag
+    assert res.json()["description"] == "v2"
+
+
+def test_movie_list_revalidation(client: TestClient, db_session: Session):
+    admin = make_user(db_session, email="etag-admin2@example.com", name="ETag Admin 2", role="admin")
+    auth_client_for_user(client, admin)
+    client.post("/movies", json={"title": "Listed", "genre": "Comedy"})
+
+    first = client.get("/movies", params={"genre": "Comedy"})
+    etag = first.headers["ETag"]
+    assert client.get("/movies", params={"genre": "Comedy"}, headers={"If-None-Match": etag}).status_code == 304
+    # Another query is another representation
+    other = client.get("/movies", params={"genre": "Drama"}, headers={"If-None-Match": etag})
+    assert other.status_code == 200 and other.headers["ETag"] != etag
+
+    client.post("/movies", json={"title": "Listed Too", "genre": "Comedy"})
+    res = client.get("/movies", params={"genre": "Comedy"}, headers={"If-None-Match": etag})
+    assert res.status_code == 200
+    assert {m["title"] for m in res.json()} >= {"Listed", "Listed Too"}
+
+
+def test_movie_list_sees_writes_from_other_processes(client: TestClient, db_session: Session):
+    admin = make_user(db_session, email="etag-admin3@example.com", name="ETag Admin 3", role="admin")
+    auth_client_for_user(client, admin)
+    movie_id = client.post("/movies", json={"title": "Elsewhere", "genre": "Thriller"}).json()["id"]
+
+    first = client.get("/movies", params={"genre": "Thriller"})
+    etag = first.headers["ETag"]
+    assert client.get("/movies", params={"genre": "Thriller"}, headers={"If-None-Match": etag}).status_code == 304
+
+    # Written by another worker: this process's catalog version never moves
+    db_session.execute(
+        update(Movie).where(Movie.id == movie_id).values(description="changed", updated_at=datetime.now(UTC))
+    )
+    db_session.commit()
+    res = client.get("/movies", params={"genre": "Thriller"}, headers={"If-None-Match": etag})
+    assert res.status_code == 200
+    assert res.headers["X-Cache"] == "MISS"
+    assert [m["description"] for m in res.json() if m["id"] == movie_id] == ["changed"]
@@ -0,0 +1,28 @@
+from pathlib import Path
+
+from sqlalchemy import text
+
+from server.db import create_db_engine
+
+
+def test_sqlite_engine_applies_pragmas_and_pool_settings(tmp_path: Path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'pragmas.db'}", pool_size=3, max_overflow=1)
+    try:
+        with engine.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+            assert conn.execute(text("PRAGMA mmap_size")).scalar() > 0
+        assert engine.pool.size() == 3
+        assert engine.pool._max_overflow == 1
+    finally:
+        engine.dispose()
+
+
+def test_in_memory_sqlite_skips_queue_pool_options():
+    engine = create_db_engine("sqlite://")
+    try:
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT 1")).scalar() == 1
+    finally:
+        engine.dispose()
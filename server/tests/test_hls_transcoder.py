@@ -0,0 +1,289 @@
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from server.services import hls_transcoder
+from server.services.hls_transcoder import (
+    RENDITION_PRESETS,
+    TranscodeCancelled,
+    build_hls_command,
+    parse_ladder,
+    encode_report,
+    plan_chunks,
+    read_media_playlist,
+    select_renditions,
+    transcode_to_hls_parallel,
+    tune_renditions,
+    variant_names,
+    watch_segments,
+)
+
+
+def test_parse_ladder_presets_and_custom_rungs_sorted_highest_first():
+    ladder = parse_ladder("360p, 540p:540:1200k,1080p")
+    assert [r.name for r in ladder] == ["1080p", "540p", "360p"]
+    custom = ladder[1]
+    assert (custom.height, custom.video_bitrate, custom.maxrate, custom.bufsize) == (540, "1200k", "1284k", "1800k")
+
+
+@pytest.mark.parametrize("spec", ["", "4k", "540p:abc:1200k", "540p:540:1200"])
+def test_parse_ladder_rejects_invalid_specs(spec):
+    with pytest.raises(ValueError):
+        parse_ladder(spec)
+
+
+def test_select_renditions_skips_upscaling():
+    ladder = parse_ladder("1080p,720p,480p,360p")
+    assert [r.name for r in select_renditions(ladder, 720)] == ["720p", "480p", "360p"]
+    assert [r.name for r in select_renditions(ladder, 240)] == ["360p"]
+    assert select_renditions(ladder, None) == ladder
+
+
+def test_build_hls_command_single_decode_with_master_playlist():
+    ladder = [RENDITION_PRESETS["720p"], RENDITION_PRESETS["360p"]]
+    cmd = build_hls_command("in.mp4", "/out", "movie", ladder, segment_time=4)
+
+    assert cmd.count("-i") == 1
+    graph = cmd[cmd.index("-filter_complex") + 1]
+    assert graph == "[0:v]split=2[v0][v1];[v0]scale=-2:720[v0out];[v1]scale=-2:360[v1out]"
+    assert cmd[cmd.index("-maxrate:v:1") + 1] == "856k"
+    assert cmd[cmd.index("-master_pl_name") + 1] == "movie.m3u8"
+    assert cmd[cmd.index("-var_stream_map") + 1] == "v:0,a:0,name:720p v:1,a:1,name:360p"
+    assert cmd[-1] == "/out/movie_%v.m3u8"
+
+
+def test_build_hls_command_without_audio_maps_video_only():
+    cmd = build_hls_command("in.mp4", "/out", "movie", [RENDITION_PRESETS["480p"]], has_audio=False)
+    assert "0:a:0" not in cmd
+    assert cmd[cmd.index("-var_stream_map") + 1] == "v:0,name:480p"
+
+
+def test_variant_names_from_outputs():
+    outputs = ["/o/m.m3u8", "/o/m_360p.m3u8", "/o/m_1080p.m3u8", "/o/m_360p_000.ts"]
+    assert variant_names("/o/m.m3u8", outputs) == ["1080p", "360p"]
+
+
+def test_watch_segments_reports_each_closed_segment_once(tmp_path: Path):
+    done = threading.Event()
+
+    def fake_encoder():
+        for i in range(3):
+            tmp = tmp_path / f"movie_720p_{i:03d}.ts.tmp"
+            tmp.write_bytes(b"\x47" * 188)
+            time.sleep(0.02)
+            tmp.rename(tmp_path / f"movie_720p_{i:03d}.ts")
+        done.set()
+
+    reported = []
+    encoder = threading.Thread(target=fake_encoder)
+    encoder.start()
+    watch_segments(str(tmp_path), "movie", lambda: not done.is_set(), reported.append, poll_interval=0.005)
+    encoder.join()
+
+    assert [Path(p).name for p in reported] == ["movie_720p_000.ts", "movie_720p_001.ts", "movie_720p_002.ts"]
+
+
+def test_build_hls_command_with_temp_file_flag():
+    cmd = build_hls_command("in.mp4", "/out", "movie", [RENDITION_PRESETS["360p"]], hls_flags="temp_file")
+    assert cmd[cmd.index("-hls_flags") + 1] == "temp_file"
+
+
+def test_build_hls_command_caps_threads():
+    cmd = build_hls_command("in.mp4", "/out", "movie", [RENDITION_PRESETS["360p"]], threads=2)
+    assert cmd[cmd.index("-threads") + 1] == "2"
+    assert cmd[cmd.index("-filter_complex_threads") + 1] == "2"
+
+
+def test_plan_chunks_cuts_on_keyframes_at_whole_segments():
+    keyframes = [0.0, 2.0, 4.0, 6.0, 8.0, 10.0, 12.0, 14.0, 16.5, 18.5, 20.0, 26.0]
+    # 10s chunks round up to 12s (two 6s segments); each cut is the first keyframe 12s past the previous one
+    assert plan_chunks(keyframes, chunk_seconds=10, segment_time=6) == [0.0, 12.0, 26.0]
+    assert plan_chunks(keyframes, chunk_seconds=60, segment_time=6) == [0.0]
+    assert plan_chunks([], chunk_seconds=60) == [0.0]
+
+
+def test_build_hls_command_shifts_chunk_timestamps():
+    cmd = build_hls_command("chunk.mkv", "/out", "movie", [RENDITION_PRESETS["360p"]], output_ts_offset=12)
+    assert cmd[cmd.index("-output_ts_offset") + 1] == "12.000000"
+    assert cmd.index("-output_ts_offset") < cmd.index("-f")
+
+
+def test_transcode_to_hls_parallel_stitches_chunks_in_order(tmp_path: Path, monkeypatch):
+    offsets = []
+
+    def fake_split(input_path, output_dir, starts):
+        Path(output_dir).mkdir(parents=True)
+        return [str(Path(output_dir) / f"chunk_{i:03d}.mkv") for i in range(len(starts))]
+
+    def fake_chunk(chunk_path, output_dir, base_name, renditions, segment_time, has_audio, offset, threads, *tuning):
+        # Later chunks finish first, stitching must still follow playback order
+        time.sleep(0.05 if offset == 0 else 0)
+        offsets.append(offset)
+        out = Path(output_dir)
+        out.mkdir(parents=True)
+        for r in renditions:
+            names = [f"{base_name}_{r.name}_{i:03d}.ts" for i in range(2)]
+            for name in names:
+                (out / name).write_bytes(f"{offset}:{name}".encode())
+            (out / f"{base_name}_{r.name}.m3u8").write_text(
+                f"#EXTM3U\n#EXTINF:6.000000,\n{names[0]}\n#EXTINF:4.000000,\n{names[1]}\n#EXT-X-ENDLIST\n"
+            )
+        (out / f"{base_name}.m3u8").write_text("#EXTM3U\n" + "".join(f"{base_name}_{r.name}.m3u8\n" for r in renditions))
+        return output_dir
+
+    monkeypatch.setattr(hls_transcoder, "ensure_ffmpeg", lambda: None)
+    monkeypatch.setattr(hls_transcoder, "probe_keyframes", lambda path: [0.0, 5.0, 10.0, 15.0, 20.0])
+    monkeypatch.setattr(hls_transcoder, "probe_source", lambda path: (720, True))
+    monkeypatch.setattr(hls_transcoder, "split_at_keyframes", fake_split)
+    monkeypatch.setattr(hls_transcoder, "_transcode_chunk", fake_chunk)
+
+    reported = []
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        index_path, outputs = transcode_to_hls_parallel(
+            "in.mp4", str(tmp_path), "movie", segment_time=5, ladder=parse_ladder("720p,360p"),
+            on_segment=reported.append, chunk_seconds=10, executor=pool,
+        )
+
+    assert sorted(offsets) == [0.0, 10.0, 20.0]
+    assert Path(index_path).read_text() == "#EXTM3U\nmovie_720p.m3u8\nmovie_360p.m3u8\n"
+    entries = read_media_playlist(str(tmp_path / "movie_720p.m3u8"))
+    assert [uri for _, uri in entries] == [f"movie_720p_{i:03d}.ts" for i in range(6)]
+    assert [d for d, _ in entries] == [6.0, 4.0] * 3
+    assert "#EXT-X-TARGETDURATION:6" in (tmp_path / "movie_720p.m3u8").read_text()
+    assert (tmp_path / "movie_720p_002.ts").read_bytes() == b"10.0:movie_720p_000.ts"
+    assert [Path(p).name for p in reported if "_720p_" in p] == [f"movie_720p_{i:03d}.ts" for i in range(6)]
+    assert variant_names(index_path, outputs) == ["720p", "360p"]
+    assert len(outputs) == 12 + 3
+    assert not (tmp_path / ".movie_chunks").exists()
+
+
+def test_transcode_to_hls_parallel_stops_running_chunks_on_cancel(tmp_path: Path, monkeypatch):
+    stopped = []
+
+    class Cancelled(Exception):
+        pass
+
+    def fake_split(input_path, output_dir, starts):
+        Path(output_dir).mkdir(parents=True)
+        return [str(Path(output_dir) / f"chunk_{i:03d}.mkv") for i in range(len(starts))]
+
+    def endless_chunk(chunk_path, output_dir, base_name, renditions, segment_time, has_audio, offset, threads, *tuning):
+        # A long encode that only ends when asked to, like _transcode_chunk's ffmpeg
+        cancel_flag = Path(tuning[-1])
+        deadline = time.monotonic() + 5
+        while not cancel_flag.exists():
+            assert time.monotonic() < deadline, "chunk was never told to stop"
+            time.sleep(0.01)
+        stopped.append(offset)
+        raise TranscodeCancelled(chunk_path)
+
+    checks = []
+
+    def checkpoint():
+        checks.append(time.monotonic())
+        if len(checks) == 3:
+            raise Cancelled()
+
+    monkeypatch.setattr(hls_transcoder, "ensure_ffmpeg", lambda: None)
+    monkeypatch.setattr(hls_transcoder, "probe_keyframes", lambda path: [0.0, 5.0, 10.0, 15.0, 20.0])
+    monkeypatch.setattr(hls_transcoder, "probe_source", lambda path: (720, True))
+    monkeypatch.setattr(hls_transcoder, "split_at_keyframes", fake_split)
+    monkeypatch.setattr(hls_transcoder, "_transcode_chunk", endless_chunk)
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        with pytest.raises(Cancelled):
+            transcode_to_hls_parallel(
+                "in.mp4", str(tmp_path), "movie", segment_time=5, ladder=parse_ladder("360p"),
+                chunk_seconds=10, executor=pool, complexity=1.0, checkpoint=checkpoint, poll_interval=0.01,
+            )
+
+    # Every chunk was running and got stopped before the call returned
+    assert sorted(stopped) == [0.0, 10.0, 20.0]
+    assert not (tmp_path / ".movie_chunks").exists()
+
+
+def test_transcode_chunk_kills_ffmpeg_once_cancel_flag_exists(tmp_path: Path, monkeypatch):
+    pid_file = tmp_path / "pid"
+    script = f"import os, time; open({str(pid_file)!r}, 'w').write(str(os.getpid())); time.sleep(60)"
+    monkeypatch.setattr(hls_transcoder, "build_hls_command", lambda *args, **kwargs: [sys.executable, "-c", script])
+    cancel_flag = tmp_path / "cancelled"
+
+    def cancel_once_running():
+        deadline = time.monotonic() + 10
+        while not pid_file.exists() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        cancel_flag.touch()
+
+    threading.Thread(target=cancel_once_running, daemon=True).start()
+
+    started = time.monotonic()
+    with pytest.raises(TranscodeCancelled):
+        hls_transcoder._transcode_chunk(
+            "chunk.mkv", str(tmp_path / "out"), "movie", [], 6, True, 0.0, 1, "fast_publish", 1.0,
+            str(cancel_flag), poll_interval=0.01,
+        )
+    assert time.monotonic() - started < 10
+    with pytest.raises(ProcessLookupError):
+        os.kill(int(pid_file.read_text()), 0)
+
+
+def test_tune_renditions_follows_source_complexity():
+    ladder = parse_ladder("720p,360p")
+    assert [(e.crf, e.maxrate) for e in tune_renditions(ladder, 1.0, "fast_publish")] == [(23, "2996k"), (23, "856k")]
+    # Simple content: better quality for cheap bits, and caps it never needs are lowered
+    assert [(e.crf, e.maxrate, e.bufsize) for e in tune_renditions(ladder, 0.5, "fast_publish")] == [
+        (21, "1498k", "2100k"),
+        (21, "428k", "600k"),
+    ]
+    # Busy content: higher CRF keeps it near the caps; bandwidth_optimized tightens the caps further
+    assert [(e.crf, e.maxrate) for e in tune_renditions(ladder, 4.0, "bandwidth_optimized")] == [(29, "2396k"), (29, "684k")]
+    with pytest.raises(ValueError):
+        tune_renditions(ladder, 1.0, "archival")
+
+
+def test_build_hls_command_uses_capped_crf_and_encoder_presets():
+    ladder = [RENDITION_PRESETS["360p"]]
+    cmd = build_hls_command("in.mp4", "/out", "movie", ladder, profile="bandwidth_optimized", complexity=0.5)
+    assert cmd[cmd.index("-c:v:0") + 1] == "libx264"
+    assert cmd[cmd.index("-crf:v:0") + 1] == "23"
+    assert cmd[cmd.index("-maxrate:v:0") + 1] == "342k"
+    assert cmd[cmd.index("-preset") + 1] == "slow"
+    assert "-b:v:0" not in cmd
+
+    nvenc = build_hls_command("in.mp4", "/out", "movie", ladder, encoder="h264_nvenc")
+    assert nvenc[nvenc.index("-cq:v:0") + 1] == "23"
+    assert nvenc[nvenc.index("-preset") + 1] == "p2"
+    assert nvenc[nvenc.index("-rc") + 1] == "vbr"
+    with pytest.raises(ValueError):
+        build_hls_command("in.mp4", "/out", "movie", ladder, encoder="mpeg2video")
+
+
+def test_encode_report_measures_bitrate_and_fps(tmp_path: Path):
+    outputs = []
+    for name, sizes in (("720p", (7500, 5000)), ("360p", (1500, 1000))):
+        entries = ""
+        for i, size in enumerate(sizes):
+            seg = tmp_path / f"movie_{name}_{i:03d}.ts"
+            seg.write_bytes(b"\0" * size)
+            outputs.append(str(seg))
+            entries += f"#EXTINF:{6.0 if i == 0 else 4.0:.6f},\n{seg.name}\n"
+        playlist = tmp_path / f"movie_{name}.m3u8"
+        playlist.write_text(f"#EXTM3U\n{entries}#EXT-X-ENDLIST\n")
+        outputs.append(str(playlist))
+    index = tmp_path / "movie.m3u8"
+    index.write_text("#EXTM3U\nmovie_720p.m3u8\nmovie_360p.m3u8\n")
+    outputs.append(str(index))
+
+    report = encode_report(
+        str(index), outputs, 2.0, ladder=parse_ladder("720p,360p"), profile="fast_publish", frame_rate=30
+    )
+    assert report["variants"] == {
+        "720p": {"average_kbps": 10.0, "crf": 23, "maxrate": "2996k"},
+        "360p": {"average_kbps": 2.0, "crf": 23, "maxrate": "856k"},
+    }
+    assert (report["media_seconds"], report["speed"], report["encode_fps"]) == (10.0, 5.0, 150.0)
@@ -0,0 +1,52 @@
+import hashlib
+import io
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from server.services.ingest import UploadTooLarge, ingest_upload
+from server.tests.test_movies import make_user, auth_client_for_user
+
+
+class ChunkCountingReader(io.BytesIO):
+    def __init__(self, data: bytes):
+        super().__init__(data)
+        self.max_request = 0
+
+    def readinto(self, b):
+        self.max_request = max(self.max_request, len(b))
+        return super().readinto(b)
+
+
+def test_ingest_streams_in_chunks_and_hashes(tmp_path: Path):
+    data = b"x" * 10_000 + b"y" * 5
+    src = ChunkCountingReader(data)
+    result = ingest_upload(src, str(tmp_path / "out.bin"), max_bytes=len(data), chunk_size=1024)
+
+    assert result.size == len(data)
+    assert result.sha256 == hashlib.sha256(data).hexdigest()
+    assert (tmp_path / "out.bin").read_bytes() == data
+    assert src.max_request == 1024
+    assert result.bytes_per_sec > 0
+
+
+def test_ingest_rejects_oversized_stream_and_removes_partial_file(tmp_path: Path):
+    dest = tmp_path / "big.bin"
+    with pytest.raises(UploadTooLarge):
+        ingest_upload(io.BytesIO(b"z" * 5000), str(dest), max_bytes=4096, chunk_size=1024)
+    assert not dest.exists()
+
+
+def test_upload_video_over_limit_returns_413(client: TestClient, db_session: Session, fake_media, monkeypatch):
+    admin = make_user(db_session, email="ingest-admin@example.com", name="IngestAdmin", role="admin")
+    auth_client_for_user(client, admin)
+    movie_id = client.post("/movies", json={"title": "Too Big", "genre": "Drama"}).json()["id"]
+
+    monkeypatch.setattr("server.routes.movies.MAX_VIDEO_UPLOAD_BYTES", 10)
+    res = client.post(
+        f"/movies/{movie_id}/upload-video",
+        files={"file": ("big.mp4", b"0123456789abc", "video/mp4")},
+    )
+    assert res.status_code == 413
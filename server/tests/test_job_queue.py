@@ -0,0 +1,174 @@
+import threading
+import time
+from datetime import datetime, UTC
+
+import pytest
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session, sessionmaker
+
+from server.db import Base, create_db_engine
+from server.models.job import VideoJob
+from server.services.jobs import JobNotCancellable, JobQueue, JobStatus, QueueFull
+from server.tests.test_movies import make_user, auth_client_for_user
+from server.tests.test_video_jobs import wait_for_job
+
+
+@pytest.fixture()
+def jobs_db(tmp_path):
+    # Own database per test: rows left queued elsewhere would be picked up by these queues
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    Base.metadata.create_all(bind=engine)
+    try:
+        yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    finally:
+        engine.dispose()
+
+
+def wait_until_done(queue: JobQueue, job_id: str, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if job.done:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job did not finish: {job.status}")
+
+
+def test_trailers_run_before_earlier_features(jobs_db):
+    queue = JobQueue(max_workers=1, max_pending=10)
+    ran = []
+    queue.register("upload-video", lambda job: ran.append(job.params["name"]) or {})
+    queue.register("upload-trailer", lambda job: ran.append(job.params["name"]) or {})
+    queue.bind(jobs_db)
+    feature = queue.submit(kind="upload-video", movie_id=1, params={"name": "feature"})
+    trailer = queue.submit(kind="upload-trailer", movie_id=1, params={"name": "trailer"})
+    assert (feature.priority, trailer.priority) == (10, 0)
+
+    queue.start(jobs_db)
+    try:
+        assert wait_until_done(queue, feature.id).status == JobStatus.SUCCEEDED
+        assert ran == ["trailer", "feature"]
+    finally:
+        queue.shutdown()
+
+
+def test_cancel_queued_and_running_jobs(jobs_db):
+    queue = JobQueue(max_workers=1, max_pending=10)
+    started = threading.Event()
+
+    def slow(job):
+        started.set()
+        while True:
+            job.raise_if_cancelled()
+            time.sleep(0.01)
+
+    queue.register("slow", slow)
+    queue.start(jobs_db)
+    try:
+        running = queue.submit(kind="slow", movie_id=1, params={})
+        assert started.wait(5)
+        queued = queue.submit(kind="slow", movie_id=1, params={})
+
+        assert queue.cancel(queued.id).status == JobStatus.CANCELLED
+        queue.cancel(running.id)
+        assert wait_until_done(queue, running.id).status == JobStatus.CANCELLED
+        with pytest.raises(JobNotCancellable):
+            queue.cancel(queued.id)
+        assert queue.pending == 0
+    finally:
+        queue.shutdown()
+
+    with jobs_db() as db:
+        assert {row.status for row in db.query(VideoJob)} == {JobStatus.CANCELLED}
+
+
+def test_finished_and_cancelled_jobs_remove_their_workdir(jobs_db, tmp_path):
+    queue = JobQueue(max_workers=1, max_pending=10)
+    release = threading.Event()
+    queue.register("blocking", lambda job: release.wait(5) and {})
+    workdirs = []
+    for name in ("running", "queued"):
+        workdir = tmp_path / name
+        workdir.mkdir()
+        (workdir / "source.mp4").write_bytes(b"video")
+        workdirs.append(workdir)
+
+    queue.start(jobs_db)
+    try:
+        running = queue.submit(kind="blocking", movie_id=1, params={"workdir": str(workdirs[0])})
+        queued = queue.submit(kind="blocking", movie_id=1, params={"workdir": str(workdirs[1])})
+
+        # Never reaches its handler, so only the queue can clean up after it
+        assert queue.cancel(queued.id).status == JobStatus.CANCELLED
+        assert not workdirs[1].exists()
+
+        release.set()
+        assert wait_until_done(queue, running.id).status == JobStatus.SUCCEEDED
+        assert not workdirs[0].exists()
+    finally:
+        release.set()
+        queue.shutdown()
+
+
+def test_start_resumes_queued_and_interrupted_jobs(jobs_db):
+    now = datetime.now(UTC)
+    with jobs_db() as db:
+        for job_id, status in (("interrupted", JobStatus.RUNNING), ("waiting", JobStatus.QUEUED)):
+            db.add(
+                VideoJob(
+                    id=job_id,
+                    kind="echo",
+                    movie_id=1,
+                    priority=10,
+                    status=status,
+                    stage="transcoding" if status == JobStatus.RUNNING else "queued",
+                    progress=40.0 if status == JobStatus.RUNNING else 0.0,
+                    params='{"value": "%s"}' % job_id,
+                    attempts=1 if status == JobStatus.RUNNING else 0,
+                    created_at=now,
+                    started_at=now if status == JobStatus.RUNNING else None,
+                )
+            )
+        db.commit()
+
+    queue = JobQueue(max_workers=1, max_pending=1)
+    queue.register("echo", lambda job: {"value": job.params["value"]})
+    assert queue.start(jobs_db) == 2
+    try:
+        for job_id in ("interrupted", "waiting"):
+            job = wait_until_done(queue, job_id)
+            assert (job.status, job.result) == (JobStatus.SUCCEEDED, {"value": job_id})
+    finally:
+        queue.shutdown()
+    with jobs_db() as db:
+        assert db.get(VideoJob, "interrupted").attempts == 2
+
+
+def test_submit_refuses_beyond_max_pending(jobs_db):
+    queue = JobQueue(max_workers=1, max_pending=1)
+    queue.register("echo", lambda job: {})
+    queue.bind(jobs_db)
+    queue.submit(kind="echo", movie_id=1, params={})
+    with pytest.raises(QueueFull):
+        queue.submit(kind="echo", movie_id=1, params={})
+
+
+def test_trailer_asset_job_and_cancel_endpoint(client: TestClient, db_session: Session, fake_media):
+    admin = make_user(db_session, email="queue-admin@example.com", name="QueueAdmin", role="admin")
+    auth_client_for_user(client, admin)
+    movie_id = client.post("/movies", json={"title": "Queued Trailer Movie", "genre": "Drama"}).json()["id"]
+
+    res = client.post(
+        f"/movies/{movie_id}/upload-video?asset=trailer",
+        files={"file": ("teaser.mp4", b"teaser", "video/mp4")},
+    )
+    assert res.status_code == 202, res.text
+    job = wait_for_job(client, res.json()["status_url"])
+    assert (job["status"], job["kind"]) == ("succeeded", "upload-trailer")
+    movie = client.get(f"/movies/{movie_id}").json()
+    assert movie["trailer_url"] == job["result"]["video_url"]
+    assert movie["video_url"] != movie["trailer_url"]
+
+    assert client.delete(res.json()["status_url"]).status_code == 409
+    assert client.delete(f"/movies/{movie_id}/jobs/unknown").status_code == 404
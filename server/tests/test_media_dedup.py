@@ -0,0 +1,74 @@
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from server.services import cloudinary_uploader
+from server.tests.test_movies import auth_client_for_user, make_user
+from server.tests.test_video_jobs import wait_for_job
+
+
+def _upload(client: TestClient, movie_id: int, content: bytes, filename: str = "cut.mp4", **params) -> dict:
+    res = client.post(
+        f"/movies/{movie_id}/upload-video",
+        params=params,
+        files={"file": (filename, content, "video/mp4")},
+    )
+    assert res.status_code == 202, res.text
+    job = wait_for_job(client, res.json()["status_url"])
+    assert job["status"] == "succeeded", job
+    return job
+
+
+def test_repeat_upload_skips_transcode_and_upload(client: TestClient, db_session: Session, fake_media):
+    admin = make_user(db_session, email="dedup-admin@example.com", name="Dedup Admin", role="admin")
+    auth_client_for_user(client, admin)
+    first = client.post("/movies", json={"title": "Dedup One", "genre": "Drama"}).json()["id"]
+    second = client.post("/movies", json={"title": "Dedup Two", "genre": "Drama"}).json()["id"]
+
+    published = _upload(client, first, b"same|source")["result"]
+    assert len(fake_media) == 7
+
+    again = _upload(client, second, b"same|source")
+    assert len(fake_media) == 7  # nothing transcoded or uploaded
+    assert again["result"] == published
+    assert client.get(f"/movies/{second}").json()["video_url"] == published["video_url"]
+
+    # Forced: transcoded and uploaded again in full
+    _upload(client, second, b"same|source", force="true")
+    assert len(fake_media) == 14
+
+
+def test_re_edit_reuses_identical_segments(client: TestClient, db_session: Session, fake_media, monkeypatch):
+    admin = make_user(db_session, email="dedup-admin2@example.com", name="Dedup Admin 2", role="admin")
+    auth_client_for_user(client, admin)
+    movie_id = client.post("/movies", json={"title": "Dedup Re-edit", "genre": "Drama"}).json()["id"]
+    _upload(client, movie_id, b"opening|ending v1")
+    fake_upload = cloudinary_uploader.upload_raw
+    playlists = {}
+
+    def capture_playlists(local_path, folder, public_basename):
+        if public_basename.endswith(".m3u8"):
+            playlists[public_basename] = Path(local_path).read_text().splitlines()
+        fake_upload(local_path, folder, public_basename)
+
+    monkeypatch.setattr(cloudinary_uploader, "upload_raw", capture_playlists)
+    before = len(fake_media)
+    _upload(client, movie_id, b"opening|ending v2", filename="recut.mp4")
+
+    # Only the changed segments and the playlists were uploaded
+    assert sorted(name for _, name in fake_media[before:]) == [
+        "recut.m3u8",
+        "recut_360p.m3u8",
+        "recut_360p_001.ts",
+        "recut_720p.m3u8",
+        "recut_720p_001.ts",
+    ]
+    # Unchanged segments are served from where they were first published
+    first_cut = f"https://res.cloudinary.com/demo/raw/upload/movies/{movie_id}/cut"
+    # (under the first publish's own folder)
+    assert any(
+        line.startswith(f"{first_cut}/") and line.endswith("/cut_720p_000.ts") for line in playlists["recut_720p.m3u8"]
+    )
+    assert "recut_720p_001.ts" in playlists["recut_720p.m3u8"]
+    assert "recut_360p.m3u8" in playlists["recut.m3u8"]
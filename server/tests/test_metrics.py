@@ -0,0 +1,80 @@
+import re
+import threading
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from server import main
+from server.services.metrics import Histogram, Registry
+from server.tests.test_movies import auth_client_for_user, make_user
+
+
+def _sample(text: str, name: str, **labels) -> float:
+    wanted = ",".join(f'{k}="{v}"' for k, v in labels.items())
+    pattern = "^" + re.escape(f"{name}{{{wanted}}}" if labels else name) + r" (\S+)$"
+    match = re.search(pattern, text, re.MULTILINE)
+    assert match, f"{name} {labels} not in metrics"
+    return float(match.group(1))
+
+
+def test_histogram_is_cumulative_across_threads():
+    registry = Registry()
+    family = registry.histogram("work_seconds", "Work.", ("kind",), buckets=(0.1, 1.0))
+    child = family.labels("a")
+    assert family.labels("a") is child
+
+    def observe():
+        for value in (0.05, 0.5, 5.0) * 100:
+            child.observe(value)
+
+    threads = [threading.Thread(target=observe) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    text = registry.render()
+    assert "# TYPE work_seconds histogram" in text
+    assert _sample(text, "work_seconds_bucket", kind="a", le="0.1") == 400
+    assert _sample(text, "work_seconds_bucket", kind="a", le="1") == 800
+    assert _sample(text, "work_seconds_bucket", kind="a", le="+Inf") == 1200
+    assert _sample(text, "work_seconds_count", kind="a") == 1200
+    assert abs(_sample(text, "work_seconds_sum", kind="a") - 2220.0) < 1e-6
+    assert isinstance(child, Histogram)
+
+
+def test_metrics_endpoint_reports_routes_pools_and_caches(client: TestClient, db_session: Session, monkeypatch):
+    user = make_user(db_session, email="metrics@example.com", name="Metrics")
+    auth_client_for_user(client, user)
+    before = client.get("/metrics").text
+    count = lambda text, route: (
+        _sample(text, "http_request_duration_seconds_count", method="GET", route=route)
+        if f'route="{route}"' in text else 0
+    )
+
+    for _ in range(3):
+        assert client.get("/movies").status_code == 200
+    client.get("/movies/999999")
+    client.get("/no-such-page")
+
+    res = client.get("/metrics")
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = res.text
+    # Labelled by route template, never by concrete path
+    assert count(text, "/movies") - count(before, "/movies") == 3
+    assert count(text, "/movies/{movie_id}") - count(before, "/movies/{movie_id}") == 1
+    assert count(text, "<unmatched>") >= 1
+    assert "/movies/999999" not in text
+    # The scrape itself is in flight
+    assert _sample(text, "http_requests_in_flight") == 1
+    assert _sample(text, "cache_hit_ratio", cache="user") > 0
+    assert "# TYPE cache_hits_total counter" in text
+    assert _sample(text, "cache_hits_total", cache="user") > 0
+    assert _sample(text, "cache_misses_total", cache="catalog") >= 0
+    assert "cache_hit_ratio{cache=\"catalog\"}" in text
+    assert _sample(text, "db_pool_size", engine="sync") > 0
+
+    monkeypatch.setattr(main, "METRICS_TOKEN", "s3cret")
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer s3cret"}).status_code == 200
@@ -0,0 +1,64 @@
+from contextlib import contextmanager
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from server.tests.test_movies import auth_client_for_user, make_user
+
+
+@contextmanager
+def movie_statements():
+    """Collect SQL statements touching the movies table (or its search index)."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "movies" in statement:
+            statements.append(statement.lstrip().split(None, 1)[0].upper())
+
+    event.listen(Engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(Engine, "before_cursor_execute", capture)
+
+
+def test_movie_writes_round_trips(client: TestClient, db_session: Session):
+    admin = make_user(db_session, email="rt-admin@example.com", name="Round Trip Admin", role="admin")
+    auth_client_for_user(client, admin)
+
+    # INSERT ... RETURNING, then the search index write; no existence check, no refresh
+    with movie_statements() as statements:
+        res = client.post("/movies", json={"title": "Round Trip", "genre": "Drama", "description": "one"})
+    assert res.status_code == 201, res.text
+    assert res.json()["created_at"] is not None
+    assert statements == ["INSERT", "INSERT"]
+    movie_id = res.json()["id"]
+
+    # The unique constraint rejects duplicates: one failed INSERT, no lookup first
+    with movie_statements() as statements:
+        res = client.post("/movies", json={"title": "Round Trip", "genre": "Drama"})
+    assert res.status_code == 409
+    assert statements == ["INSERT"]
+
+    # UPDATE ... RETURNING, then a reindex because the title changed
+    with movie_statements() as statements:
+        res = client.put(f"/movies/{movie_id}", json={"title": "Round Trip 2"})
+    assert res.status_code == 200, res.text
+    movie = res.json()["movie"]
+    assert movie["title"] == "Round Trip 2" and movie["description"] == "one"
+    assert statements == ["UPDATE", "INSERT"]
+
+    # Non-text fields don't touch the search index
+    with movie_statements() as statements:
+        res = client.put(f"/movies/{movie_id}", json={"rating": 4.5})
+    assert res.status_code == 200
+    assert res.json()["movie"]["rating"] == 4.5
+    assert statements == ["UPDATE"]
+
+    client.post("/movies", json={"title": "Other Trip", "genre": "Drama"})
+    with movie_statements() as statements:
+        assert client.put(f"/movies/{movie_id}", json={"title": "Other Trip"}).status_code == 409
+        assert client.put("/movies/999999", json={"rating": 1}).status_code == 404
+    assert statements == ["UPDATE", "UPDATE"]
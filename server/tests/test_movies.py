@@ -108,3 +108,39 @@ def test_update_movie_title_conflict(client: TestClient, db_session: Session):
     # attempt to rename B to A -> conflict
     r_update = client.put(f"/movies/{id_b}", json={"title": "A"})
     assert r_update.status_code == 409
+
+
+@pytest.mark.parametrize("order", ["newest", "oldest", "rating_desc", "rating_asc"])
+def test_list_movies_cursor_pagination_walks_every_row_once(client: TestClient, db_session: Session, order: str):
+    admin = make_user(db_session, email=f"pager-{order}@example.com", name="Pager", role="admin")
+    auth_client_for_user(client, admin)
+    ratings = [4.5, None, 3.0, 4.5, None, 1.0, 3.0]
+    for i, rating in enumerate(ratings):
+        payload = {"title": f"Keyset {order} {i}", "genre": "Drama"}
+        if rating is not None:
+            payload["rating"] = rating
+        assert client.post("/movies", json=payload).status_code == 201
+
+    params = {"q": f"Keyset {order}", "order": order, "limit": 100}
+    expected = [m["id"] for m in client.get("/movies", params=params).json()]
+    assert len(expected) == len(ratings)
+
+    seen, cursor = [], None
+    while True:
+        res = client.get("/movies", params={**params, "limit": 2, **({"cursor": cursor} if cursor else {})})
+        assert res.status_code == 200
+        seen += [m["id"] for m in res.json()]
+        cursor = res.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert seen == expected
+
+    # Offset paging still works for the first request
+    page = client.get("/movies", params={**params, "limit": 2, "offset": 2}).json()
+    assert [m["id"] for m in page] == expected[2:4]
+
+
+def test_list_movies_rejects_bad_cursor(client: TestClient, db_session: Session):
+    user = make_user(db_session, email="pager-bad@example.com", name="PagerBad")
+    auth_client_for_user(client, user)
+    assert client.get("/movies", params={"cursor": "not-a-cursor"}).status_code == 400
@@ -0,0 +1,50 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+from passlib.hash import bcrypt
+from sqlalchemy.orm import Session
+
+from server.models.user import User
+from server.services import passwords
+from server.services.passwords import PasswordHasher, needs_rehash, pwd_context
+
+
+def test_needs_rehash_tracks_configured_cost():
+    rounds = passwords.BCRYPT_ROUNDS
+    assert not needs_rehash(bcrypt.using(rounds=rounds).hash("pw"))
+    assert needs_rehash(bcrypt.using(rounds=rounds + 1).hash("pw"))
+    if rounds > 4:
+        assert needs_rehash(bcrypt.using(rounds=rounds - 1).hash("pw"))
+
+
+def test_process_pool_hashes_and_verifies():
+    hasher = PasswordHasher(max_workers=1)
+    try:
+        hashed = asyncio.run(hasher.hash("s3cret!"))
+        assert asyncio.run(hasher.verify("s3cret!", hashed))
+        assert not asyncio.run(hasher.verify("wrong", hashed))
+    finally:
+        hasher.shutdown()
+
+
+def test_login_rehashes_when_work_factor_changes(client: TestClient, db_session: Session):
+    old_rounds = passwords.BCRYPT_ROUNDS + 1
+    user = User(
+        email="legacy@example.com",
+        name="Legacy",
+        password_hash=bcrypt.using(rounds=old_rounds).hash("secret123"),
+    )
+    db_session.add(user)
+    db_session.commit()
+
+    r = client.post("/auth/login", json={"email": "legacy@example.com", "password": "secret123"})
+    assert r.status_code == 200, r.text
+
+    db_session.expire_all()
+    upgraded = db_session.get(User, user.id).password_hash
+    assert not needs_rehash(upgraded)
+    assert pwd_context.verify("secret123", upgraded)
+
+    # Subsequent logins keep working against the upgraded hash
+    r = client.post("/auth/login", json={"email": "legacy@example.com", "password": "secret123"})
+    assert r.status_code == 200
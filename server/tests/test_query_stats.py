@@ -0,0 +1,54 @@
+import logging
+import re
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from server.models.movie import Movie, MovieGenre
+from server.services import query_stats
+from server.services.response_cache import MemoryLRUBackend, catalog_cache
+from server.tests.test_movies import auth_client_for_user, make_user
+
+
+def _db_timing(res) -> tuple[int, float]:
+    match = re.search(r'db;dur=([\d.]+);desc="(\d+) queries"', res.headers["server-timing"])
+    assert match, res.headers.get("server-timing")
+    return int(match.group(2)), float(match.group(1))
+
+
+def test_server_timing_reports_per_request_queries(client: TestClient, db_session: Session):
+    user = make_user(db_session, email="timing@example.com", name="Timing")
+    auth_client_for_user(client, user)
+
+    assert _db_timing(client.get("/"))[0] == 0
+
+    def list_queries() -> int:
+        catalog_cache.backend = MemoryLRUBackend()
+        res = client.get("/movies", params={"limit": 100})
+        assert res.status_code == 200
+        return _db_timing(res)[0]
+
+    db_session.add_all(Movie(title=f"Timing {i}", genre=MovieGenre.Drama) for i in range(3))
+    db_session.commit()
+    list_queries()  # resolves and caches the current user
+    few = list_queries()
+    assert few >= 1
+
+    # Statement count must not scale with the page size (N+1 guard)
+    db_session.add_all(Movie(title=f"Timing More {i}", genre=MovieGenre.Drama) for i in range(20))
+    db_session.commit()
+    assert list_queries() == few
+
+
+def test_slow_queries_are_logged_with_a_plan(client: TestClient, db_session: Session, monkeypatch, caplog):
+    user = make_user(db_session, email="slow@example.com", name="Slow")
+    auth_client_for_user(client, user)
+    monkeypatch.setattr(query_stats, "SLOW_QUERY_MS", 0)
+    monkeypatch.setattr(query_stats, "SQL_EXPLAIN_SLOW_QUERIES", True)
+
+    with caplog.at_level(logging.WARNING, logger="uvicorn.error"):
+        assert client.get("/movies", params={"genre": "Drama"}).status_code == 200
+
+    messages = [r.getMessage() for r in caplog.records]
+    assert any(m.startswith("Slow query") and "GET /movies" in m and "FROM movies" in m for m in messages)
+    assert any(m.startswith("Query plan:") for m in messages)
@@ -0,0 +1,95 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from server.services.jobs import job_queue
+from server.services.rate_limit import MemoryRateLimitStore, Rate, RateLimitStore, limiter, parse_rate
+from server.tests.test_movies import auth_client_for_user, make_user
+
+
+def test_token_bucket_refills_and_reports_retry_after():
+    assert parse_rate("5/minute") == Rate(5, 60.0)
+    with pytest.raises(ValueError):
+        parse_rate("5/fortnight")
+
+    # Stores must implement take(); the base class can't stand in for one
+    with pytest.raises(TypeError):
+        RateLimitStore()
+
+    store = MemoryRateLimitStore(max_keys=1)
+    rate = Rate(2, 0.2)
+    take = lambda key: asyncio.run(store.take(key, rate))
+    assert take("a") == (True, 0.0)
+    assert take("a") == (True, 0.0)
+    allowed, retry_after = take("a")
+    assert not allowed and 0 < retry_after <= 0.1
+    time.sleep(retry_after)
+    assert take("a")[0]
+    # Only `max_keys` buckets are kept; an evicted key starts full again
+    take("b")
+    assert take("a") == (True, 0.0)
+
+
+def test_login_has_a_tighter_budget_than_reads(client: TestClient, db_session: Session, monkeypatch):
+    monkeypatch.setitem(limiter.budgets, "auth", Rate(2, 60))
+    credentials = {"email": "nobody@example.com", "password": "wrong-password"}
+    assert client.post("/auth/login", json=credentials).status_code == 401
+    assert client.post("/auth/login", json=credentials).status_code == 401
+    res = client.post("/auth/login", json=credentials)
+    assert res.status_code == 429
+    assert 1 <= int(res.headers["Retry-After"]) <= 30
+
+    # Other routes draw from the default budget
+    user = make_user(db_session, email="limits@example.com", name="Limits")
+    auth_client_for_user(client, user)
+    assert client.get("/movies").status_code == 200
+
+
+def test_default_budget_is_per_user(client: TestClient, db_session: Session, monkeypatch):
+    monkeypatch.setitem(limiter.budgets, "default", Rate(2, 60))
+    first = make_user(db_session, email="limit-a@example.com", name="Limit A")
+    second = make_user(db_session, email="limit-b@example.com", name="Limit B")
+
+    auth_client_for_user(client, first)
+    assert [client.get("/movies").status_code for _ in range(3)] == [200, 200, 429]
+    auth_client_for_user(client, second)
+    assert client.get("/movies").status_code == 200
+
+
+def test_upload_chunks_and_job_polls_have_their_own_budgets(
+    client: TestClient, db_session: Session, fake_media, monkeypatch
+):
+    admin = make_user(db_session, email="limit-chunks@example.com", name="Limit Chunks", role="admin")
+    auth_client_for_user(client, admin)
+    movie_id = client.post("/movies", json={"title": "Many Chunks", "genre": "Drama"}).json()["id"]
+    upload_url = client.post(f"/movies/{movie_id}/uploads", json={"filename": "m.mov", "length": 8}).json()["upload_url"]
+    monkeypatch.setitem(limiter.budgets, "default", Rate(1, 60))
+    monkeypatch.setitem(limiter.budgets, "upload", Rate(5, 60))
+
+    # A multi-chunk upload doesn't run into the default budget
+    for offset in range(4):
+        res = client.put(upload_url, content=b"ab", headers={"Upload-Offset": str(offset * 2)})
+        assert res.status_code == 200, res.text
+    assert client.head(upload_url).status_code == 200
+    assert client.put(upload_url, content=b"", headers={"Upload-Offset": "8"}).status_code == 429
+
+    # Completing is the first request charged to the default budget
+    done = client.post(f"{upload_url}/complete")
+    assert done.status_code == 202, done.text
+    assert client.get("/movies").status_code == 429
+    assert all(client.get(f"{done.json()['status_url']}/progress").status_code == 200 for _ in range(3))
+
+
+def test_full_transcode_queue_returns_503(client: TestClient, db_session: Session, fake_media, monkeypatch):
+    admin = make_user(db_session, email="limit-admin@example.com", name="Limit Admin", role="admin")
+    auth_client_for_user(client, admin)
+    movie_id = client.post("/movies", json={"title": "Queue Full", "genre": "Drama"}).json()["id"]
+    monkeypatch.setattr(job_queue, "max_pending", 0)
+
+    res = client.post(f"/movies/{movie_id}/upload-video", files={"file": ("full.mp4", b"data", "video/mp4")})
+    assert res.status_code == 503
+    assert int(res.headers["Retry-After"]) >= 1
+    assert fake_media == []
@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from server.services.response_cache import CacheBackend, CatalogCache, MemoryLRUBackend, catalog_cache
+from server.tests.test_movies import auth_client_for_user, make_user
+
+
+def test_memory_backend_lru_expiry_and_counters(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("server.services.response_cache.time.monotonic", lambda: now[0])
+    backend = MemoryLRUBackend(max_entries=2)
+
+    async def scenario():
+        await backend.set("a", b"1")
+        await backend.set("b", b"2", ex=5)
+        assert await backend.get("a") == b"1"  # a becomes most recently used
+        await backend.set("c", b"3")
+        assert await backend.get("b") is None
+        assert await backend.incr("version") == 1
+        assert await backend.incr("version") == 2
+        await backend.set("d", b"4")
+        assert await backend.get("version") == b"2"  # counters are never evicted
+        await backend.set("e", b"5", ex=1)
+        now[0] += 2
+        assert await backend.get("e") is None
+
+    asyncio.run(scenario())
+
+
+
+def test_incomplete_backend_fails_when_created():
+    class NoIncr(CacheBackend):
+        async def get(self, key):
+            return None
+
+        async def set(self, key, value, ex=None):
+            pass
+
+        async def delete(self, *keys):
+            return 0
+
+    with pytest.raises(TypeError, match="incr"):
+        NoIncr()
+
+
+def test_list_keys_are_normalized():
+    a = CatalogCache.list_key(3, limit=20, genre="Drama", q="space", cursor=None)
+    b = CatalogCache.list_key(3, q="space", genre="Drama", limit=20)
+    assert a == b
+    assert CatalogCache.list_key(4, q="space", genre="Drama", limit=20) != a
+
+
+def test_list_is_cached_until_a_movie_is_created(client: TestClient, db_session: Session):
+    admin = make_user(db_session, email="cache-admin@example.com", name="Cache Admin", role="admin")
+    auth_client_for_user(client, admin)
+    client.post("/movies", json={"title": "Starfall", "genre": "Drama"})
+    client.post("/movies", json={"title": "Starlight", "genre": "Drama"})
+
+    first = client.get("/movies", params={"q": "star", "limit": 1})
+    assert first.headers["X-Cache"] == "MISS"
+    second = client.get("/movies", params={"q": "  STAR ", "limit": 1})
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.json() == first.json()
+    assert second.headers["X-Next-Cursor"] == first.headers["X-Next-Cursor"]
+
+    client.post("/movies", json={"title": "Stardust", "genre": "Drama"})
+    third = client.get("/movies", params={"q": "star", "limit": 10})
+    assert third.headers["X-Cache"] == "MISS"
+    assert {m["title"] for m in third.json()} == {"Starfall", "Starlight", "Stardust"}
+
+    stats = catalog_cache.stats.summary()
+    assert stats["hits"] >= 1 and stats["misses"] >= 2
+    assert 0 < stats["hit_ratio"] < 1
+
+
+def test_detail_is_invalidated_by_update(client: TestClient, db_session: Session):
+    admin = make_user(db_session, email="cache-admin2@example.com", name="Cache Admin 2", role="admin")
+    auth_client_for_user(client, admin)
+    movie_id = client.post("/movies", json={"title": "Before", "genre": "Horror"}).json()["id"]
+
+    assert client.get(f"/movies/{movie_id}").headers["X-Cache"] == "MISS"
+    assert client.get(f"/movies/{movie_id}").headers["X-Cache"] == "HIT"
+
+    assert client.put(f"/movies/{movie_id}", json={"title": "After"}).status_code == 200
+    res = client.get(f"/movies/{movie_id}")
+    assert res.headers["X-Cache"] == "MISS"
+    assert res.json()["title"] == "After"
+
+    # Misses are not cached for ids that don't exist
+    assert client.get("/movies/999999").status_code == 404
+    assert client.get("/movies/999999").status_code == 404
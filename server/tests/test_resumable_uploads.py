@@ -0,0 +1,174 @@
+import asyncio
+import os
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from server.services import resumable
+from server.services.jobs import QueueFull, job_queue
+from server.tests.conftest import fake_transcode_to_hls_streaming
+from server.tests.test_movies import make_user, auth_client_for_user
+from server.tests.test_video_jobs import wait_for_job
+from server.usecases import video_pipeline
+
+
+@pytest.fixture()
+def sessions_dir(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(resumable, "UPLOAD_SESSIONS_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_resumable_upload_end_to_end(client: TestClient, db_session: Session, fake_media, sessions_dir, monkeypatch):
+    received: list[bytes] = []
+
+    def recording_transcode(input_path, *args, **kwargs):
+        received.append(Path(input_path).read_bytes())
+        return fake_transcode_to_hls_streaming(input_path, *args, **kwargs)
+
+    monkeypatch.setattr(video_pipeline, "transcode_to_hls_streaming", recording_transcode)
+    admin = make_user(db_session, email="resumable-admin@example.com", name="ResumableAdmin", role="admin")
+    auth_client_for_user(client, admin)
+    movie_id = client.post("/movies", json={"title": "Resumable", "genre": "Drama"}).json()["id"]
+    payload = b"A" * 1000 + b"B" * 500
+
+    res = client.post(f"/movies/{movie_id}/uploads", json={"filename": "master.mov", "length": len(payload)})
+    assert res.status_code == 201, res.text
+    upload_url = res.json()["upload_url"]
+    assert res.headers["Location"] == upload_url
+
+    r1 = client.put(upload_url, content=payload[:1000], headers={"Upload-Offset": "0"})
+    assert r1.status_code == 200 and r1.json()["offset"] == 1000
+
+    # Completing early is refused
+    assert client.post(f"{upload_url}/complete").status_code == 409
+
+    # A retried chunk at a stale offset is rejected with the offset to resume from
+    stale = client.put(upload_url, content=payload[:1000], headers={"Upload-Offset": "0"})
+    assert stale.status_code == 409
+    assert stale.headers["Upload-Offset"] == "1000"
+
+    head = client.head(upload_url)
+    assert head.status_code == 200 and head.headers["Upload-Offset"] == "1000"
+
+    r2 = client.put(upload_url, content=payload[1000:], headers={"Upload-Offset": "1000"})
+    assert r2.json()["offset"] == len(payload)
+
+    done = client.post(f"{upload_url}/complete")
+    assert done.status_code == 202, done.text
+    job = wait_for_job(client, done.json()["status_url"])
+    assert job["status"] == "succeeded", job
+    assert received == [payload]
+    # Session storage is released once finalized
+    assert client.get(upload_url).status_code == 404
+
+
+def test_chunk_beyond_declared_length_is_rejected(client: TestClient, db_session: Session, fake_media, sessions_dir):
+    admin = make_user(db_session, email="resumable-admin2@example.com", name="ResumableAdmin2", role="admin")
+    auth_client_for_user(client, admin)
+    movie_id = client.post("/movies", json={"title": "Resumable Overflow", "genre": "Drama"}).json()["id"]
+
+    upload_url = client.post(f"/movies/{movie_id}/uploads", json={"filename": "m.mov", "length": 10}).json()["upload_url"]
+    res = client.put(upload_url, content=b"x" * 11, headers={"Upload-Offset": "0"})
+    assert res.status_code == 413
+    assert client.get(upload_url).json()["offset"] == 0
+
+
+def test_upload_is_kept_when_the_last_job_slot_is_lost(
+    client: TestClient, db_session: Session, fake_media, sessions_dir, monkeypatch
+):
+    admin = make_user(db_session, email="resumable-admin3@example.com", name="ResumableAdmin3", role="admin")
+    auth_client_for_user(client, admin)
+    movie_id = client.post("/movies", json={"title": "Resumable Retry", "genre": "Drama"}).json()["id"]
+    upload_url = client.post(f"/movies/{movie_id}/uploads", json={"filename": "m.mov", "length": 6}).json()["upload_url"]
+    assert client.put(upload_url, content=b"abcdef", headers={"Upload-Offset": "0"}).status_code == 200
+
+    def lose_the_race(**kwargs):
+        raise QueueFull(retry_after=7)
+
+    # Admission passed, then another request took the slot
+    with monkeypatch.context() as m:
+        m.setattr(job_queue, "submit", lose_the_race)
+        res = client.post(f"{upload_url}/complete")
+    assert res.status_code == 503
+    assert res.headers["Retry-After"] == "7"
+    assert client.get(upload_url).json()["offset"] == 6
+    assert [p.name for p in sessions_dir.iterdir()] == [upload_url.rsplit("/", 1)[1]]
+
+    done = client.post(f"{upload_url}/complete")
+    assert done.status_code == 202, done.text
+    assert wait_for_job(client, done.json()["status_url"])["status"] == "succeeded"
+
+
+def test_abandoned_sessions_expire(sessions_dir):
+    stale = resumable.create_session(movie_id=1, filename="old.mov", length=10)
+    fresh = resumable.create_session(movie_id=1, filename="new.mov", length=10)
+    job_workdir = sessions_dir / "upload_hls_abc"
+    job_workdir.mkdir()
+    an_hour_ago = time.time() - 3600
+    for path in (stale.dir, stale.data_path, stale.dir / "meta.json", job_workdir):
+        os.utime(path, (an_hour_ago, an_hour_ago))
+
+    assert resumable.sweep_expired_sessions(ttl_seconds=600) == 1
+    assert not stale.dir.exists()
+    assert fresh.dir.exists() and job_workdir.exists()
+    with pytest.raises(resumable.UploadSessionNotFound):
+        resumable.get_session(stale.id)
+
+
+def _completed_upload(client: TestClient, db_session: Session, email: str, title: str):
+    admin = make_user(db_session, email=email, name=title, role="admin")
+    auth_client_for_user(client, admin)
+    movie_id = client.post("/movies", json={"title": title, "genre": "Drama"}).json()["id"]
+    upload_url = client.post(f"/movies/{movie_id}/uploads", json={"filename": "m.mov", "length": 6}).json()["upload_url"]
+    assert client.put(upload_url, content=b"abcdef", headers={"Upload-Offset": "0"}).status_code == 200
+    # Looked up before completing, like a request that passed its checks while the first one ran
+    stale = resumable.get_session(upload_url.rsplit("/", 1)[1])
+    done = client.post(f"{upload_url}/complete")
+    assert done.status_code == 202, done.text
+    assert wait_for_job(client, done.json()["status_url"])["status"] == "succeeded"
+    return upload_url, stale
+
+
+def test_completing_twice_is_not_found(client: TestClient, db_session: Session, fake_media, sessions_dir, monkeypatch):
+    upload_url, stale = _completed_upload(client, db_session, "resumable-admin4@example.com", "Resumable Twice")
+
+    assert client.post(f"{upload_url}/complete").status_code == 404
+    # The retry already held the session when the first completion deleted it
+    monkeypatch.setattr("server.routes.movies.get_upload_session", lambda upload_id: stale)
+    assert client.post(f"{upload_url}/complete").status_code == 404
+    with pytest.raises(resumable.UploadSessionNotFound):
+        resumable.finalize_session(stale)
+    # Nothing left behind by the failed attempts
+    assert not stale.dir.exists()
+    assert list(sessions_dir.glob("upload_hls_*")) == []
+
+
+def test_offset_after_complete_is_not_found(client: TestClient, db_session: Session, fake_media, sessions_dir, monkeypatch):
+    upload_url, stale = _completed_upload(client, db_session, "resumable-admin5@example.com", "Resumable Poll")
+
+    assert client.head(upload_url).status_code == 404
+    monkeypatch.setattr("server.routes.movies.get_upload_session", lambda upload_id: stale)
+    assert client.get(upload_url).status_code == 404
+    assert client.put(upload_url, content=b"g", headers={"Upload-Offset": "6"}).status_code == 404
+
+
+def test_a_held_session_is_busy(sessions_dir):
+    session = resumable.create_session(movie_id=1, filename="m.mov", length=10)
+
+    async def scenario():
+        async with resumable.hold_session(session):
+            with pytest.raises(resumable.UploadBusy):
+                async with resumable.hold_session(session):
+                    pass
+            with pytest.raises(resumable.UploadBusy):
+                await resumable.write_chunk(session, 0, _chunks(b"x"))
+
+    asyncio.run(scenario())
+
+
+async def _chunks(*parts: bytes):
+    for part in parts:
+        yield part
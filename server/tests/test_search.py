@@ -0,0 +1,67 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from server.services import search
+from server.tests.test_movies import make_user, auth_client_for_user
+
+
+def titles(res) -> list[str]:
+    assert res.status_code == 200, res.text
+    return [m["title"] for m in res.json()]
+
+
+def test_search_prefix_matches_title_and_description_ranked_by_relevance(client: TestClient, db_session: Session):
+    admin = make_user(db_session, email="search-admin@example.com", name="SearchAdmin", role="admin")
+    auth_client_for_user(client, admin)
+    client.post("/movies", json={"title": "Zephyrine Nights", "genre": "Drama", "description": "A quiet story"})
+    client.post("/movies", json={"title": "Harbor Lights", "genre": "Drama", "description": "Sailors chase the zephyrine wind"})
+    client.post("/movies", json={"title": "Unrelated", "genre": "Comedy"})
+
+    # Title hit outranks description hit; prefix matching supports typeahead
+    assert titles(client.get("/movies", params={"q": "zephyr"})) == ["Zephyrine Nights", "Harbor Lights"]
+    assert titles(client.get("/movies", params={"q": "sailor"})) == ["Harbor Lights"]
+    assert titles(client.get("/movies", params={"q": "zephyr", "genre": "Comedy"})) == []
+
+
+def test_search_index_follows_title_updates(client: TestClient, db_session: Session):
+    admin = make_user(db_session, email="search-admin2@example.com", name="SearchAdmin2", role="admin")
+    auth_client_for_user(client, admin)
+    movie_id = client.post("/movies", json={"title": "Quorvath Rising", "genre": "Action"}).json()["id"]
+
+    client.put(f"/movies/{movie_id}", json={"title": "Blenkish Falls"})
+    assert titles(client.get("/movies", params={"q": "quorvath"})) == []
+    assert titles(client.get("/movies", params={"q": "blenk"})) == ["Blenkish Falls"]
+
+
+def test_search_relevance_pages_with_cursor(client: TestClient, db_session: Session):
+    admin = make_user(db_session, email="search-admin3@example.com", name="SearchAdmin3", role="admin")
+    auth_client_for_user(client, admin)
+    for i in range(3):
+        client.post("/movies", json={"title": f"Marrowind {i}", "genre": "Drama"})
+
+    first = client.get("/movies", params={"q": "marrowind", "limit": 2})
+    second = client.get("/movies", params={"q": "marrowind", "limit": 2, "cursor": first.headers["X-Next-Cursor"]})
+    assert len(titles(first)) == 2 and len(titles(second)) == 1
+    assert "X-Next-Cursor" not in second.headers
+    assert set(titles(first) + titles(second)) == {"Marrowind 0", "Marrowind 1", "Marrowind 2"}
+
+
+def test_like_backend_fallback(client: TestClient, db_session: Session, monkeypatch):
+    monkeypatch.setattr(search, "SEARCH_BACKEND", "like")
+    admin = make_user(db_session, email="search-admin4@example.com", name="SearchAdmin4", role="admin")
+    auth_client_for_user(client, admin)
+    client.post("/movies", json={"title": "Glimmerdale", "genre": "Drama", "description": "about ostrichfolk"})
+    assert titles(client.get("/movies", params={"q": "ostrichf"})) == ["Glimmerdale"]
+
+
+def test_fts_query_quotes_user_input():
+    assert search.Fts5SearchBackend.to_fts_query('star "wars" OR -x') == '"star"* "wars"* "OR"* "x"*'
+
+
+def test_backend_without_apply_fails_when_created():
+    class IndexOnly(search.SearchBackend):
+        name = "index-only"
+
+    with pytest.raises(TypeError, match="apply"):
+        IndexOnly()
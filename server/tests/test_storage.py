@@ -0,0 +1,154 @@
+from pathlib import Path
+
+import pytest
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from server.services.cloudinary_uploader import ParallelUploader
+from server.services.storage import (
+    SEGMENT_CACHE_CONTROL,
+    CloudinaryStorage,
+    InvalidKey,
+    LocalStorage,
+    S3Storage,
+    StorageBackend,
+    StorageNotConfigured,
+    media_storage,
+)
+from server.tests.test_movies import make_user, auth_client_for_user
+from server.tests.test_video_jobs import wait_for_job
+
+
+class FakeS3Client:
+    """MinIO-style stand-in: keeps uploaded objects and their metadata in memory."""
+
+    def __init__(self):
+        self.objects: dict[tuple[str, str], tuple[bytes, dict]] = {}
+
+    def upload_file(self, Filename, Bucket, Key, ExtraArgs=None):
+        self.objects[(Bucket, Key)] = (Path(Filename).read_bytes(), dict(ExtraArgs or {}))
+
+
+@pytest.fixture()
+def local_media(monkeypatch, tmp_path, fake_media):
+    storage = LocalStorage(str(tmp_path / "media"))
+    monkeypatch.setattr(media_storage, "backend", storage)
+    return storage
+
+
+def test_local_hls_is_served_with_ranges_and_cache_headers(client: TestClient, db_session: Session, local_media):
+    admin = make_user(db_session, email="storage-admin@example.com", name="StorageAdmin", role="admin")
+    auth_client_for_user(client, admin)
+    movie_id = client.post("/movies", json={"title": "Locally Stored", "genre": "Drama"}).json()["id"]
+
+    res = client.post(f"/movies/{movie_id}/upload-video", files={"file": ("local.mp4", b"first|second", "video/mp4")})
+    job = wait_for_job(client, res.json()["status_url"])
+    assert job["status"] == "succeeded", job
+    master_url = job["result"]["video_url"]
+    assert master_url.startswith(f"/media/movies/{movie_id}/local/") and master_url.endswith("/local.m3u8")
+
+    master = client.get(master_url)
+    assert master.status_code == 200
+    assert master.headers["content-type"] == "application/vnd.apple.mpegurl"
+    assert master.headers["cache-control"] == "public, max-age=10"
+    assert "local_720p.m3u8" in master.text
+
+    segment_url = master_url.replace("local.m3u8", "local_720p_001.ts")
+    segment = client.get(segment_url)
+    assert segment.content == b"720p:1:second"
+    assert segment.headers["content-type"] == "video/mp2t"
+    assert segment.headers["cache-control"] == SEGMENT_CACHE_CONTROL
+    assert segment.headers["accept-ranges"] == "bytes"
+
+    partial = client.get(segment_url, headers={"Range": "bytes=7-"})
+    assert partial.status_code == 206
+    assert partial.content == b"second"
+    assert partial.headers["content-range"] == "bytes 7-12/13"
+
+    revalidated = client.get(segment_url, headers={"If-None-Match": segment.headers["etag"]})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["cache-control"] == SEGMENT_CACHE_CONTROL
+
+    assert client.head(segment_url).headers["content-length"] == "13"
+    assert client.get(f"/media/movies/{movie_id}/missing.ts").status_code == 404
+    assert client.get(f"/media/movies/{movie_id}").status_code == 404
+    assert client.get("/media/movies/%2e%2e/app.db").status_code == 404
+
+
+def test_switching_backends_does_not_reuse_old_segment_urls(
+    client: TestClient, db_session: Session, fake_media, monkeypatch, tmp_path
+):
+    admin = make_user(db_session, email="switch-admin@example.com", name="SwitchAdmin", role="admin")
+    auth_client_for_user(client, admin)
+    movie_id = client.post("/movies", json={"title": "Switched Storage", "genre": "Drama"}).json()["id"]
+
+    res = client.post(f"/movies/{movie_id}/upload-video", files={"file": ("cut.mp4", b"opening|ending v1", "video/mp4")})
+    assert wait_for_job(client, res.json()["status_url"])["status"] == "succeeded"
+
+    monkeypatch.setattr(media_storage, "backend", LocalStorage(str(tmp_path / "media")))
+    res = client.post(f"/movies/{movie_id}/upload-video", files={"file": ("recut.mp4", b"opening|ending v2", "video/mp4")})
+    job = wait_for_job(client, res.json()["status_url"])
+    assert job["status"] == "succeeded", job
+
+    # The segment shared with the Cloudinary publish is stored locally again, not linked to Cloudinary
+    variant = client.get(job["result"]["video_url"].replace("recut.m3u8", "recut_720p.m3u8"))
+    assert variant.status_code == 200
+    segments = [line for line in variant.text.splitlines() if line and not line.startswith("#")]
+    assert segments == ["recut_720p_000.ts", "recut_720p_001.ts"]
+
+
+def test_media_route_is_off_unless_storage_is_local(client: TestClient, local_media, monkeypatch):
+    local_media.put_file(__file__, "docs/test.py")
+    assert client.get("/media/docs/test.py").status_code == 200
+    monkeypatch.setattr(media_storage, "backend", CloudinaryStorage())
+    assert client.get("/media/docs/test.py").status_code == 404
+
+
+def test_local_storage_rejects_keys_outside_its_root(tmp_path):
+    storage = LocalStorage(str(tmp_path), base_url="https://cdn.example.com/media/")
+    for key in ("../escape.ts", "/abs.ts", "a//b.ts", ""):
+        with pytest.raises(InvalidKey):
+            storage.put_file(__file__, key)
+    assert storage.put_file(__file__, "a/b.py") == "https://cdn.example.com/media/a/b.py"
+    assert (tmp_path / "a" / "b.py").read_bytes() == Path(__file__).read_bytes()
+    # Nothing left behind under a temporary name
+    assert [p.name for p in (tmp_path / "a").iterdir()] == ["b.py"]
+
+
+def test_s3_storage_uploads_with_content_type_and_cache_control(tmp_path):
+    client = FakeS3Client()
+    storage = S3Storage("media", client=client, endpoint_url="http://minio:9000")
+    files = {"seg_000.ts": b"ts", "index_720p.m3u8": b"#EXTM3U\n", "index.m3u8": b"#EXTM3U\n#EXT-X-STREAM-INF:\n"}
+    for name, data in files.items():
+        (tmp_path / name).write_bytes(data)
+
+    uploader = ParallelUploader("movies/1/index/abc", storage=storage)
+    uploader.submit(str(tmp_path / "seg_000.ts"), "seg_000.ts")
+    uploader.finish([(str(tmp_path / "index_720p.m3u8"), "index_720p.m3u8"), (str(tmp_path / "index.m3u8"), "index.m3u8")])
+
+    data, extra = client.objects[("media", "movies/1/index/abc/seg_000.ts")]
+    assert data == b"ts"
+    assert extra == {"ContentType": "video/mp2t", "CacheControl": SEGMENT_CACHE_CONTROL}
+    assert client.objects[("media", "movies/1/index/abc/index.m3u8")][1] == {
+        "ContentType": "application/vnd.apple.mpegurl",
+        "CacheControl": "public, max-age=10",
+    }
+    assert storage.url_for("movies/1/index/abc/index.m3u8") == "http://minio:9000/media/movies/1/index/abc/index.m3u8"
+    assert S3Storage("media", client=client, public_url="https://cdn.example.com").url_for("a.ts") == "https://cdn.example.com/a.ts"
+
+
+def test_s3_storage_requires_a_bucket():
+    with pytest.raises(StorageNotConfigured):
+        S3Storage(None, client=FakeS3Client()).ensure_configured()
+
+
+def test_backend_without_url_for_fails_when_created():
+    class UploadOnly(StorageBackend):
+        name = "upload-only"
+
+        def put_file(self, local_path: str, key: str, kind: str = "raw") -> str:
+            return key
+
+    with pytest.raises(TypeError, match="url_for"):
+        UploadOnly()
@@ -0,0 +1,71 @@
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from server import security
+from server.security import COOKIE_NAME, create_access_token
+from server.services.user_cache import UserCache, user_cache
+from server.tests.test_movies import auth_client_for_user, make_user
+
+
+def test_cache_expires_entries_and_evicts_least_recently_used(monkeypatch):
+    cache = UserCache(ttl=10, max_entries=2)
+    now = [1000.0]
+    monkeypatch.setattr("server.services.user_cache.time.monotonic", lambda: now[0])
+
+    cache.set(1, "a", "p1")
+    cache.set(2, "b", "p2")
+    assert cache.get(1, "a") == "p1"  # 1 is now most recently used
+    cache.set(3, "c", "p3")
+    assert cache.get(2, "b") is None
+    assert cache.get(1, "a") == "p1"
+
+    # Entries never outlive the token itself
+    cache.set(4, "d", "p4", token_expires_in=1)
+    now[0] += 2
+    assert cache.get(4, "d") is None
+    now[0] += 10
+    assert cache.get(1, "a") is None
+
+    stats = cache.stats()
+    assert stats["evictions"] == 2
+    assert stats["hits"] == 2 and stats["misses"] == 3
+
+
+def test_repeat_requests_are_served_from_cache(client: TestClient, db_session: Session):
+    user = make_user(db_session, email="cached@example.com", name="Cached")
+    auth_client_for_user(client, user)
+
+    before = user_cache.stats()
+    for _ in range(3):
+        assert client.get("/movies").status_code == 200
+    after = user_cache.stats()
+    assert after["misses"] - before["misses"] == 1
+    assert after["hits"] - before["hits"] == 2
+
+
+def test_role_change_invalidates_cached_principal(client: TestClient, db_session: Session):
+    user = make_user(db_session, email="promoted@example.com", name="Promoted")
+    auth_client_for_user(client, user)
+
+    assert client.post("/movies", json={"title": "Cache Gate", "genre": "Drama"}).status_code == 403
+
+    user.role = "admin"
+    db_session.commit()
+
+    res = client.post("/movies", json={"title": "Cache Gate", "genre": "Drama"})
+    assert res.status_code == 201, res.text
+    assert user_cache.stats()["invalidations"] >= 1
+
+
+def test_role_claim_skips_db_on_read_routes(client: TestClient, db_session: Session, monkeypatch):
+    monkeypatch.setattr(security, "JWT_ROLE_CLAIM", True)
+    user = make_user(db_session, email="claims@example.com", name="Claims")
+    token = create_access_token(subject=str(user.id), role=user.role)
+    client.cookies.set(COOKIE_NAME, token)
+
+    async def no_db(*args, **kwargs):
+        raise AssertionError("read route hit the database for the principal")
+
+    monkeypatch.setattr(security, "_resolve_user", no_db)
+    assert client.get("/movies").status_code == 200
+
@@ -0,0 +1,90 @@
+import time
+
+import pytest
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from server.tests.test_movies import make_user, auth_client_for_user
+from server.usecases import video_pipeline
+
+
+def wait_for_job(client: TestClient, status_url: str, timeout: float = 5.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        body = client.get(status_url).json()
+        if body["status"] in ("succeeded", "failed", "cancelled"):
+            return body
+        time.sleep(0.02)
+    raise AssertionError(f"job did not finish: {body}")
+
+
+@pytest.mark.parametrize("pipelined", [True, False])
+def test_upload_video_returns_202_and_job_completes(
+    client: TestClient, db_session: Session, fake_media, monkeypatch, pipelined
+):
+    monkeypatch.setattr(video_pipeline, "HLS_PIPELINED_UPLOAD", pipelined)
+    admin = make_user(db_session, email=f"jobs-admin-{pipelined}@example.com", name="JobsAdmin", role="admin")
+    auth_client_for_user(client, admin)
+    movie_id = client.post("/movies", json={"title": f"Job Movie {pipelined}", "genre": "Drama"}).json()["id"]
+
+    res = client.post(
+        f"/movies/{movie_id}/upload-video",
+        files={"file": ("feature.mp4", b"not really a video", "video/mp4")},
+    )
+    assert res.status_code == 202, res.text
+    accepted = res.json()
+    assert accepted["status_url"] == f"/movies/{movie_id}/jobs/{accepted['job_id']}"
+
+    job = wait_for_job(client, accepted["status_url"])
+    assert job["status"] == "succeeded", job
+    assert job["progress"] == 100
+    # Each publish gets its own folder, so published segments never change
+    folder = f"movies/{movie_id}/feature/{accepted['job_id'][:12]}"
+    expected_url = f"https://res.cloudinary.com/demo/raw/upload/{folder}/feature.m3u8"
+    encoding = job["result"].pop("encoding")
+    assert (encoding["profile"], encoding["complexity"], encoding["media_seconds"]) == ("fast_publish", 1.0, 12.0)
+    assert set(encoding["variants"]) == {"720p", "360p"}
+    assert encoding["variants"]["360p"]["maxrate"] == "856k"
+    assert job["result"] == {
+        "video_url": expected_url,
+        "playlist_filename": "feature.m3u8",
+        "renditions": ["720p", "360p"],
+    }
+    assert len(fake_media) == 7
+    assert (folder, "feature_720p_001.ts") in fake_media
+    # Playlists are published after every segment, master last
+    assert [name for _, name in fake_media[-3:]] in (
+        ["feature_360p.m3u8", "feature_720p.m3u8", "feature.m3u8"],
+        ["feature_720p.m3u8", "feature_360p.m3u8", "feature.m3u8"],
+    )
+
+    progress = client.get(f"{accepted['status_url']}/progress").json()
+    assert progress["stage"] == "done"
+    assert client.get(f"/movies/{movie_id}").json()["video_url"] == expected_url
+
+
+def test_upload_video_job_failure_is_reported(client: TestClient, db_session: Session, fake_media, monkeypatch):
+    admin = make_user(db_session, email="jobs-admin2@example.com", name="JobsAdmin2", role="admin")
+    auth_client_for_user(client, admin)
+    movie_id = client.post("/movies", json={"title": "Broken Job Movie", "genre": "Drama"}).json()["id"]
+
+    def broken_transcode(*args, **kwargs):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(video_pipeline, "transcode_to_hls", broken_transcode)
+    monkeypatch.setattr(video_pipeline, "transcode_to_hls_streaming", broken_transcode)
+    res = client.post(
+        f"/movies/{movie_id}/upload-video",
+        files={"file": ("broken.mp4", b"data", "video/mp4")},
+    )
+    assert res.status_code == 202
+    job = wait_for_job(client, res.json()["status_url"])
+    assert job["status"] == "failed"
+    assert job["error"] == "ffmpeg failed to process the video"
+
+
+def test_get_job_unknown_returns_404(client: TestClient, db_session: Session):
+    admin = make_user(db_session, email="jobs-admin3@example.com", name="JobsAdmin3", role="admin")
+    auth_client_for_user(client, admin)
+    assert client.get("/movies/1/jobs/does-not-exist").status_code == 404
@@ -1,34 +1,41 @@
 from typing import Optional, Tuple
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from server.models.user import User
-from server.security import hash_password, verify_password, create_access_token
+from server.security import create_access_token, needs_rehash, password_hasher
 
 
-def signup_user(db: Session, *, email: str, name: str, password: str, profile_picture: Optional[str] = None) -> Tuple[User, str]:
+async def signup_user(db: AsyncSession, *, email: str, name: str, password: str, profile_picture: Optional[str] = None) -> Tuple[User, str]:
     # Validation/business rules
-    existing = db.query(User).filter(User.email == email).first()
+    existing = (await db.execute(select(User.id).where(User.email == email))).first()
     if existing:
         raise ValueError("EMAIL_TAKEN")
 
     user = User(
         email=email,        
         name=name,
-        password_hash=hash_password(password),
+        password_hash=await password_hasher.hash(password),
         profile_picture=profile_picture,
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
 
-    token = create_access_token(subject=str(user.id))
+    token = create_access_token(subject=str(user.id), role=user.role)
     return user, token
 
 
-def login_user(db: Session, *, email: str, password: str) -> Tuple[User, str]:
-    user: Optional[User] = db.query(User).filter(User.email == email).first()
-    if not user or not verify_password(password, user.password_hash):
+async def login_user(db: AsyncSession, *, email: str, password: str) -> Tuple[User, str]:
+    user: Optional[User] = (await db.execute(select(User).where(User.email == email))).scalars().first()
+    if not user or not await password_hasher.verify(password, user.password_hash):
         raise ValueError("INVALID_CREDENTIALS")
 
-    token = create_access_token(subject=str(user.id))
+    # Transparently upgrade hashes made under an older work factor while we hold the plaintext
+    if needs_rehash(user.password_hash):
+        user.password_hash = await password_hasher.hash(password)
+        await db.commit()
+        await db.refresh(user)
+
+    token = create_access_token(subject=str(user.id), role=user.role)
     return user, token
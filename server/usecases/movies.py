@@ -1,79 +1,470 @@
-from typing import Optional, Dict, Any
-from sqlalchemy.orm import Session
+import base64
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional, Dict, Any, AsyncIterator, Callable, List, NamedTuple, Tuple
+from sqlalchemy import Float, String, cast, func, insert, select, tuple_, type_coerce, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from server.models.movie import Movie
+from server.models.movie import Movie, MovieGenre
+from server.services.catalog_io import BULK_IMPORT_BATCH_SIZE, IMPORT_MAX_REPORTED_ERRORS, Record, RowError
+from server.services.response_cache import catalog_cache
+from server.services.search import get_search_backend
 
 
 class MovieTitleTaken(Exception):
     pass
 
 
-def create_movie(db: Session, *, data: Dict[str, Any]) -> Movie:
-    # Business rules: unique title
-    existing = db.query(Movie).filter(Movie.title == data.get("title")).first()
-    if existing:
-        raise MovieTitleTaken()
-
-    movie = Movie(
-        title=data["title"],
-        description=data.get("description"),
-        genre=data["genre"],
-        release_year=data.get("release_year"),
-        duration=data.get("duration"),
-        rating=data.get("rating"),
-        video_url=data.get("video_url"),
-        thumbnail_url=data.get("thumbnail_url"),
-        trailer_url=data.get("trailer_url"),
-        is_premium=bool(data.get("is_premium", False)),
-    )
-    db.add(movie)
-    db.commit()
-    db.refresh(movie)
+# Movie columns writable through create/update/import; the rest come from server defaults
+_WRITABLE_FIELDS = (
+    "title",
+    "description",
+    "genre",
+    "release_year",
+    "duration",
+    "rating",
+    "video_url",
+    "thumbnail_url",
+    "trailer_url",
+    "is_premium",
+)
+
+
+def _is_title_conflict(exc: IntegrityError) -> bool:
+    # SQLite reports "UNIQUE constraint failed: movies.title"; PostgreSQL names uq_movies_title
+    message = str(exc.orig)
+    return "uq_movies_title" in message or "movies.title" in message
+
+
+async def create_movie(db: AsyncSession, *, data: Dict[str, Any]) -> Movie:
+    """
+    Insert a movie and index it for search, in one transaction.
+
+    Business rules:
+    - Titles are unique: enforced by uq_movies_title, a violation raises MovieTitleTaken.
+
+    Round trips: INSERT ... RETURNING (the whole row, server defaults included) and the search
+    index write; no existence check up front and no refresh after the commit.
+    """
+    values = {field: data.get(field) for field in _WRITABLE_FIELDS}
+    values["is_premium"] = bool(values["is_premium"])
+    try:
+        if db.bind.dialect.insert_returning:
+            movie = (await db.execute(insert(Movie).values(**values).returning(Movie))).scalar_one()
+        else:
+            movie = Movie(**values)
+            db.add(movie)
+            await db.flush()
+            await db.refresh(movie)
+        # Keep the search index in the same transaction
+        await get_search_backend(db).index(db, movie.id, movie.title, movie.description)
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        if _is_title_conflict(e):
+            raise MovieTitleTaken()
+        raise
+    await catalog_cache.invalidate()
     return movie
 
 
-def get_movie(db: Session, *, movie_id: int) -> Movie:
+async def get_movie(db: AsyncSession, *, movie_id: int) -> Movie:
     """
     Retrieve a single movie by id.
 
     Business rules:
     - If not found, raise ValueError("NOT_FOUND") to let route map to 404.
     """
-    movie: Optional[Movie] = db.query(Movie).filter(Movie.id == movie_id).first()
+    movie: Optional[Movie] = await db.get(Movie, movie_id)
     if not movie:
         raise ValueError("NOT_FOUND")
     return movie
 
 
-def update_movie(db: Session, *, movie_id: int, data: Dict[str, Any]) -> Movie:
-    movie: Optional[Movie] = db.query(Movie).filter(Movie.id == movie_id).first()
-    if not movie:
-        raise ValueError("NOT_FOUND")
+async def update_movie(db: AsyncSession, *, movie_id: int, data: Dict[str, Any]) -> Movie:
+    """
+    Patch the given (non-None) fields of a movie.
 
-    # If title provided, ensure uniqueness
-    new_title = data.get("title")
-    if new_title and new_title != movie.title:
-        exists = db.query(Movie).filter(Movie.title == new_title).first()
-        if exists:
-            raise MovieTitleTaken()
+    Business rules:
+    - If not found, raise ValueError("NOT_FOUND").
+    - Titles are unique: enforced by uq_movies_title, a violation raises MovieTitleTaken.
 
-    # Patch fields
-    for field in (
-        "title",
-        "description",
-        "genre",
-        "release_year",
-        "duration",
-        "rating",
-        "video_url",
-        "thumbnail_url",
-        "trailer_url",
-        "is_premium",
-    ):
-        if field in data and data[field] is not None:
-            setattr(movie, field, data[field])
-
-    db.add(movie)
-    db.commit()
-    db.refresh(movie)
+    Round trips: one UPDATE ... RETURNING, plus the search index write when the title or
+    description changes.
+    """
+    patch = {field: data[field] for field in _WRITABLE_FIELDS if data.get(field) is not None}
+    if not patch:
+        return await get_movie(db, movie_id=movie_id)
+
+    stmt = update(Movie).where(Movie.id == movie_id).values(**patch)
+    try:
+        if db.bind.dialect.update_returning:
+            movie: Optional[Movie] = (await db.execute(stmt.returning(Movie))).scalar_one_or_none()
+        else:
+            result = await db.execute(stmt.execution_options(synchronize_session=False))
+            movie = await db.get(Movie, movie_id, populate_existing=True) if result.rowcount else None
+        if movie is None:
+            await db.rollback()
+            raise ValueError("NOT_FOUND")
+        if "title" in patch or "description" in patch:
+            await get_search_backend(db).index(db, movie.id, movie.title, movie.description)
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        if _is_title_conflict(e):
+            raise MovieTitleTaken()
+        raise
+    await catalog_cache.invalidate()
     return movie
+
+
+# Supported list orderings: (sort column, descending). Ties are broken by id in the same direction,
+# and rating orders keep NULL ratings at the end of rating_desc / the start of rating_asc.
+MOVIE_ORDERS = {
+    "newest": ("created_at", True),
+    "oldest": ("created_at", False),
+    "rating_desc": ("rating", True),
+    "rating_asc": ("rating", False),
+}
+
+
+def encode_cursor(order: str, key: Any, movie_id: int) -> str:
+    payload = json.dumps({"o": order, "k": key, "i": movie_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, order: str) -> Tuple[Any, int]:
+    """Return (sort_key, id) from an opaque cursor; raise ValueError("INVALID_CURSOR") if it doesn't fit `order`."""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if data["o"] != order or not isinstance(data["i"], int):
+            raise ValueError
+        return data["k"], data["i"]
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("INVALID_CURSOR")
+
+
+def _sort_key(db: AsyncSession, column: str):
+    if column == "created_at" and db.bind.dialect.name == "sqlite":
+        # SQLite stores timestamps as text and server_default rows lack microseconds, so compare the
+        # raw stored string rather than a re-formatted datetime (type_coerce emits no CAST: index still used)
+        return type_coerce(Movie.created_at, String)
+    return getattr(Movie, column)
+
+
+def _key_to_cursor(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (Decimal, float)):
+        return str(value)
+    return value
+
+
+def _key_from_cursor(db: AsyncSession, column: str, value: Any) -> Any:
+    if value is None:
+        return None
+    if column == "rating":
+        return Decimal(value)
+    if db.bind.dialect.name == "sqlite":
+        return value
+    return datetime.fromisoformat(value)
+
+
+class _Segment(NamedTuple):
+    where: Any  # segment filter, None for the whole table
+    order_by: List[Any]
+    after: Callable[[Any, int], Any]  # keyset condition for rows after (key, id)
+    unrated: bool = False
+
+
+def _order_segments(key_col, column: str, descending: bool) -> List[_Segment]:
+    """
+    Split an ordering into segments that are each an index range scan on (sort column, id).
+
+    Rating orders keep NULL ratings in their own segment (last for rating_desc, first for
+    rating_asc): an `OR rating IS NULL` in the keyset condition would turn the range scan
+    into a full index scan.
+    """
+    if column == "created_at":
+        if descending:
+            return [_Segment(None, [key_col.desc(), Movie.id.desc()], lambda k, i: tuple_(key_col, Movie.id) < (k, i))]
+        return [_Segment(None, [key_col.asc(), Movie.id.asc()], lambda k, i: tuple_(key_col, Movie.id) > (k, i))]
+    rated = _Segment(
+        Movie.rating.is_not(None),
+        [Movie.rating.desc(), Movie.id.desc()] if descending else [Movie.rating.asc(), Movie.id.asc()],
+        (lambda k, i: tuple_(Movie.rating, Movie.id) < (k, i))
+        if descending
+        else (lambda k, i: tuple_(Movie.rating, Movie.id) > (k, i)),
+    )
+    unrated = _Segment(
+        Movie.rating.is_(None),
+        [Movie.id.desc()] if descending else [Movie.id.asc()],
+        (lambda k, i: Movie.id < i) if descending else (lambda k, i: Movie.id > i),
+        unrated=True,
+    )
+    return [rated, unrated] if descending else [unrated, rated]
+
+
+# A catalog row as served (MovieOut's fields, in order) for the column-tuple fast path. Rating is
+# cast to a float in SQL (SQLite hands back 4.0 as the integer 4) so rows encode without conversion.
+CATALOG_ROW_COLUMNS = (
+    Movie.id,
+    Movie.title,
+    Movie.description,
+    Movie.genre,
+    Movie.release_year,
+    Movie.duration,
+    cast(Movie.rating, Float).label("rating"),
+    Movie.video_url,
+    Movie.thumbnail_url,
+    Movie.trailer_url,
+    Movie.is_premium,
+    Movie.created_at,
+    Movie.updated_at,
+)
+CATALOG_ROW_FIELDS = tuple(c.key for c in CATALOG_ROW_COLUMNS)
+
+
+def resolve_order(order: Optional[str], q: Optional[str]) -> str:
+    """Effective list order: "relevance" by default with `q`, else "newest"; unknown orders fall back to "newest"."""
+    if not order:
+        order = "relevance" if q else "newest"
+    if order not in MOVIE_ORDERS and not (order == "relevance" and q):
+        order = "newest"
+    return order
+
+
+class CatalogStamp(NamedTuple):
+    count: int
+    last_modified: Optional[datetime]  # newest updated_at; None for an empty catalog
+
+
+async def catalog_stamp(db: AsyncSession) -> CatalogStamp:
+    """
+    Row count and newest updated_at of the catalog, read from the database.
+
+    Every catalog write changes one or the other (inserts add a row, updates set updated_at),
+    whichever process or worker made it, so the stamp validates list responses across processes.
+    """
+    count, last_modified = (await db.execute(select(func.count(Movie.id), func.max(Movie.updated_at)))).one()
+    return CatalogStamp(count=count, last_modified=last_modified)
+
+
+async def list_movies(
+    db: AsyncSession,
+    *,
+    q: Optional[str] = None,
+    genre: Optional[MovieGenre] = None,
+    is_premium: Optional[bool] = None,
+    order: Optional[str] = None,
+    limit: int = 20,
+    offset: int = 0,
+    cursor: Optional[str] = None,
+    as_rows: bool = False,
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    List movies page by page.
+
+    `q` goes through the search backend (prefix match on title and description). With `q` the
+    default order is "relevance"; otherwise "newest".
+
+    Pagination is keyset-based: pass the returned cursor back to fetch the next page, which is an
+    index range scan on (sort column, id) however deep the page. `offset` is still honored for
+    the first request but ignored once a cursor is given. Relevance pages, which can't be
+    keyset-paginated, carry their offset in the cursor.
+
+    With `as_rows` the page is read as plain tuples of CATALOG_ROW_COLUMNS instead of Movie
+    objects, skipping ORM hydration for callers that only serialize the rows.
+
+    Returns:
+        (movies or rows, next_cursor); next_cursor is None on the last page.
+    """
+    order = resolve_order(order, q)
+
+    filters = []
+    if genre is not None:
+        filters.append(Movie.genre == genre)
+    if is_premium is not None:
+        filters.append(Movie.is_premium == is_premium)
+
+    entity = CATALOG_ROW_COLUMNS if as_rows else (Movie,)
+
+    if order == "relevance":
+        query, rank = get_search_backend(db).apply(select(*entity).where(*filters), q)
+        start = decode_cursor(cursor, order)[0] if cursor else offset
+        if not isinstance(start, int) or start < 0:
+            raise ValueError("INVALID_CURSOR")
+        query = query.order_by(rank if rank is not None else Movie.id.desc(), Movie.id)
+        result = await db.execute(query.offset(start).limit(limit + 1))
+        movies = [tuple(row) for row in result] if as_rows else list(result.scalars().all())
+        next_cursor = encode_cursor(order, start + limit, 0) if len(movies) > limit else None
+        return movies[:limit], next_cursor
+
+    column, descending = MOVIE_ORDERS[order]
+    key_col = _sort_key(db, column)
+    segments = _order_segments(key_col, column, descending)
+
+    base = select(*entity, key_col.label("sort_key")).where(*filters)
+    if q:
+        base, _ = get_search_backend(db).apply(base, q)
+
+    # Fetch one extra row to know whether another page exists
+    rows: List[Any] = []
+    if offset and not cursor:
+        # Offset paging (first request only): one query across all segments
+        if column == "created_at":
+            order_by = segments[0].order_by
+        elif descending:
+            order_by = [Movie.rating.desc().nullslast(), Movie.id.desc()]
+        else:
+            order_by = [Movie.rating.asc().nullsfirst(), Movie.id.asc()]
+        rows = list((await db.execute(base.order_by(*order_by).offset(offset).limit(limit + 1))).all())
+    else:
+        start, after = 0, None
+        if cursor:
+            key, last_id = decode_cursor(cursor, order)
+            key = _key_from_cursor(db, column, key)
+            # Resume in the segment holding the cursor row
+            if column == "rating":
+                start = next(n for n, seg in enumerate(segments) if seg.unrated == (key is None))
+            after = segments[start].after(key, last_id)
+        for n in range(start, len(segments)):
+            segment = segments[n]
+            query = base if segment.where is None else base.where(segment.where)
+            if n == start and after is not None:
+                query = query.where(after)
+            query = query.order_by(*segment.order_by).limit(limit + 1 - len(rows))
+            rows += (await db.execute(query)).all()
+            if len(rows) > limit:
+                break
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(order, _key_to_cursor(last.sort_key), last.id if as_rows else last[0].id)
+    if as_rows:
+        return [tuple(row)[:-1] for row in rows], next_cursor
+    return [movie for movie, _ in rows], next_cursor
+
+
+class _ImportReport:
+    def __init__(self, max_errors: int):
+        self.inserted = 0
+        self.failed = 0
+        self.errors: List[Dict[str, Any]] = []
+        self.max_errors = max_errors
+
+    def fail(self, line: int, error: RowError) -> None:
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": line, "title": error.title, "error": error.message})
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+async def _insert_batch(db: AsyncSession, batch: List[Tuple[int, Dict[str, Any]]], report: _ImportReport) -> None:
+    # One set-based uniqueness check for the whole batch
+    titles = [data["title"] for _, data in batch]
+    taken = set((await db.execute(select(Movie.title).where(Movie.title.in_(titles)))).scalars())
+    fresh = []
+    for line, data in batch:
+        if data["title"] in taken:
+            report.fail(line, RowError("Movie title already exists", data["title"]))
+        else:
+            fresh.append((line, data))
+    if not fresh:
+        return
+
+    values = [{field: data.get(field) for field in _WRITABLE_FIELDS} for _, data in fresh]
+    for row in values:
+        row["is_premium"] = bool(row["is_premium"])
+    try:
+        # Core executemany (insertmanyvalues): one multi-row INSERT ... RETURNING per batch. The ORM bulk
+        # path would split the batch by which columns are NULL.
+        table = Movie.__table__
+        result = await db.execute(insert(table).returning(table.c.id, table.c.title, table.c.description), values)
+        await get_search_backend(db).index_many(db, [tuple(row) for row in result])
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        # A concurrent writer took one of the titles: settle this batch row by row
+        for line, data in fresh:
+            try:
+                await create_movie(db, data=data)
+                report.inserted += 1
+            except (MovieTitleTaken, IntegrityError):
+                await db.rollback()
+                report.fail(line, RowError("Movie title already exists", data["title"]))
+        return
+    report.inserted += len(fresh)
+    await catalog_cache.invalidate()
+
+
+async def import_movies(
+    db: AsyncSession,
+    records: AsyncIterator[Record],
+    *,
+    batch_size: Optional[int] = None,
+    max_errors: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Bulk-insert movies from validated records (dicts with MovieCreate's fields) or row errors.
+
+    Business rules:
+    - Titles stay unique: rows clashing with the catalog or with an earlier row of the same import
+      are rejected and reported, the others go in.
+    - Each batch is one uniqueness query plus one executemany insert in its own transaction, so
+      batches already committed stay in if the stream fails later.
+
+    Returns:
+        {"inserted", "failed", "errors": [{"line", "title", "error"}], "errors_truncated"}
+    """
+    batch_size = batch_size or BULK_IMPORT_BATCH_SIZE
+    report = _ImportReport(IMPORT_MAX_REPORTED_ERRORS if max_errors is None else max_errors)
+    seen: set = set()
+    batch: List[Tuple[int, Dict[str, Any]]] = []
+    async for line, record in records:
+        if isinstance(record, RowError):
+            report.fail(line, record)
+            continue
+        if record["title"] in seen:
+            report.fail(line, RowError("Duplicate title in import", record["title"]))
+            continue
+        seen.add(record["title"])
+        batch.append((line, record))
+        if len(batch) >= batch_size:
+            await _insert_batch(db, batch, report)
+            batch = []
+    if batch:
+        await _insert_batch(db, batch, report)
+    return report.as_dict()
+
+
+async def iter_catalog_rows(
+    session_factory: async_sessionmaker, *, batch_size: Optional[int] = None
+) -> AsyncIterator[List[Tuple[Any, ...]]]:
+    """
+    Yield the whole catalog as pages of CATALOG_ROW_COLUMNS tuples, in id order.
+
+    Each page is a keyset query in its own short session, so a long export never holds a read
+    transaction (or a pooled connection) open between pages.
+    """
+    batch_size = batch_size or BULK_IMPORT_BATCH_SIZE
+    last_id = 0
+    while True:
+        async with session_factory() as db:
+            query = select(*CATALOG_ROW_COLUMNS).where(Movie.id > last_id).order_by(Movie.id).limit(batch_size)
+            rows = [tuple(row) for row in await db.execute(query)]
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
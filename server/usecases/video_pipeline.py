@@ -0,0 +1,249 @@
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from server.services import hls_transcoder
+from server.services.jobs import Job, JobCancelled, JobFailed
+from server.services.hls_transcoder import (
+    HLS_ENCODING_PROFILE,
+    encode_report,
+    parse_ladder,
+    probe_complexity,
+    probe_frame_rate,
+    rewrite_segment_uris,
+    transcode_to_hls,
+    transcode_to_hls_parallel,
+    transcode_to_hls_streaming,
+    variant_names,
+    FFmpegNotFound,
+)
+from server.services.media_index import hash_file, media_index
+from server.services.metrics import record_encode
+from server.services.cloudinary_uploader import ParallelUploader, order_playlists
+from server.services.storage import media_storage
+from server.usecases.movies import update_movie
+
+logger = logging.getLogger("uvicorn.error")
+
+# Upload segments while ffmpeg is still encoding (env override supported)
+HLS_PIPELINED_UPLOAD = os.getenv("HLS_PIPELINED_UPLOAD", "true").lower() == "true"
+# Encode keyframe-aligned chunks of the source in parallel processes (long features)
+HLS_SEGMENT_PARALLEL = os.getenv("HLS_SEGMENT_PARALLEL", "false").lower() == "true"
+# Upper bound on waiting for the event loop to persist a job result
+PERSIST_TIMEOUT_SECONDS = 60
+
+
+async def _save_movie_urls(session_factory: async_sessionmaker, movie_id: int, data: Dict[str, Any]) -> None:
+    async with session_factory() as db:
+        await update_movie(db, movie_id=movie_id, data=data)
+
+
+def _persist_video_url(
+    session_factory: async_sessionmaker,
+    loop: asyncio.AbstractEventLoop,
+    movie_id: int,
+    video_url: str,
+    field: str = "video_url",
+) -> None:
+    persist = asyncio.run_coroutine_threadsafe(_save_movie_urls(session_factory, movie_id, {field: video_url}), loop)
+    try:
+        persist.result(timeout=PERSIST_TIMEOUT_SECONDS)
+    except ValueError as e:
+        if str(e) == "NOT_FOUND":
+            raise JobFailed("Movie not found")
+        raise
+
+
+def run_video_pipeline(
+    job: Job,
+    *,
+    session_factory: async_sessionmaker,
+    loop: asyncio.AbstractEventLoop,
+    movie_id: int,
+    src_path: str,
+    workdir: str,
+    base_name: str,
+    content_hash: Optional[str] = None,
+    reuse_published: bool = True,
+    field: str = "video_url",
+    profile: str = HLS_ENCODING_PROFILE,
+) -> Dict[str, Any]:
+    """
+    Background body of an upload-video job: transcode to an HLS ladder, upload assets to the
+    media storage backend, persist the master playlist URL as video_url (or `field`, e.g. trailer_url).
+    Every publish gets its own folder, so an uploaded segment never changes and can be cached as immutable.
+
+    In pipelined mode segments upload as soon as ffmpeg closes them; otherwise after the
+    transcode finishes. In segment-parallel mode they upload as each chunk is stitched.
+    Either way playlists are uploaded last.
+    A probe pass measures the source's complexity first; with `profile` it sets every rung's CRF
+    and maxrate. The result reports the encode fps and average bitrate per variant.
+    `workdir` holds the source and the outputs; the job queue removes it once the job ends.
+    Runs on a worker thread; the DB write is scheduled on `loop`, the application's event loop.
+
+    Deduplication (media_index), unless `reuse_published` is off:
+    - a source already published under the current ladder and profile skips ffmpeg and the upload
+      entirely and only updates video_url (`content_hash` is the source's SHA-256 when known, else
+      computed here);
+    - a segment byte-identical to one published before is not uploaded again; its variant playlist
+      points at the existing URL instead.
+
+    Cancellation (`Job.raise_if_cancelled`) is checked between stages and after every segment, so in
+    pipelined mode a cancelled job also stops ffmpeg; nothing is persisted for a cancelled job.
+
+    Returns:
+        Dict shaped like MovieVideoUploadResponse.
+    """
+    if not Path(src_path).is_file():
+        # Resumed after a restart that lost the temporary working directory
+        raise JobFailed("Source file is no longer available, upload it again")
+    # Outputs differ per ladder, profile and encoder, URLs per backend: all key the published-source index
+    storage = media_storage.backend
+    settings = f"{hls_transcoder.HLS_LADDER};{profile};{hls_transcoder.HLS_VIDEO_ENCODER};{storage.name}"
+    if content_hash is None:
+        job.update(stage="hashing", progress=1)
+        content_hash = hash_file(src_path)
+    published = media_index.get("hls", content_hash, settings) if reuse_published else None
+    if published is not None:
+        job.update(stage="saving", progress=95)
+        job.raise_if_cancelled()
+        _persist_video_url(session_factory, loop, movie_id, published["video_url"], field)
+        return published
+
+    folder = f"movies/{movie_id}/{base_name}/{job.id[:12]}"
+    hls_dir = Path(workdir) / "hls"
+
+    def on_uploaded(done: int, total: int) -> None:
+        if total:
+            job.update(progress=50 + 45 * done / total)
+
+    uploader = ParallelUploader(folder, on_uploaded=on_uploaded, storage=storage)
+    # Segment file name -> URL of an identical segment published earlier or by this job
+    reused: Dict[str, str] = {}
+    submitted: Dict[str, str] = {}
+
+    def submit_segment(path: str) -> None:
+        job.raise_if_cancelled()
+        name = Path(path).name
+        digest = hash_file(path)
+        known = submitted.get(digest)
+        if known is None and reuse_published:
+            # URLs belong to a backend: keyed by it, so a new backend never links to the old one
+            known = (media_index.get("segment", digest, storage.name) or {}).get("url")
+        if known is not None:
+            reused[name] = known
+            return
+        url = submitted[digest] = storage.url_for(f"{folder}/{name}")
+
+        def index_segment(future: Future) -> None:
+            if not future.cancelled() and future.exception() is None:
+                media_index.put("segment", digest, {"url": url}, storage.name)
+
+        uploader.submit(path, name).add_done_callback(index_segment)
+
+    # Probe, then transcode to HLS
+    job.update(stage="probing", progress=3)
+    complexity = probe_complexity(src_path)
+    job.update(stage="transcoding", progress=5)
+    job.raise_if_cancelled()
+    started = time.perf_counter()
+    try:
+        if HLS_SEGMENT_PARALLEL:
+            index_path, outputs = transcode_to_hls_parallel(
+                src_path,
+                str(hls_dir),
+                base_name=base_name,
+                on_segment=submit_segment,
+                profile=profile,
+                complexity=complexity,
+                checkpoint=job.raise_if_cancelled,
+            )
+        elif HLS_PIPELINED_UPLOAD:
+            index_path, outputs = transcode_to_hls_streaming(
+                src_path,
+                str(hls_dir),
+                base_name=base_name,
+                on_segment=submit_segment,
+                profile=profile,
+                complexity=complexity,
+            )
+        else:
+            index_path, outputs = transcode_to_hls(
+                src_path, str(hls_dir), base_name=base_name, profile=profile, complexity=complexity
+            )
+            for local in outputs:
+                if local.endswith(".ts"):
+                    submit_segment(local)
+    except JobCancelled:
+        uploader.cancel()
+        raise
+    except FFmpegNotFound as e:
+        uploader.cancel()
+        raise JobFailed(str(e))
+    except Exception:
+        uploader.cancel()
+        raise JobFailed("ffmpeg failed to process the video")
+    encoding = encode_report(
+        index_path,
+        outputs,
+        time.perf_counter() - started,
+        ladder=parse_ladder(hls_transcoder.HLS_LADDER),
+        profile=profile,
+        complexity=complexity,
+        frame_rate=probe_frame_rate(src_path),
+    )
+    record_encode(encoding)
+    logger.info(
+        "Encoded movie %s (%s, complexity %.2f) at %s fps, %sx realtime: %s",
+        movie_id,
+        profile,
+        complexity,
+        encoding["encode_fps"],
+        encoding["speed"],
+        ", ".join(f"{name} {v['average_kbps']} kbps" for name, v in encoding["variants"].items()),
+    )
+
+    # Wait for segment uploads, then publish playlists (master last)
+    job.update(stage="uploading", progress=50)
+    if job.cancel_requested:
+        uploader.cancel()
+        job.raise_if_cancelled()
+    uploader.expect(len(outputs) - len(reused))
+    playlists = [(local, Path(local).name) for local in outputs if local.endswith(".m3u8")]
+    if reused:
+        for local, _ in playlists:
+            rewrite_segment_uris(local, reused)
+    try:
+        uploader.finish(order_playlists(playlists))
+    except Exception:
+        raise JobFailed("Failed to upload HLS assets to media storage")
+
+    playlist_filename = Path(index_path).name
+    final_m3u8_url = storage.url_for(f"{folder}/{playlist_filename}")
+
+    # Persist URL to DB
+    job.update(stage="saving", progress=95)
+    job.raise_if_cancelled()
+    _persist_video_url(session_factory, loop, movie_id, final_m3u8_url, field)
+
+    result = {
+        "video_url": final_m3u8_url,
+        "playlist_filename": playlist_filename,
+        "renditions": variant_names(index_path, outputs),
+        "encoding": encoding,
+    }
+    media_index.put("hls", content_hash, result, settings)
+    return result
+
+
+def run_video_job(
+    job: Job, *, loop: asyncio.AbstractEventLoop, async_session_factory: async_sessionmaker
+) -> Dict[str, Any]:
+    """Job queue handler for upload-video and upload-trailer jobs; arguments come from `job.params`."""
+    return run_video_pipeline(job, session_factory=async_session_factory, loop=loop, **job.params)